@@ -1,5 +1,12 @@
+from collections import OrderedDict
+
+from django.core.paginator import InvalidPage
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from posts.utils import KeysetPaginator
 
 
 class CustomPagination(pagination.PageNumberPagination):
@@ -11,3 +18,78 @@ class CustomPagination(pagination.PageNumberPagination):
 
     def get_paginated_response(self, data):
         return Response(data)
+
+
+class KeysetPagination(pagination.BasePagination):
+    """Пагинация по ключу (created, id) с непрозрачными курсорами."""
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.get_page_size(request))
+        try:
+            self.page = paginator.page(
+                request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidPage as error:
+            raise NotFound(str(error))
+        return list(self.page)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                (
+                    ("next", self.get_link(self.page.next_cursor)),
+                    ("previous", self.get_link(self.page.previous_cursor)),
+                    ("results", data),
+                )
+            )
+        )
+
+
+class OptionalKeysetMixin:
+    """Включает пагинацию по ключу, если в запросе передан ?cursor=."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class PostPagination(OptionalKeysetMixin, pagination.LimitOffsetPagination):
+    """Пагинация постов: limit/offset или курсор по ключу."""
+
+
+class CommentPagination(OptionalKeysetMixin, CustomPagination):
+    """Пагинация комментариев: номер страницы или курсор по ключу."""
+
+
+class SearchPagination(pagination.LimitOffsetPagination):
+    """Пагинация результатов поиска: limit/offset с ограничением limit."""
+
+    default_limit = 20
+    max_limit = 100
@@ -1,24 +1,96 @@
 import base64
-
-from django.core.files.base import ContentFile
+import binascii
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+)
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueTogetherValidator
 
+from posts import search
 from posts.models import Comment, Follow, Group, Post, User, Rating
 
+DATA_URI_RE = re.compile(r"data:image/(?P<extension>[a-z0-9.+-]+);base64,")
+
 
 class Base64ImageField(serializers.ImageField):
+    """Картинка в виде data URI (base64) или файла из multipart-запроса.
+
+    data URI декодируется порциями во временный файл загрузки, а размер
+    проверяется по длине base64 еще до декодирования.
+    """
+
+    # Символов base64 за раз, кратно 4.
+    CHUNK_SIZE = 64 * 1024
+
+    default_error_messages = {
+        "max_size": "Размер изображения больше {max_size} байт.",
+        "invalid_base64": "Некорректное изображение в формате base64.",
+    }
+
+    def __init__(self, *args, max_size=None, **kwargs):
+        self._max_size = max_size
+        super().__init__(*args, **kwargs)
+
+    @property
+    def max_size(self):
+        return self._max_size or settings.API_IMAGE_MAX_SIZE
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith("data:image"):
-            format, encoded_image = data.split(";base64,")
-            extension = format.split("/")[-1]
-            data = ContentFile(
-                base64.b64decode(encoded_image), name="image." + extension
-            )
+            data = self.decode(data)
+        elif getattr(data, "size", 0) > self.max_size:
+            self.fail("max_size", max_size=self.max_size)
 
         return super().to_internal_value(data)
 
+    def decode(self, data):
+        header = DATA_URI_RE.match(data)
+        if header is None:
+            self.fail("invalid_base64")
+        # MIME-кодировщики переносят base64 по 76 символов в строке.
+        encoded = "".join(data[header.end():].split())
+        if len(encoded) % 4:
+            self.fail("invalid_base64")
+        size = len(encoded) // 4 * 3 - encoded.count("=", len(encoded) - 2)
+        if size > self.max_size:
+            self.fail("max_size", max_size=self.max_size)
+
+        extension = header["extension"]
+        upload = self.make_upload(
+            f"image.{extension}", f"image/{extension}", size
+        )
+        try:
+            for offset in range(0, len(encoded), self.CHUNK_SIZE):
+                upload.write(
+                    base64.b64decode(
+                        encoded[offset:offset + self.CHUNK_SIZE],
+                        validate=True,
+                    )
+                )
+        except binascii.Error:
+            upload.close()
+            self.fail("invalid_base64")
+        upload.seek(0)
+        return upload
+
+    @staticmethod
+    def make_upload(name, content_type, size):
+        """Файл загрузки, как у обработчиков Django: небольшие картинки
+        остаются в памяти, остальные пишутся во временный файл.
+        """
+
+        if size > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            return TemporaryUploadedFile(name, content_type, size, None)
+        return InMemoryUploadedFile(
+            BytesIO(), None, name, content_type, size, None
+        )
+
 
 class UserSerializer(serializers.ModelSerializer):
     """Сериализатор юзеров."""
@@ -82,7 +154,7 @@ class PostSerializer(serializers.ModelSerializer):
     author = SlugRelatedField(slug_field="username", read_only=True)
     comments = CommentSerializer(read_only=True, many=True)
     image = Base64ImageField(required=False, allow_null=True)
-    # rating = serializers.SerializerMethodField(read_only=True)
+
     class Meta:
         fields = (
             "id",
@@ -93,16 +165,13 @@ class PostSerializer(serializers.ModelSerializer):
             "author",
             "group",
             "comments",
-            # "rating"
+            "rating",
+            "likes_count",
+            "dislikes_count",
         )
+        read_only_fields = ("rating", "likes_count", "dislikes_count")
         model = Post
 
-    def get_rating(self, obj):
-        rating = Rating.objects.filter(post_id=obj.id).select_related("user", "post")
-        if rating:
-            return rating[0].rating
-        return 0
-
 
 class RatingSerializer(serializers.ModelSerializer):
     """Сериализатор подписок."""
@@ -113,4 +182,24 @@ class RatingSerializer(serializers.ModelSerializer):
         read_only_fields = ("user", "post")
 
     def validate(self, attrs):
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Сериализатор результатов поиска: поста или комментария."""
+
+    type = serializers.CharField(source="search_kind")
+    id = serializers.IntegerField()
+    post = serializers.SerializerMethodField()
+    title = serializers.SerializerMethodField()
+    text = serializers.CharField()
+    author = SlugRelatedField(slug_field="username", read_only=True)
+    created = serializers.DateTimeField()
+
+    def get_post(self, obj):
+        return obj.pk if obj.search_kind == search.POST else obj.post_id
+
+    def get_title(self, obj):
+        if obj.search_kind == search.POST:
+            return obj.title
+        return obj.post.title
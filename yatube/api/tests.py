@@ -0,0 +1,145 @@
+import base64
+import shutil
+import textwrap
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from posts.models import Post, User
+
+from .serializers import Base64ImageField
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_png(size=(32, 32)):
+    content = BytesIO()
+    Image.new("RGB", size, "red").save(content, "PNG")
+    return content.getvalue()
+
+
+def data_uri(content, extension="png"):
+    encoded = base64.b64encode(content).decode()
+    return f"data:image/{extension};base64,{encoded}"
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=True)
+class Base64ImageFieldTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_user")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.test_client = APIClient()
+        self.test_client.force_authenticate(self.test_user)
+
+    def create_post(self, image, format="json"):
+        return self.test_client.post(
+            "/api/v1/posts/",
+            {"title": "Заголовок", "text": "Пост с картинкой", "image": image},
+            format=format,
+        )
+
+    def test_api_image_base64_upload(self):
+        """Картинка в формате data URI сохраняется у поста."""
+
+        response = self.create_post(data_uri(make_png()))
+
+        self.assertEqual(response.status_code, 201, response.data)
+        post = Post.objects.get(pk=response.data["id"])
+        self.assertTrue(post.image.name.endswith(".png"))
+        self.assertEqual((post.image.width, post.image.height), (32, 32))
+
+    def test_api_image_wrapped_base64_upload(self):
+        """base64 с переносами строк по 76 символов (MIME) принимается."""
+
+        content = make_png((64, 64))
+        encoded = base64.b64encode(content).decode()
+        wrapped = "\r\n".join(textwrap.wrap(encoded, 76))
+        self.assertIn("\n", wrapped)
+
+        field = Base64ImageField()
+        field.CHUNK_SIZE = 8
+        upload = field.decode(f"data:image/png;base64,{wrapped}")
+        self.assertEqual(upload.size, len(content))
+        self.assertEqual(upload.read(), content)
+
+        response = self.create_post(f"data:image/png;base64,{wrapped}")
+        self.assertEqual(response.status_code, 201, response.data)
+
+    def test_api_image_multipart_upload(self):
+        """Картинку можно загрузить обычным файлом без base64."""
+
+        image = SimpleUploadedFile(
+            "small.png", make_png(), content_type="image/png"
+        )
+        response = self.create_post(image, format="multipart")
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertTrue(Post.objects.get(pk=response.data["id"]).image)
+
+    @override_settings(API_IMAGE_MAX_SIZE=64)
+    def test_api_image_max_size(self):
+        """Слишком большая картинка отклоняется в обоих форматах."""
+
+        image = SimpleUploadedFile(
+            "small.png", make_png(), content_type="image/png"
+        )
+        for data, format in (
+            (data_uri(make_png()), "json"),
+            (image, "multipart"),
+        ):
+            with self.subTest(format=format):
+                response = self.create_post(data, format=format)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("image", response.data)
+        self.assertFalse(Post.objects.exists())
+
+    def test_api_image_invalid_base64(self):
+        """Некорректный base64 дает ошибку валидации, а не 500."""
+
+        for data in (
+            "data:image/png;base64,abc",
+            "data:image/png;base64,****",
+            "data:image/png,AAAA",
+        ):
+            with self.subTest(data=data):
+                response = self.create_post(data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("image", response.data)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=16)
+    def test_api_image_large_decoded_to_temporary_file(self):
+        """Большая картинка декодируется порциями во временный файл."""
+
+        content = make_png((200, 200))
+        field = Base64ImageField()
+        field.CHUNK_SIZE = 8
+
+        upload = field.decode(data_uri(content))
+
+        self.assertTrue(hasattr(upload, "temporary_file_path"))
+        self.assertEqual(upload.size, len(content))
+        self.assertEqual(upload.read(), content)
+
+    def test_api_image_size_checked_before_decoding(self):
+        """Размер проверяется до декодирования."""
+
+        field = Base64ImageField(max_size=3)
+        with self.assertRaises(ValidationError) as error:
+            field.decode("data:image/png;base64,****AAAA")
+        self.assertEqual(error.exception.detail[0].code, "max_size")
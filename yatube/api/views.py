@@ -1,12 +1,20 @@
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from posts.models import Group, Post, User, Rating
-from .pagination import CustomPagination
+from posts import comments, deletion, rating, search
+from posts.models import Comment, Group, Post, User, Rating
+from .pagination import (CommentPagination, CustomPagination, PostPagination,
+                         SearchPagination)
 from .permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
 from .serializers import (CommentSerializer, FollowSerializer, GroupSerializer,
-                          PostSerializer, RatingSerializer, UserSerializer)
+                          PostSerializer, RatingSerializer,
+                          SearchResultSerializer, UserSerializer)
 
 
 class FollowViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
@@ -28,13 +36,27 @@ class FollowViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
 class PostViewSet(viewsets.ModelViewSet):
     """Вьюсет постов."""
 
-    queryset = Post.objects.all().select_related("group", "author").prefetch_related("comments")
+    queryset = (
+        Post.objects.all()
+        .select_related("group", "author")
+        .prefetch_related(
+            Prefetch(
+                "comments",
+                queryset=Comment.objects.select_related("author"),
+            )
+        )
+    )
     serializer_class = PostSerializer
     permission_classes = (IsAuthorOrReadOnly, IsAuthenticatedOrReadOnly)
+    pagination_class = PostPagination
+    query_budget = {"list": 6, "retrieve": 5}
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def perform_destroy(self, instance):
+        deletion.schedule(instance)
+
 
 class GroupViewSet(viewsets.ReadOnlyModelViewSet):
     """Вьюсет групп."""
@@ -42,6 +64,7 @@ class GroupViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    replica_reads = True
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -57,7 +80,9 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrReadOnly,)
-    pagination_class = CustomPagination
+    pagination_class = CommentPagination
+    replies_page_size = 20
+    replies_max_page_size = 100
 
     def get_queryset(self):
         post = get_object_or_404(Post, id=self.kwargs["post_id"])
@@ -67,6 +92,32 @@ class CommentViewSet(viewsets.ModelViewSet):
         post = get_object_or_404(Post, id=self.kwargs["post_id"])
         serializer.save(author=self.request.user, post=post)
 
+    @action(detail=True, methods=("get",))
+    def replies(self, request, post_id=None, pk=None):
+        """Следующая порция ответов треда: ?after=<position>&limit=<n>."""
+
+        try:
+            after = int(request.query_params.get("after", 0))
+            limit = int(
+                request.query_params.get("limit", self.replies_page_size)
+            )
+        except ValueError:
+            raise ValidationError("after и limit должны быть числами.")
+        limit = min(max(limit, 1), self.replies_max_page_size)
+
+        replies = list(
+            comments.replies_after(self.get_object(), after)[:limit + 1]
+        )
+        next_link = None
+        if len(replies) > limit:
+            replies = replies[:limit]
+            next_link = replace_query_param(
+                request.build_absolute_uri(), "after", replies[-1].position
+            )
+
+        serializer = self.get_serializer(replies, many=True)
+        return Response({"next": next_link, "results": serializer.data})
+
 
 class RatingViewSet(viewsets.ModelViewSet):
     """Вьюсет групп."""
@@ -81,14 +132,36 @@ class RatingViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         post = get_object_or_404(Post, id=self.kwargs["post_id"])
-        rating = Rating.objects.filter(user=self.request.user, post=post)
+        serializer.instance = rating.set_rating(
+            self.request.user, post, serializer.validated_data.get("rating", 0)
+        )
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        serializer.instance = rating.set_rating(
+            instance.user,
+            instance.post,
+            serializer.validated_data.get("rating", instance.rating),
+        )
+
+    def perform_destroy(self, instance):
+        rating.remove_rating(instance)
 
-        if not rating:
-            serializer.save(user=self.request.user, post=post)
 
-        else:
-            validated_data = {
-                "user": self.request.user,
-                "rating": serializer.initial_data["rating"]
-            }
-            serializer.update(instance=rating[0], validated_data=validated_data)
+class SearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Поиск по постам и комментариям: ?q=<запрос>&type=post|comment."""
+
+    serializer_class = SearchResultSerializer
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        kind = self.request.query_params.get("type")
+        if kind is not None and kind not in search.KINDS:
+            raise ValidationError(
+                {"type": f"Допустимые значения: {', '.join(search.KINDS)}."}
+            )
+        return search.SearchResults(
+            self.request.query_params.get("q", ""),
+            kinds=(kind,) if kind else search.KINDS,
+        )
@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from . import jobs
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk", "name", "status", "priority", "attempts", "run_at", "created"
+    )
+    list_filter = ("status", "name")
+    readonly_fields = ("last_error",)
+    actions = ("requeue",)
+
+    def requeue(self, request, queryset):
+        count = jobs.requeue(queryset)
+        self.message_user(request, f"Возвращено в очередь: {count}")
+
+    requeue.short_description = "Вернуть в очередь"
@@ -0,0 +1,73 @@
+"""SQLite с настройками для работы под нагрузкой.
+
+При каждом подключении выполняются PRAGMA из PRAGMAS (журнал WAL:
+читатели не блокируют писателя и наоборот; ожидание блокировки вместо
+немедленной ошибки; кэш страниц и mmap). Значения можно переопределить
+в DATABASES[...]["OPTIONS"]["pragmas"].
+
+Транзакции atomic() начинаются с BEGIN IMMEDIATE: блокировка записи
+берется сразу. При обычном BEGIN транзакция, которая сначала читает, а
+потом пишет, при конкурентной записи получает "database is locked" без
+ожидания busy_timeout - SQLite не может повысить ее блокировку.
+Режим задается OPTIONS["transaction_mode"] (DEFERRED, IMMEDIATE,
+EXCLUSIVE).
+
+Перед закрытием соединения выполняется PRAGMA optimize: SQLite обновляет
+статистику (sqlite_stat1) таблиц, где она устарела.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    # В режиме WAL NORMAL не портит базу при сбое, теряются только
+    # последние транзакции при отключении питания.
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    # Отрицательное значение - размер в КиБ.
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+TRANSACTION_MODES = ("DEFERRED", "IMMEDIATE", "EXCLUSIVE")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pragmas", None)
+        params.pop("transaction_mode", None)
+        return params
+
+    @property
+    def pragmas(self):
+        return {**PRAGMAS, **self.settings_dict["OPTIONS"].get("pragmas", {})}
+
+    @property
+    def transaction_mode(self):
+        mode = self.settings_dict["OPTIONS"].get(
+            "transaction_mode", "IMMEDIATE"
+        ).upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"Неизвестный режим транзакций SQLite: {mode}"
+            )
+        return mode
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _close(self):
+        if self.connection is not None and not self.is_in_memory_db():
+            try:
+                self.connection.execute("PRAGMA optimize")
+            except base.Database.Error:
+                pass
+        super()._close()
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.transaction_mode}")
@@ -0,0 +1,60 @@
+"""Версионированный кэш с тегами.
+
+Каждый тег (например, "posts" или "group:3") хранит в кэше свою версию.
+Ключи закэшированных данных включают версии своих тегов, поэтому для
+инвалидации достаточно сменить версию тега - старые записи просто
+перестают читаться и вытесняются по таймауту. Остальной кэш (страницы
+других разделов, счетчики троттлинга DRF) не затрагивается.
+"""
+
+import time
+
+from django.core.cache import cache
+
+TAG_KEY_PREFIX = "cache-tag"
+
+
+def _tag_key(tag):
+    return f"{TAG_KEY_PREFIX}:{tag}"
+
+
+def _new_version():
+    # Если версия вытеснена из кэша, новая не совпадет ни с одной из
+    # прежних, и устаревшие записи не оживут.
+    return int(time.time() * 1000)
+
+
+def get_versions(*tags):
+    """Текущие версии тегов, отсутствующие создаются."""
+
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, _new_version(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def version_token(*tags):
+    """Строка с версиями тегов для включения в ключ кэша."""
+
+    versions = get_versions(*tags)
+    return ".".join(f"{tag}={versions[tag]}" for tag in tags)
+
+
+def make_key(prefix, tags, *parts):
+    """Ключ кэша, который устаревает при инвалидации любого из тегов."""
+
+    return ":".join(
+        [prefix, version_token(*tags), *(str(part) for part in parts)]
+    )
+
+
+def invalidate(*tags):
+    """Инвалидирует все записи, помеченные любым из тегов."""
+
+    for tag in set(tags):
+        try:
+            cache.incr(_tag_key(tag))
+        except ValueError:
+            cache.set(_tag_key(tag), _new_version(), None)
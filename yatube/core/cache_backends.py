@@ -0,0 +1,71 @@
+"""Бэкенды кэша, учитывающие попадания в метриках запроса."""
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+from core.metrics import record_cache
+
+_missing = object()
+
+
+class InstrumentedCache(BaseCache):
+    """Обертка над любым бэкендом кэша.
+
+    Настоящий бэкенд задается в OPTIONS["BACKEND"], остальные параметры
+    передаются ему как есть. Ключи строит настоящий бэкенд, обертка только
+    учитывает результаты get и get_many; get_or_set базового класса идет
+    через get.
+    """
+
+    def __init__(self, location, params):
+        params = dict(params)
+        options = dict(params.get("OPTIONS", {}))
+        backend = import_string(options.pop("BACKEND"))
+        params["OPTIONS"] = options
+        super().__init__(params)
+        self.backend = backend(location, params)
+
+    def get(self, key, default=None, version=None):
+        value = self.backend.get(key, _missing, version)
+        record_cache(value is not _missing)
+        return default if value is _missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = self.backend.get_many(keys, version)
+        for key in keys:
+            record_cache(key in values)
+        return values
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.backend.add(key, value, timeout, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.backend.set(key, value, timeout, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.backend.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self.backend.delete(key, version)
+
+    def has_key(self, key, version=None):
+        return self.backend.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        return self.backend.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.backend.decr(key, delta, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.backend.set_many(data, timeout, version)
+
+    def delete_many(self, keys, version=None):
+        self.backend.delete_many(keys, version)
+
+    def clear(self):
+        self.backend.clear()
+
+    def close(self, **kwargs):
+        self.backend.close(**kwargs)
@@ -0,0 +1,38 @@
+"""Состояние маршрутизации по репликам для запроса (core.db_router)."""
+
+from django.conf import settings
+
+from core.db_router import (
+    SAFE_METHODS,
+    RoutingState,
+    current,
+    pin,
+    reads_from_replica,
+)
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        state = RoutingState(request)
+        token = current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        if state.wrote:
+            pin(response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = current.get()
+        if state is not None:
+            state.replica_allowed = (
+                request.method in SAFE_METHODS
+                and reads_from_replica(view_func)
+            )
@@ -0,0 +1,55 @@
+"""Замер времени обработки запросов.
+
+Для каждого запроса считаются запросы к БД и их время, время рендера
+шаблона и обращения к кэшу. Итоги уходят в заголовок Server-Timing и
+в агрегаты по имени URL (core.metrics), доступные по адресам
+core:metrics и core:metrics_prometheus.
+"""
+
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from core import metrics
+
+
+class MetricsMiddleware:
+    """Должен стоять первым в MIDDLEWARE, чтобы замер охватывал остальные
+    слои.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current.set(request_metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(
+                            request_metrics.execute_wrapper
+                        )
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+
+        total = request_metrics.elapsed()
+        response["Server-Timing"] = request_metrics.server_timing(total)
+        match = request.resolver_match
+        view_name = match.view_name if match else metrics.UNRESOLVED
+        metrics.registry.record(view_name, request_metrics, total)
+        return response
+
+    def process_template_response(self, request, response):
+        request_metrics = metrics.current.get()
+        started = time.perf_counter()
+
+        def rendered(response):
+            request_metrics.template_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,141 @@
+"""Кэш целых страниц с подстановкой персональных фрагментов.
+
+Представление включает кэширование, записывая в request.page_cache
+таймаут и версии своих тегов (core.cache). Персональные части страницы
+(шапка, кнопка подписки) выводятся тегом {% personal_include %} и
+обрамляются маркерами. Перед сохранением их содержимое вырезается, а при
+выдаче из кэша рендерится заново для текущего пользователя - поэтому одна
+закэшированная страница годится и анонимам, и авторизованным.
+
+Страница, собранная с реплики, живет в кэше не дольше отставания реплики
+(REPLICA_PIN_SECONDS) и не отдается клиенту, недавно писавшему в базу
+(core.db_router).
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import resolve
+from django.utils.cache import patch_cache_control, patch_response_headers
+
+from core.cache import get_versions
+from core.db_router import is_pinned, read_from_replica
+
+KEY_PREFIX = "page"
+FRAGMENT_RE = re.compile(
+    r"<!--personal:(?P<marker>[^>]*?)-->.*?<!--/personal-->", re.DOTALL
+)
+
+
+def fragment_marker(template_name, params):
+    return f"{template_name}?{urlencode(sorted(params.items()))}"
+
+
+def render_fragment(request, template_name, params):
+    """Фрагмент для текущего пользователя вместе с маркерами."""
+
+    content = render_to_string(template_name, params, request=request)
+    marker = fragment_marker(template_name, params)
+    return f"<!--personal:{marker}-->{content}<!--/personal-->"
+
+
+def strip_fragments(content):
+    """Оставляет от персональных фрагментов только пустые маркеры."""
+
+    return FRAGMENT_RE.sub(
+        lambda match: f"<!--personal:{match['marker']}--><!--/personal-->",
+        content,
+    )
+
+
+def fill_fragments(request, content):
+    """Рендерит персональные фрагменты закэшированной страницы."""
+
+    def render(match):
+        template_name, _, query = match["marker"].partition("?")
+        return render_fragment(request, template_name, dict(parse_qsl(query)))
+
+    return FRAGMENT_RE.sub(render, content)
+
+
+def page_key(request):
+    url = request.build_absolute_uri().encode()
+    return f"{KEY_PREFIX}:{hashlib.md5(url).hexdigest()}"
+
+
+class PageCacheMiddleware:
+    """Отдает страницы из кэша и сохраняет ответы представлений,
+
+    включивших кэширование.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return self.get_response(request)
+
+        key = page_key(request)
+        entry = cache.get(key)
+        if self.is_fresh(request, entry):
+            return self.patch_headers(request, self.from_cache(request, entry))
+
+        response = self.get_response(request)
+        page_cache = getattr(request, "page_cache", None)
+        if page_cache is None or not self.is_cacheable(response):
+            return response
+
+        timeout, versions = page_cache
+        replica = read_from_replica()
+        if replica:
+            timeout = min(timeout, settings.REPLICA_PIN_SECONDS)
+        content = strip_fragments(response.content.decode(response.charset))
+        cache.set(
+            key,
+            {
+                "content": content,
+                "content_type": response["Content-Type"],
+                "versions": versions,
+                "replica": replica,
+            },
+            timeout,
+        )
+        return self.patch_headers(request, response)
+
+    @staticmethod
+    def is_fresh(request, entry):
+        if not entry:
+            return False
+        if entry.get("replica") and is_pinned(request):
+            return False
+        return get_versions(*entry["versions"]) == entry["versions"]
+
+    @staticmethod
+    def is_cacheable(response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+        )
+
+    @staticmethod
+    def from_cache(request, entry):
+        request.resolver_match = resolve(request.path_info)
+        return HttpResponse(
+            fill_fragments(request, entry["content"]),
+            content_type=entry["content_type"],
+        )
+
+    @staticmethod
+    def patch_headers(request, response):
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True)
+        else:
+            patch_response_headers(response, settings.PAGE_CACHE_MAX_AGE)
+        return response
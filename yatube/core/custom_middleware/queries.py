@@ -0,0 +1,35 @@
+"""Поиск N+1 и проверка бюджета запросов (core.queries)."""
+
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from core.queries import QueryLog, inspect
+
+
+@contextmanager
+def inspecting(request):
+    """Записывает запросы ко всем базам и проверяет их после успешного
+
+    ответа.
+    """
+
+    log = QueryLog()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(log))
+        yield
+    inspect(request, log)
+
+
+class QueryInspectionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_INSPECTION:
+            return self.get_response(request)
+
+        with inspecting(request):
+            return self.get_response(request)
@@ -0,0 +1,126 @@
+"""Чтение с реплик, запись в основную базу.
+
+Реплики - алиасы из settings.DATABASE_REPLICAS. С реплик читают только
+представления с атрибутом replica_reads = True и только в безопасных
+методах (GET, HEAD, OPTIONS): это отмечает ReplicaRoutingMiddleware в
+состоянии запроса current. Вне запросов (команды, воркеры) и во всех
+остальных случаях чтение идет из основной базы.
+
+Чтобы пользователь сразу видел свои изменения, после записи (пост,
+комментарий, подписка, оценка - любой вызов db_for_write) он на
+REPLICA_PIN_SECONDS "прилипает" к основной базе. Метка - подписанная
+cookie в ответе на запрос с записью: она не зависит от кэша и процесса,
+обработавшего запрос, а срок ее действия проверяется по подписи
+(клиентам API, не хранящим cookie, стоит читать свои записи из ответа
+на запись). Внутри запроса после первой записи все чтения тоже идут в
+основную базу.
+
+Пользователи, токены и сессии всегда читаются из основной базы: они
+меняются при входе, и отставание реплики выкинуло бы пользователя из
+системы. Служебные модели core (очереди задач и писем, счетчики ссылок
+на файлы) тоже читаются из основной базы.
+
+Страница, собранная с реплики, могла прочитать данные до записи, уже
+сбросившей теги кэша страниц. Поэтому PageCacheMiddleware хранит такую
+страницу не дольше REPLICA_PIN_SECONDS и не отдает ее клиенту, который
+сам недавно писал (read_from_replica, is_pinned).
+"""
+
+import contextvars
+import random
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from core.utils import get_view_class
+
+PRIMARY_APPS = ("auth", "authtoken", "core", "sessions")
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_COOKIE = "db_pin"
+
+current = contextvars.ContextVar("db_routing", default=None)
+
+
+def pin(response):
+    """Направляет чтения клиента в основную базу на время
+    REPLICA_PIN_SECONDS."""
+
+    response.set_signed_cookie(
+        PIN_COOKIE,
+        "1",
+        salt=PIN_COOKIE,
+        max_age=settings.REPLICA_PIN_SECONDS,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def is_pinned(request):
+    return (
+        request.get_signed_cookie(
+            PIN_COOKIE,
+            default=None,
+            salt=PIN_COOKIE,
+            max_age=settings.REPLICA_PIN_SECONDS,
+        )
+        is not None
+    )
+
+
+def reads_from_replica(view):
+    return getattr(get_view_class(view), "replica_reads", False)
+
+
+def read_from_replica():
+    """Читал ли текущий запрос с реплики."""
+
+    state = current.get()
+    return state is not None and state.read_replica
+
+
+class RoutingState:
+    """Состояние маршрутизации одного запроса."""
+
+    def __init__(self, request):
+        self.replica_allowed = False
+        self.read_replica = False
+        self.wrote = False
+        self.pinned = is_pinned(request)
+
+    def use_replica(self, model):
+        return (
+            self.replica_allowed
+            and not self.wrote
+            and not self.pinned
+            and model._meta.app_label not in PRIMARY_APPS
+        )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current.get()
+        if (
+            settings.DATABASE_REPLICAS
+            and state is not None
+            and state.use_replica(model)
+        ):
+            state.read_replica = True
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,211 @@
+"""Фоновые задачи с очередью в базе данных.
+
+enqueue(func, *args) сохраняет вызов модульной функции в таблицу Job -
+внешний брокер не нужен, а задача, поставленная в транзакции, видна
+обработчику только после ее коммита. Команда runworker забирает готовые
+задачи по убыванию приоритета и выполняет их в пуле потоков или
+процессов.
+
+Забранная задача помечается как выполняемая на LEASE: если обработчик
+упадет, задачу заберет другой. Выполненная задача удаляется. При ошибке
+задача возвращается в очередь с растущей задержкой, а после max_attempts
+попыток остается в таблице со статусом DEAD - ее можно разобрать и
+перезапустить из админки (requeue).
+
+При settings.JOBS_EAGER задачи выполняются сразу при постановке (для
+тестов и отладки), а отложенные (run_at в будущем) не выполняются.
+"""
+
+import json
+import logging
+import random
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection, connections
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HIGH = 10
+NORMAL = 0
+LOW = -10
+
+MAX_ATTEMPTS = 5
+# Задержка после n-й неудачи: BACKOFF * 2 ** (n - 1), не больше BACKOFF_MAX.
+BACKOFF = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+LEASE = timedelta(minutes=10)
+
+
+def job_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(
+    func,
+    *args,
+    priority=NORMAL,
+    key="",
+    run_at=None,
+    max_attempts=MAX_ATTEMPTS,
+):
+    """Ставит вызов func(*args) в очередь и возвращает Job.
+
+    func - функция уровня модуля, args сериализуются в JSON. Если задан
+    key и задача с таким ключом уже ждет в очереди, новая не создается:
+    возвращается ожидающая, при необходимости с более ранним run_at.
+    """
+
+    now = timezone.now()
+    run_at = run_at or now
+    if settings.JOBS_EAGER:
+        if run_at <= now:
+            func(*args)
+        return None
+
+    with transaction.atomic():
+        queued = (
+            Job.objects.filter(key=key, status=Job.QUEUED).first()
+            if key else None
+        )
+        if queued is not None:
+            if queued.run_at > run_at:
+                queued.run_at = run_at
+                queued.save(update_fields=("run_at",))
+            return queued
+        return Job.objects.create(
+            name=job_name(func),
+            args=json.dumps(args, cls=DjangoJSONEncoder),
+            key=key,
+            priority=priority,
+            run_at=run_at,
+            max_attempts=max_attempts,
+        )
+
+
+def backoff(attempts, base=BACKOFF, limit=BACKOFF_MAX):
+    """Задержка перед следующей попыткой со случайным разбросом до 10%:
+    base * 2 ** (attempts - 1), не больше limit."""
+
+    delay = min(base * 2 ** (attempts - 1), limit)
+    return delay * (1 + random.random() / 10)
+
+
+def claim(limit):
+    """Забирает до limit готовых задач, возвращает их id.
+
+    Отбор и пометка выполняются в одной транзакции, поэтому два
+    обработчика не заберут одну задачу.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.filter(
+                status__in=(Job.QUEUED, Job.RUNNING), run_at__lte=now
+            )
+            .order_by("-priority", "run_at")
+            .values_list("pk", flat=True)[:limit]
+        )
+        Job.objects.filter(pk__in=ids).update(
+            status=Job.RUNNING, run_at=now + LEASE
+        )
+    return ids
+
+
+def perform(job_id):
+    """Выполняет забранную задачу. Возвращает True при успехе."""
+
+    job = Job.objects.filter(pk=job_id).first()
+    if job is None:
+        return False
+    try:
+        import_string(job.name)(*json.loads(job.args))
+    except Exception:
+        fail(job, traceback.format_exc())
+        return False
+    job.delete()
+    return True
+
+
+def fail(job, error):
+    job.attempts += 1
+    job.last_error = error
+    if job.attempts >= job.max_attempts:
+        job.status = Job.DEAD
+        logger.error("Задача %s (%s) не выполнена:\n%s", job.pk, job, error)
+    else:
+        job.status = Job.QUEUED
+        job.run_at = timezone.now() + backoff(job.attempts)
+    job.save(update_fields=("attempts", "last_error", "status", "run_at"))
+
+
+def requeue(jobs):
+    """Возвращает задачи (queryset) в очередь с обнуленными попытками."""
+
+    return jobs.update(
+        status=Job.QUEUED, attempts=0, run_at=timezone.now(), last_error=""
+    )
+
+
+def perform_in_thread(job_id):
+    try:
+        return perform(job_id)
+    finally:
+        connection.close()
+
+
+def perform_in_process(job_id):
+    close_old_connections()
+    return perform(job_id)
+
+
+def work(workers=4, processes=False, once=False, interval=1.0):
+    """Выполняет задачи в пуле из workers потоков (или процессов).
+
+    Новые задачи забираются по мере освобождения мест в пуле. При once
+    возвращается, когда готовых задач не осталось; возвращает число
+    выполненных задач.
+    """
+
+    if processes:
+        # Дочерние процессы не должны унаследовать открытые соединения.
+        connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        target = perform_in_process
+    else:
+        pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="jobs"
+        )
+        target = perform_in_thread
+
+    performed = 0
+    running = set()
+    with pool:
+        while True:
+            if len(running) < workers:
+                for job_id in claim(workers - len(running)):
+                    running.add(pool.submit(target, job_id))
+            if not running:
+                if once:
+                    return performed
+                time.sleep(interval)
+                continue
+            done, running = wait(
+                running, timeout=interval, return_when=FIRST_COMPLETED
+            )
+            performed += sum(future.result() for future in done)
@@ -0,0 +1,201 @@
+"""Очередь исходящих писем в базе данных.
+
+enqueue() сохраняет письмо в OutgoingEmail, а вложенное изображение -
+файлом в хранилище медиа: в памяти веб-процесса оно не держится, а SMTP
+вызывается только фоновой задачей send_queued (core.jobs).
+
+Задача забирает пачки писем, у которых подошло время попытки, и
+отправляет каждую пачку через одно соединение с почтовым сервером;
+пачки обрабатываются параллельно пулом из settings.MAIL_WORKERS потоков.
+Забранное письмо помечается как отправляемое на LEASE - если обработчик
+упадет, письмо заберет следующая задача. При ошибке письмо возвращается
+в очередь с растущей задержкой, после MAX_ATTEMPTS попыток помечается
+как неотправленное.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from email.mime.image import MIMEImage
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import jobs
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+# Задержка после n-й неудачи: BACKOFF * 2 ** (n - 1), не больше BACKOFF_MAX.
+BACKOFF = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(hours=1)
+LEASE = timedelta(minutes=5)
+IMAGE_CONTENT_ID = "<image>"
+JOB_KEY = "mail"
+
+
+def enqueue(
+    subject, body, from_email, to, image=None, content_subtype="plain"
+):
+    """Ставит письмо в очередь. image - загруженный файл или None."""
+
+    email = OutgoingEmail(
+        subject=subject,
+        body=body,
+        content_subtype=content_subtype,
+        from_email=from_email,
+        to="\n".join(to),
+        next_attempt=timezone.now(),
+    )
+    if image:
+        email.image.save(image.name, image, save=False)
+    email.save()
+    jobs.enqueue(send_queued, key=JOB_KEY)
+    return email
+
+
+def claim(batch_size):
+    """Забирает до batch_size писем, готовых к отправке.
+
+    Отбор и пометка выполняются в одной транзакции, поэтому два
+    обработчика не заберут одно письмо.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutgoingEmail.objects.filter(
+                Q(status=OutgoingEmail.PENDING)
+                | Q(status=OutgoingEmail.SENDING),
+                next_attempt__lte=now,
+            )
+            .order_by("next_attempt")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=ids).update(
+            status=OutgoingEmail.SENDING, next_attempt=now + LEASE
+        )
+    return list(OutgoingEmail.objects.filter(pk__in=ids).order_by("pk"))
+
+
+def build_message(email, connection=None):
+    message = EmailMessage(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.to.splitlines(),
+        connection=connection,
+    )
+    message.content_subtype = email.content_subtype
+    if email.image:
+        with email.image.open("rb") as image:
+            mime_image = MIMEImage(image.read())
+        mime_image.add_header("Content-ID", IMAGE_CONTENT_ID)
+        message.attach(mime_image)
+    return message
+
+
+def mark_sent(email):
+    if email.image:
+        email.image.delete(save=False)
+    email.status = OutgoingEmail.SENT
+    email.sent = timezone.now()
+    email.attempts += 1
+    email.last_error = ""
+    email.save(
+        update_fields=("status", "sent", "attempts", "last_error", "image")
+    )
+
+
+def mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+        logger.error("Письмо %s не отправлено: %s", email.pk, email.last_error)
+    else:
+        email.status = OutgoingEmail.PENDING
+        email.next_attempt = timezone.now() + jobs.backoff(
+            email.attempts, BACKOFF, BACKOFF_MAX
+        )
+    email.save(
+        update_fields=("status", "attempts", "last_error", "next_attempt")
+    )
+
+
+def send_batch(emails):
+    """Отправляет письма через одно соединение. Возвращает число
+    отправленных."""
+
+    sent = 0
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        return sent
+
+    try:
+        for email in emails:
+            try:
+                build_message(email, connection).send()
+            except Exception as error:
+                mark_failed(email, error)
+            else:
+                mark_sent(email)
+                sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def send_batch_in_thread(emails):
+    try:
+        return send_batch(emails)
+    finally:
+        db_connection.close()
+
+
+def process(batch_size=50, workers=4):
+    """Отправляет все письма, готовые к отправке. Возвращает число
+    отправленных.
+
+    При workers = 1 пачки отправляются в текущем потоке.
+    """
+
+    sent = 0
+    if workers == 1:
+        while True:
+            batch = claim(batch_size)
+            if not batch:
+                return sent
+            sent += send_batch(batch)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batches = [claim(batch_size) for _ in range(workers)]
+            batches = [batch for batch in batches if batch]
+            if not batches:
+                return sent
+            sent += sum(pool.map(send_batch_in_thread, batches))
+
+
+def send_queued():
+    """Фоновая задача: отправляет готовые письма и ставит себя на время
+    ближайшей повторной попытки, если такие письма остались."""
+
+    process(workers=settings.MAIL_WORKERS)
+    retry_at = (
+        OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING)
+        .order_by("next_attempt")
+        .values_list("next_attempt", flat=True)
+        .first()
+    )
+    if retry_at is not None:
+        jobs.enqueue(send_queued, key=JOB_KEY, run_at=retry_at)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    """Обработчик фоновых задач (core.jobs)."""
+
+    help = "Выполняет фоновые задачи из очереди в базе данных."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Размер пула"
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Пул процессов вместо пула потоков",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Пауза между проверками пустой очереди, с",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить готовые задачи и завершиться",
+        )
+
+    def handle(self, *args, **options):
+        performed = jobs.work(
+            workers=options["workers"],
+            processes=options["processes"],
+            once=options["once"],
+            interval=options["interval"],
+        )
+        self.stdout.write(f"Выполнено задач: {performed}")
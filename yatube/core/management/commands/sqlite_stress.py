@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from core import sqlite_stress
+
+
+class Command(BaseCommand):
+    """Сравнение стандартного и настроенного бэкендов SQLite."""
+
+    help = (
+        "Конкурентная запись во временную базу SQLite: успешные "
+        "транзакции в секунду и ошибки блокировки для стандартного "
+        "бэкенда и core.backends.sqlite3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=100,
+            help="Транзакций на поток",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=1.0,
+            help="Ожидание блокировки, с",
+        )
+
+    def handle(self, *args, **options):
+        for engine in (
+            sqlite_stress.DEFAULT_ENGINE,
+            sqlite_stress.TUNED_ENGINE,
+        ):
+            result = sqlite_stress.run(
+                engine,
+                threads=options["threads"],
+                transactions=options["transactions"],
+                timeout=options["timeout"],
+            )
+            self.stdout.write(
+                f"{engine}: успешно {result['ok']}, "
+                f"блокировок {result['locked']}, "
+                f"{result['per_second']:.0f} транзакций/с"
+            )
@@ -0,0 +1,32 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """Копирует основную базу SQLite в файлы реплик."""
+
+    help = (
+        "Обновляет реплики из settings.DATABASE_REPLICAS копией основной "
+        "базы (только SQLite, через backup API)."
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("Реплики не настроены (YATUBE_DB_REPLICAS)")
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != "sqlite":
+            raise CommandError("Копирование поддерживается только для SQLite")
+
+        source.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].close()
+            name = connections[alias].settings_dict["NAME"]
+            target = sqlite3.connect(name)
+            try:
+                source.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f"{alias}: {name}")
@@ -0,0 +1,219 @@
+"""Метрики запросов в памяти процесса.
+
+Для каждого имени URL копятся гистограмма времени ответа, число и время
+запросов к БД, время рендера шаблонов и попадания в кэш. Данные текущего
+запроса собирает RequestMetrics (см. MetricsMiddleware), итоговые -
+registry. Агрегаты отдаются в виде словаря и в текстовом формате
+Prometheus.
+"""
+
+import contextvars
+import threading
+import time
+
+# Верхние границы корзин гистограммы времени ответа, в секундах.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+UNRESOLVED = "<unresolved>"
+PREFIX = "yatube"
+
+current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Метрики одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Обертка для connection.execute_wrapper: считает запросы к БД."""
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        """Значение заголовка Server-Timing."""
+
+        return ", ".join(
+            (
+                f'db;dur={self.db_time * 1000:.1f};'
+                f'desc="{self.db_queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f'cache;desc="hits={self.cache_hits} '
+                f'misses={self.cache_misses}"',
+                f"total;dur={total * 1000:.1f}",
+            )
+        )
+
+
+def record_cache(hit):
+    """Учитывает обращение к кэшу в метриках текущего запроса."""
+
+    metrics = current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+class ViewStats:
+    """Накопленные метрики одного имени URL."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, metrics, duration):
+        self.count += 1
+        self.duration += duration
+        for index, bound in enumerate(BUCKETS):
+            if duration <= bound:
+                self.buckets[index] += 1
+                break
+        self.db_queries += metrics.db_queries
+        self.db_time += metrics.db_time
+        self.template_time += metrics.template_time
+        self.cache_hits += metrics.cache_hits
+        self.cache_misses += metrics.cache_misses
+
+    def cumulative_buckets(self):
+        total = 0
+        for count in self.buckets:
+            total += count
+            yield total
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "duration": self.duration,
+            "buckets": dict(zip(BUCKETS, self.cumulative_buckets())),
+            "db_queries": self.db_queries,
+            "db_time": self.db_time,
+            "template_time": self.template_time,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.views = {}
+        self.lock = threading.Lock()
+
+    def record(self, view_name, metrics, duration):
+        with self.lock:
+            stats = self.views.get(view_name)
+            if stats is None:
+                stats = self.views[view_name] = ViewStats()
+            stats.add(metrics, duration)
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: stats.as_dict()
+                for view_name, stats in sorted(self.views.items())
+            }
+
+    def prometheus(self):
+        """Метрики в текстовом формате Prometheus."""
+
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        def sample(name, labels, value):
+            labels = ",".join(
+                f'{key}="{escape_label(value)}"'
+                for key, value in labels.items()
+            )
+            lines.append(f"{PREFIX}_{name}{{{labels}}} {value}")
+
+        family(
+            "request_duration_seconds",
+            "histogram",
+            "Request latency by URL name.",
+        )
+        for view, stats in snapshot.items():
+            for bound, count in stats["buckets"].items():
+                sample(
+                    "request_duration_seconds_bucket",
+                    {"view": view, "le": bound},
+                    count,
+                )
+            sample(
+                "request_duration_seconds_bucket",
+                {"view": view, "le": "+Inf"},
+                stats["count"],
+            )
+            sample(
+                "request_duration_seconds_sum", {"view": view},
+                stats["duration"],
+            )
+            sample(
+                "request_duration_seconds_count", {"view": view},
+                stats["count"],
+            )
+
+        counters = (
+            ("db_queries_total", "db_queries", "Database queries."),
+            ("db_duration_seconds_total", "db_time", "Database time."),
+            (
+                "template_duration_seconds_total",
+                "template_time",
+                "Template rendering time.",
+            ),
+        )
+        for name, key, help_text in counters:
+            family(name, "counter", help_text)
+            for view, stats in snapshot.items():
+                sample(name, {"view": view}, stats[key])
+
+        family("cache_requests_total", "counter", "Cache lookups by result.")
+        for view, stats in snapshot.items():
+            for result in ("hit", "miss"):
+                key = "cache_hits" if result == "hit" else "cache_misses"
+                sample(
+                    "cache_requests_total",
+                    {"view": view, "result": result},
+                    stats[key],
+                )
+        return "\n".join(lines) + "\n"
+
+
+def escape_label(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+registry = Registry()
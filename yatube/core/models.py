@@ -15,3 +15,137 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Blob(models.Model):
+    """Файл хранилища с адресацией по содержимому (core.storage).
+
+    Один и тот же файл могут использовать несколько объектов, поэтому
+    хранится число ссылок на него.
+    """
+
+    name = models.CharField(
+        max_length=255, unique=True, verbose_name="Имя файла"
+    )
+    references = models.PositiveIntegerField(
+        default=0, verbose_name="Количество ссылок"
+    )
+
+    class Meta:
+        verbose_name = "файл"
+        verbose_name_plural = "Файлы"
+
+    def __str__(self):
+        return self.name
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди отправки (core.mail)."""
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "Ожидает отправки"),
+        (SENDING, "Отправляется"),
+        (SENT, "Отправлено"),
+        (FAILED, "Не отправлено"),
+    )
+
+    subject = models.CharField(max_length=255, verbose_name="Тема")
+    body = models.TextField(verbose_name="Текст")
+    content_subtype = models.CharField(
+        max_length=20, default="plain", verbose_name="Формат текста"
+    )
+    from_email = models.CharField(max_length=255, verbose_name="Отправитель")
+    to = models.TextField(verbose_name="Получатели, по одному в строке")
+    image = models.FileField(
+        upload_to="mail/",
+        blank=True,
+        verbose_name="Изображение",
+        help_text="Прикладывается при отправке с Content-ID <image>",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Попыток отправки"
+    )
+    next_attempt = models.DateTimeField(
+        verbose_name="Следующая попытка",
+        help_text="Для отправляемого письма - срок, после которого "
+        "его может забрать другой обработчик",
+    )
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Создано")
+    sent = models.DateTimeField(
+        blank=True, null=True, verbose_name="Отправлено"
+    )
+
+    class Meta:
+        verbose_name = "письмо"
+        verbose_name_plural = "Очередь писем"
+        indexes = (
+            models.Index(
+                fields=("status", "next_attempt"),
+                name="email_status_next_attempt",
+            ),
+        )
+
+    def __str__(self):
+        return self.subject
+
+
+class Job(models.Model):
+    """Фоновая задача (core.jobs)."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DEAD = "dead"
+    STATUSES = (
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DEAD, "Не выполнена"),
+    )
+
+    name = models.CharField(max_length=255, verbose_name="Функция")
+    args = models.TextField(default="[]", verbose_name="Аргументы, JSON")
+    key = models.CharField(
+        max_length=255,
+        blank=True,
+        db_index=True,
+        verbose_name="Ключ",
+        help_text="Задача с ключом не ставится, пока в очереди есть "
+        "задача с тем же ключом",
+    )
+    priority = models.SmallIntegerField(default=0, verbose_name="Приоритет")
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=QUEUED, verbose_name="Статус"
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попыток")
+    max_attempts = models.PositiveIntegerField(
+        default=5, verbose_name="Максимум попыток"
+    )
+    run_at = models.DateTimeField(
+        verbose_name="Запуск не раньше",
+        help_text="Для выполняемой задачи - срок, после которого ее может "
+        "забрать другой обработчик",
+    )
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Создана")
+
+    class Meta:
+        verbose_name = "задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = (
+            models.Index(
+                fields=("status", "run_at"), name="job_status_run_at"
+            ),
+        )
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,115 @@
+"""Проверка запросов к БД в рамках одного запроса к сайту.
+
+Находит N+1: одинаковые по форме SELECT, повторенные не меньше
+QUERY_REPEAT_THRESHOLD раз, - и проверяет бюджет запросов, объявленный
+у представления атрибутом query_budget (число или словарь по действиям
+вьюсета DRF). Режим задает настройка QUERY_INSPECTION: None - проверка
+выключена, "warn" - предупреждение в лог, "raise" - исключение. Тестовый
+раннер (core.test_runner) включает режим "raise", поэтому превышение
+бюджета проваливает тест.
+"""
+
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+
+from core.utils import get_view_class
+
+logger = logging.getLogger(__name__)
+
+WARN = "warn"
+RAISE = "raise"
+
+IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+class QueryInspectionError(AssertionError):
+    pass
+
+
+class NPlusOneDetected(QueryInspectionError):
+    pass
+
+
+class QueryBudgetExceeded(QueryInspectionError):
+    pass
+
+
+def query_shape(sql):
+    """SQL без значений: списки IN любой длины и числа схлопываются."""
+
+    return NUMBER_RE.sub("N", IN_LIST_RE.sub("(...)", sql))
+
+
+class QueryLog:
+    """Обертка для connection.execute_wrapper, запоминающая формы
+    запросов.
+    """
+
+    def __init__(self):
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.shapes[query_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return sum(self.shapes.values())
+
+    def repeated(self, threshold):
+        """Формы SELECT, выполненные не меньше threshold раз."""
+
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold and shape.lstrip().startswith("SELECT")
+        ]
+
+
+def get_budget(match, method):
+    """Бюджет запросов представления, найденного резолвером, или None."""
+
+    if match is None:
+        return None
+    view = match.func
+    budget = getattr(get_view_class(view), "query_budget", None)
+    if isinstance(budget, dict):
+        actions = getattr(view, "actions", None) or {}
+        return budget.get(actions.get(method.lower()))
+    return budget
+
+
+def report(message, *args):
+    if settings.QUERY_INSPECTION == RAISE:
+        return message % args
+    logger.warning(message, *args)
+    return None
+
+
+def inspect(request, log):
+    """Проверяет запросы, выполненные при обработке request."""
+
+    view_name = (
+        request.resolver_match.view_name if request.resolver_match else "-"
+    )
+    repeated = log.repeated(settings.QUERY_REPEAT_THRESHOLD)
+    if repeated:
+        shape, count = repeated[0]
+        error = report(
+            "%s: запрос выполнен %s раз, похоже на N+1: %s",
+            view_name, count, shape,
+        )
+        if error:
+            raise NPlusOneDetected(error)
+
+    budget = get_budget(request.resolver_match, request.method)
+    if budget is not None and len(log) > budget:
+        error = report(
+            "%s: %s запросов к БД при бюджете %s",
+            view_name, len(log), budget,
+        )
+        if error:
+            raise QueryBudgetExceeded(error)
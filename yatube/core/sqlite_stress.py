@@ -0,0 +1,107 @@
+"""Нагрузочная проверка SQLite конкурентной записью.
+
+Несколько потоков выполняют транзакции вида "прочитать счетчик, записать
+новое значение и строку журнала" - так устроена, например, смена оценки
+поста. Замеряются успешные транзакции в секунду и ошибки "database is
+locked". Бэкенды сравниваются на одном временном файле базы, рабочая
+база не используется.
+"""
+
+import itertools
+import os
+import tempfile
+import threading
+import time
+
+from django.db import OperationalError, connections, transaction
+
+DEFAULT_ENGINE = "django.db.backends.sqlite3"
+TUNED_ENGINE = "core.backends.sqlite3"
+
+_aliases = itertools.count()
+
+
+def _worker(alias, transactions, results, barrier):
+    ok = locked = 0
+    barrier.wait()
+    for _ in range(transactions):
+        try:
+            with transaction.atomic(using=alias):
+                with connections[alias].cursor() as cursor:
+                    cursor.execute("SELECT value FROM stress WHERE id = 1")
+                    value = cursor.fetchone()[0]
+                    cursor.execute(
+                        "UPDATE stress SET value = %s WHERE id = 1",
+                        [value + 1],
+                    )
+                    cursor.execute(
+                        "INSERT INTO stress_log (value) VALUES (%s)", [value]
+                    )
+            ok += 1
+        except OperationalError as error:
+            if "locked" not in str(error):
+                raise
+            locked += 1
+    connections[alias].close()
+    results.append((ok, locked))
+
+
+def run(engine, threads=8, transactions=50, timeout=1.0):
+    """Запускает нагрузку на бэкенде engine. timeout - ожидание
+    блокировки в секундах для обоих бэкендов.
+
+    Возвращает словарь: успешные транзакции, ошибки блокировки,
+    транзакции в секунду.
+    """
+
+    alias = f"sqlite_stress_{next(_aliases)}"
+    with tempfile.TemporaryDirectory() as directory:
+        connections.databases[alias] = {
+            "ENGINE": engine,
+            "NAME": os.path.join(directory, "stress.sqlite3"),
+            "OPTIONS": (
+                {"pragmas": {"busy_timeout": int(timeout * 1000)}}
+                if engine == TUNED_ENGINE else {"timeout": timeout}
+            ),
+        }
+        connections.ensure_defaults(alias)
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(
+                    "CREATE TABLE stress "
+                    "(id INTEGER PRIMARY KEY, value INTEGER)"
+                )
+                cursor.execute(
+                    "CREATE TABLE stress_log "
+                    "(id INTEGER PRIMARY KEY, value INTEGER)"
+                )
+                cursor.execute("INSERT INTO stress VALUES (1, 0)")
+            connections[alias].close()
+
+            results = []
+            barrier = threading.Barrier(threads)
+            workers = [
+                threading.Thread(
+                    target=_worker,
+                    args=(alias, transactions, results, barrier),
+                )
+                for _ in range(threads)
+            ]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+
+    ok = sum(result[0] for result in results)
+    return {
+        "engine": engine,
+        "ok": ok,
+        "locked": sum(result[1] for result in results),
+        "per_second": ok / elapsed,
+    }
@@ -0,0 +1,97 @@
+"""Хранилище медиафайлов с адресацией по содержимому.
+
+Имя файла - sha256 его содержимого, поэтому одинаковые загрузки хранятся
+один раз. Сколько объектов ссылается на файл, учитывает модель Blob:
+модели вызывают acquire() при появлении ссылки и release() при ее
+исчезновении, а файл без ссылок удаляется после коммита транзакции,
+о чем сообщает сигнал blob_released.
+"""
+
+import hashlib
+import logging
+import os
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils.deconstruct import deconstructible
+
+from .models import Blob
+
+logger = logging.getLogger(__name__)
+
+BLOB_ROOT = "blobs"
+
+blob_released = Signal(providing_args=["name"])
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Сохраняет загрузку под именем из хэша содержимого.
+
+    Путь из upload_to не используется, от имени загрузки остается только
+    расширение.
+    """
+
+    def blob_name(self, content, extension):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        return os.path.join(
+            BLOB_ROOT, hexdigest[:2], hexdigest[2:4], hexdigest + extension
+        )
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        extension = os.path.splitext(name)[1].lower()
+        name = self.blob_name(content, extension)
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+
+storage = ContentAddressedStorage()
+
+
+def acquire(name):
+    """Учитывает новую ссылку на файл."""
+
+    if Blob.objects.filter(name=name).update(references=F("references") + 1):
+        return
+    try:
+        with transaction.atomic():
+            Blob.objects.create(name=name, references=1)
+    except IntegrityError:
+        Blob.objects.filter(name=name).update(
+            references=F("references") + 1
+        )
+
+
+def release(name):
+    """Снимает ссылку на файл и удаляет файл, если ссылок не осталось."""
+
+    with transaction.atomic():
+        Blob.objects.filter(name=name, references__gt=0).update(
+            references=F("references") - 1
+        )
+        deleted, _ = Blob.objects.filter(name=name, references=0).delete()
+    if deleted:
+        transaction.on_commit(lambda: reclaim(name))
+
+
+def reclaim(name):
+    # Ссылка могла появиться снова, пока ждали коммита.
+    if Blob.objects.filter(name=name).exists():
+        return
+    try:
+        storage.delete(name)
+    except (OSError, SuspiciousFileOperation):
+        # Имя могли записать в поле в обход хранилища.
+        logger.warning("Не удалось удалить файл %s", name, exc_info=True)
+    blob_released.send(sender=Blob, name=name)
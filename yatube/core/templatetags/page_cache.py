@@ -0,0 +1,19 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from core.custom_middleware.page_cache import render_fragment
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def personal_include(context, template_name, **params):
+    """Персональная часть страницы, которую кэш страниц рендерит заново
+
+    для каждого пользователя. Параметры должны быть строками.
+    """
+
+    params = {name: str(value) for name, value in params.items()}
+    return mark_safe(
+        render_fragment(context["request"], template_name, params)
+    )
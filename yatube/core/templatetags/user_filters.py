@@ -8,3 +8,13 @@ def addclass(field, css):
     """Шаблон добавления класса"""
 
     return field.as_widget(attrs={"class": css})
+
+
+@register.simple_tag(takes_context=True)
+def query_replace(context, **params):
+    """Строка запроса текущей страницы с замененными параметрами."""
+
+    query = context["request"].GET.copy()
+    for key, value in params.items():
+        query[key] = value
+    return query.urlencode()
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from core.queries import RAISE
+
+
+class QueryInspectingRunner(DiscoverRunner):
+    """Тесты падают при N+1 и превышении бюджета запросов
+    (core.queries).
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_inspection = settings.QUERY_INSPECTION
+        settings.QUERY_INSPECTION = RAISE
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_INSPECTION = self._query_inspection
+        super().teardown_test_environment(**kwargs)
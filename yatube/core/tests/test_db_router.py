@@ -0,0 +1,117 @@
+from api.views import GroupViewSet
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from posts.models import Post, User
+from posts.views import (
+    GroupListView,
+    PostGroupView,
+    PostsView,
+    ShowPostView,
+)
+
+from core.custom_middleware.db_routing import ReplicaRoutingMiddleware
+from core.db_router import PIN_COOKIE, ReplicaRouter
+
+GROUP_LIST = GroupViewSet.as_view({"get": "list"})
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_PIN_SECONDS=10)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def request(self, method="get", view=GROUP_LIST, cookies=None,
+                write=False):
+        """Проводит запрос через middleware и возвращает ответ, в
+        атрибуте databases которого - базы, выбранные роутером для чтения
+        поста и пользователя."""
+
+        request = getattr(self.factory, method)("/")
+        request.user = AnonymousUser()
+        request.COOKIES.update(
+            {name: morsel.value for name, morsel in (cookies or {}).items()}
+        )
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            if write:
+                self.router.db_for_write(Post)
+            response = HttpResponse()
+            response.databases = {
+                "post": self.router.db_for_read(Post),
+                "user": self.router.db_for_read(User),
+            }
+            return response
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(request)
+
+    def test_safe_request_reads_from_replica(self):
+        """GET к представлению с replica_reads читает с реплики,
+        пользователи - из основной базы."""
+
+        databases = self.request().databases
+        self.assertEqual(databases["post"], "replica", "Чтение не с реплики")
+        self.assertEqual(
+            databases["user"], "default", "Пользователь прочитан с реплики"
+        )
+
+    def test_primary_reads(self):
+        """Небезопасный метод и представление без replica_reads читают из
+        основной базы."""
+
+        self.assertEqual(
+            self.request(method="post").databases["post"], "default"
+        )
+        self.assertEqual(
+            self.request(view=ShowPostView.as_view()).databases["post"],
+            "default",
+        )
+
+    def test_list_pages_read_from_replica(self):
+        """Списки постов и групп читаются с реплики."""
+
+        for view in (PostsView, PostGroupView, GroupListView):
+            with self.subTest(view=view.__name__):
+                response = self.request(view=view.as_view())
+                self.assertEqual(response.databases["post"], "replica")
+
+    def test_outside_request_reads_primary(self):
+        """Вне запроса чтение идет из основной базы."""
+
+        self.assertEqual(self.router.db_for_read(Post), "default")
+
+    def test_read_your_writes(self):
+        """После записи чтения клиента идут в основную базу, чтения
+
+        других клиентов - с реплики.
+        """
+
+        response = self.request(write=True)
+        self.assertEqual(
+            response.databases["post"], "default",
+            "Чтение после записи с реплики",
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(
+            self.request(cookies=response.cookies).databases["post"],
+            "default",
+            "Клиент не закреплен за основной базой",
+        )
+        self.assertEqual(self.request().databases["post"], "replica")
+
+    def test_pin_expires(self):
+        """Метка записи действует REPLICA_PIN_SECONDS."""
+
+        cookies = self.request(write=True).cookies
+        with override_settings(REPLICA_PIN_SECONDS=-1):
+            databases = self.request(cookies=cookies).databases
+        self.assertEqual(databases["post"], "replica")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Без реплик все чтения идут в основную базу."""
+
+        self.assertEqual(self.request().databases["post"], "default")
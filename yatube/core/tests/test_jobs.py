@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+calls = []
+
+
+def remember(value):
+    calls.append(value)
+
+
+def explode(value):
+    raise ValueError(f"Ошибка задачи {value}")
+
+
+class JobsTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_by_priority(self):
+        """Задачи выполняются по убыванию приоритета и удаляются."""
+
+        jobs.enqueue(remember, "low", priority=jobs.LOW)
+        jobs.enqueue(remember, "normal")
+        jobs.enqueue(remember, "high", priority=jobs.HIGH)
+
+        for job_id in jobs.claim(10):
+            jobs.perform(job_id)
+
+        self.assertEqual(calls, ["high", "normal", "low"])
+        self.assertFalse(Job.objects.exists(), "Выполненные задачи остались")
+
+    def test_delayed_job_not_claimed(self):
+        """Отложенная задача не забирается до своего времени."""
+
+        jobs.enqueue(
+            remember, 1, run_at=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(jobs.claim(10), [])
+
+    def test_job_key_deduplicates(self):
+        """Задача с ключом не дублируется, пока ждет в очереди; более
+        ранний запуск переносит ожидающую."""
+
+        later = timezone.now() + timedelta(minutes=5)
+        first = jobs.enqueue(remember, 1, key="key", run_at=later)
+        second = jobs.enqueue(remember, 2, key="key")
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertLess(Job.objects.get().run_at, later)
+
+    def test_failed_job_retried_then_dead(self):
+        """Упавшая задача повторяется с растущей задержкой, после
+        max_attempts попыток остается со статусом DEAD."""
+
+        job = jobs.enqueue(explode, 1, max_attempts=3)
+        delays = []
+        for attempt in range(1, 4):
+            started = timezone.now()
+            Job.objects.filter(pk=job.pk).update(run_at=started)
+            self.assertFalse(jobs.perform(jobs.claim(1)[0]))
+            job.refresh_from_db()
+            self.assertEqual(job.attempts, attempt)
+            delays.append(job.run_at - started)
+
+        self.assertEqual(job.status, Job.DEAD)
+        self.assertIn("Ошибка задачи 1", job.last_error)
+        self.assertLess(delays[0], delays[1], "Задержка не растет")
+        self.assertEqual(jobs.claim(10), [], "Задача DEAD снова забрана")
+
+        jobs.requeue(Job.objects.filter(pk=job.pk))
+        self.assertEqual(jobs.claim(10), [job.pk])
+
+    def test_claimed_job_leased(self):
+        """Забранная задача не забирается повторно до истечения LEASE."""
+
+        job = jobs.enqueue(remember, 1)
+        self.assertEqual(jobs.claim(10), [job.pk])
+        self.assertEqual(jobs.claim(10), [])
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_mode(self):
+        """В режиме JOBS_EAGER задача выполняется сразу."""
+
+        jobs.enqueue(remember, 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail as outbox
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from posts.forms import FeedbackForm
+
+from core import mail
+from core.models import Job, OutgoingEmail
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04"
+    b"\x01\x0a\x00\x01\x00\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02"
+    b"\x02\x4c\x01\x00\x3b"
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MAIL_WORKERS=1)
+class MailQueueTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def enqueue(self, subject="Тема", image=None):
+        return mail.enqueue(
+            subject, "Текст", "from@mail.ru", ["to@mail.ru"], image=image
+        )
+
+    def test_feedback_is_queued(self):
+        """Форма обратной связи ставит письмо в очередь, а не отправляет
+        его, изображение сохраняется файлом."""
+
+        form = FeedbackForm()
+        form.cleaned_data = {
+            "name": "Имя",
+            "email": "mail@mail.ru",
+            "description": "Описание",
+            "message": "Текст",
+            "image": SimpleUploadedFile("small.gif", SMALL_GIF, "image/gif"),
+        }
+        email = form.save()
+
+        self.assertEqual(len(outbox.outbox), 0, "Письмо отправлено сразу")
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertTrue(
+            Job.objects.filter(key=mail.JOB_KEY).exists(),
+            "Задача отправки не поставлена",
+        )
+        self.assertTrue(
+            os.path.exists(email.image.path), "Изображение не сохранено"
+        )
+
+    def test_process_sends_with_image(self):
+        """Обработчик отправляет письмо с изображением и удаляет файл."""
+
+        email = self.enqueue(
+            image=SimpleUploadedFile("small.gif", SMALL_GIF, "image/gif")
+        )
+        path = email.image.path
+
+        self.assertEqual(mail.process(workers=1), 1)
+
+        self.assertEqual(len(outbox.outbox), 1)
+        message = outbox.outbox[0]
+        self.assertEqual(message.to, ["to@mail.ru"])
+        self.assertEqual(
+            message.attachments[0]["Content-ID"], mail.IMAGE_CONTENT_ID
+        )
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.SENT)
+        self.assertFalse(os.path.exists(path), "Файл изображения не удален")
+
+    def test_batch_uses_one_connection(self):
+        """Письма пачки отправляются через одно соединение."""
+
+        for index in range(3):
+            self.enqueue(f"Тема {index}")
+
+        with mock.patch(
+            "core.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            self.assertEqual(mail.process(batch_size=10, workers=1), 3)
+        self.assertEqual(get_connection.call_count, 1)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        """Неудачная отправка откладывается с растущей задержкой, после
+        MAX_ATTEMPTS попыток письмо помечается неотправленным."""
+
+        email = self.enqueue()
+        delays = []
+        with mock.patch(
+            "django.core.mail.EmailMessage.send",
+            side_effect=ConnectionError("SMTP недоступен"),
+        ):
+            for attempt in range(1, mail.MAX_ATTEMPTS + 1):
+                started = timezone.now()
+                mail.process(workers=1)
+                email.refresh_from_db()
+                self.assertEqual(email.attempts, attempt)
+                if attempt < mail.MAX_ATTEMPTS:
+                    self.assertEqual(email.status, OutgoingEmail.PENDING)
+                    delays.append(email.next_attempt - started)
+                    OutgoingEmail.objects.filter(pk=email.pk).update(
+                        next_attempt=started
+                    )
+
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+        self.assertIn("SMTP недоступен", email.last_error)
+        self.assertEqual(delays, sorted(delays), "Задержка не растет")
+        self.assertGreaterEqual(delays[0], mail.BACKOFF)
+
+    def test_send_queued_reschedules_retries(self):
+        """Задача отправки ставит себя на время повторной попытки."""
+
+        self.enqueue()
+        Job.objects.all().delete()
+        with mock.patch(
+            "django.core.mail.EmailMessage.send",
+            side_effect=ConnectionError("SMTP недоступен"),
+        ):
+            mail.send_queued()
+
+        email = OutgoingEmail.objects.get()
+        job = Job.objects.get(key=mail.JOB_KEY)
+        self.assertEqual(job.run_at, email.next_attempt)
+
+    def test_claimed_email_not_sent_twice(self):
+        """Забранное обработчиком письмо не забирается повторно до
+        истечения LEASE."""
+
+        email = self.enqueue()
+        self.assertEqual(mail.claim(10), [email])
+        self.assertEqual(mail.claim(10), [])
+
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            next_attempt=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(mail.claim(10), [email])
@@ -0,0 +1,111 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, Post, User
+
+from core.cache_backends import InstrumentedCache
+from core.metrics import RequestMetrics, current, registry
+
+
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_user")
+        cls.test_staff = User.objects.create_user("test_staff", is_staff=True)
+        cls.test_group = Group.objects.create(
+            title="test_group", slug="test_slug", description="test"
+        )
+        Post.objects.create(
+            text="Тестовый пост", author=cls.test_user, group=cls.test_group
+        )
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.test_staff)
+
+    def test_metrics_server_timing_header(self):
+        """Ответ содержит заголовок Server-Timing с временем БД и шаблона."""
+
+        response = self.client.get(reverse("posts:index"))
+        header = response["Server-Timing"]
+        for metric in ("db;dur=", "tpl;dur=", "cache;desc=", "total;dur="):
+            self.assertIn(metric, header, f"В Server-Timing нет {metric}")
+
+    def test_metrics_recorded_by_view_name(self):
+        """Метрики копятся по имени URL."""
+
+        self.client.get(reverse("posts:index"))
+        self.client.get(reverse("posts:index"))
+        self.client.get("/no-such-page/")
+
+        stats = registry.snapshot()["posts:index"]
+        self.assertEqual(stats["count"], 2, "Запросы не посчитаны")
+        self.assertGreater(stats["db_queries"], 0, "Запросы к БД не учтены")
+        self.assertGreater(stats["template_time"], 0, "Рендер не учтен")
+        self.assertGreater(stats["cache_hits"], 0, "Кэш страницы не учтен")
+        self.assertEqual(
+            list(stats["buckets"].values())[-1],
+            2,
+            "Корзины гистограммы не накопительные",
+        )
+
+    def test_metrics_cache_wrapper_counts_any_backend(self):
+        """Обертка кэша учитывает get и get_many настоящего бэкенда."""
+
+        wrapped = InstrumentedCache(
+            "metrics-test",
+            {
+                "OPTIONS": {
+                    "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+                }
+            },
+        )
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        try:
+            wrapped.set("key", 1)
+            wrapped.get("key")
+            wrapped.get_many(["key", "other"])
+        finally:
+            current.reset(token)
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (0, 3))
+
+    def test_metrics_staff_only(self):
+        """Метрики доступны только персоналу."""
+
+        for name in ("core:metrics", "core:metrics_prometheus"):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 302)
+                response = self.staff_client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+    def test_metrics_prometheus_format(self):
+        """Экспорт в формате Prometheus содержит гистограмму и счетчики."""
+
+        self.client.get(reverse("posts:index"))
+        content = self.staff_client.get(
+            reverse("core:metrics_prometheus")
+        ).content.decode()
+
+        self.assertIn(
+            "# TYPE yatube_request_duration_seconds histogram", content
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            content,
+        )
+        self.assertIn(
+            "yatube_request_duration_seconds_bucket"
+            '{view="posts:index",le="+Inf"} 1',
+            content,
+        )
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', content)
+        self.assertIn(
+            'yatube_cache_requests_total{view="posts:index",result="hit"}',
+            content,
+        )
@@ -0,0 +1,45 @@
+from django.test import TestCase, override_settings
+from posts.models import Post, User
+
+from core.queries import NPlusOneDetected, QueryBudgetExceeded, query_shape
+
+
+@override_settings(
+    ROOT_URLCONF="core.tests.urls",
+    QUERY_INSPECTION="raise",
+    QUERY_REPEAT_THRESHOLD=3,
+)
+class QueryInspectionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(3):
+            author = User.objects.create_user(f"test_author_{index}")
+            Post.objects.create(text="Тестовый пост", author=author)
+
+    def test_query_shape_ignores_values(self):
+        """Форма запроса не зависит от длины списка IN и чисел."""
+
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21"),
+            query_shape("SELECT * FROM t WHERE id IN (%s) LIMIT 1"),
+        )
+
+    def test_repeated_queries_detected(self):
+        """Одинаковые запросы на каждую строку считаются N+1."""
+
+        with self.assertRaises(NPlusOneDetected):
+            self.client.get("/authors/")
+
+    def test_query_budget_exceeded(self):
+        """Превышение бюджета представления вызывает ошибку."""
+
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/count/")
+
+    @override_settings(QUERY_INSPECTION="warn")
+    def test_warn_mode_logs(self):
+        """В режиме warn проблема только пишется в лог."""
+
+        with self.assertLogs("core.queries", "WARNING"):
+            response = self.client.get("/count/")
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.test import SimpleTestCase
+
+from core import sqlite_stress
+from core.backends.sqlite3.base import PRAGMAS
+
+
+class SQLiteBackendTest(SimpleTestCase):
+    def open(self, options=None):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        alias = "sqlite_backend_test"
+        connections.databases[alias] = {
+            "ENGINE": sqlite_stress.TUNED_ENGINE,
+            "NAME": os.path.join(directory.name, "test.sqlite3"),
+            "OPTIONS": options or {},
+        }
+        connections.ensure_defaults(alias)
+        self.addCleanup(connections.databases.pop, alias)
+        self.addCleanup(connections.__delitem__, alias)
+        self.addCleanup(lambda: connections[alias].close())
+        return connections[alias]
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """При подключении включаются WAL и остальные PRAGMA."""
+
+        connection = self.open()
+        self.assertEqual(
+            self.pragma(connection, "journal_mode"), "wal",
+            "Журнал не переключен в WAL",
+        )
+        self.assertEqual(
+            self.pragma(connection, "busy_timeout"), PRAGMAS["busy_timeout"],
+            "Не задано ожидание блокировки",
+        )
+        self.assertEqual(
+            self.pragma(connection, "synchronous"), 1,
+            "synchronous не равен NORMAL",
+        )
+
+    def test_pragmas_override(self):
+        """PRAGMA переопределяются через OPTIONS."""
+
+        connection = self.open({"pragmas": {"busy_timeout": 100}})
+        self.assertEqual(
+            self.pragma(connection, "busy_timeout"), 100,
+            "Значение из OPTIONS не применено",
+        )
+
+    def test_unknown_transaction_mode(self):
+        """Неизвестный режим транзакций - ошибка конфигурации."""
+
+        connection = self.open({"transaction_mode": "LAZY"})
+        with self.assertRaises(ImproperlyConfigured):
+            connection.transaction_mode
+
+    def test_concurrent_writes_without_lock_errors(self):
+        """Под конкурентной записью настроенный бэкенд не получает
+        "database is locked", стандартный - не лучше него."""
+
+        tuned = sqlite_stress.run(
+            sqlite_stress.TUNED_ENGINE, threads=4, transactions=20
+        )
+        default = sqlite_stress.run(
+            sqlite_stress.DEFAULT_ENGINE, threads=4, transactions=20
+        )
+        self.assertEqual(tuned["locked"], 0, "Есть ошибки блокировки")
+        self.assertEqual(tuned["ok"], 80, "Не все транзакции выполнены")
+        self.assertGreaterEqual(default["locked"], tuned["locked"])
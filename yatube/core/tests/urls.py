@@ -0,0 +1,22 @@
+from django.http import HttpResponse
+from django.urls import path
+from django.views import View
+from posts.models import Post
+
+
+def authors(request):
+    names = [post.author.username for post in Post.objects.all()]
+    return HttpResponse(" ".join(names))
+
+
+class CountView(View):
+    query_budget = 1
+
+    def get(self, request):
+        return HttpResponse(Post.objects.count() + Post.objects.count())
+
+
+urlpatterns = [
+    path("authors/", authors, name="authors"),
+    path("count/", CountView.as_view(), name="count"),
+]
@@ -0,0 +1,5 @@
+def get_view_class(view):
+    """Класс представления за функцией из as_view() (Django или DRF) или
+    None для обычной функции."""
+
+    return getattr(view, "view_class", None) or getattr(view, "cls", None)
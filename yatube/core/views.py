@@ -1,5 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
 
+from core.metrics import registry
+
 
 def page_not_found(request, exception):
     return render(request, "core/404.html", {"path": request.path}, status=404)
@@ -15,3 +19,15 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=""):
     return render(request, "core/403csrf.html")
+
+
+@staff_member_required
+def metrics(request):
+    return JsonResponse(registry.snapshot())
+
+
+@staff_member_required
+def metrics_prometheus(request):
+    return HttpResponse(
+        registry.prometheus(), content_type="text/plain; version=0.0.4"
+    )
@@ -1,12 +1,40 @@
 from django.contrib import admin
 
+from . import search
 from .models import Comment, Group, Post
+from .utils import ApproximateCountPaginator
+
+
+class ApproximateCountMixin:
+    """Список без полного COUNT(*): приблизительный пагинатор и без
+    подсчета всех объектов рядом с результатами поиска."""
+
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+
+class FullTextSearchMixin:
+    """Поиск в админке через полнотекстовый индекс вместо LIKE."""
+
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        backend = search.get_backend()
+        return (
+            backend.filter_queryset(queryset, self.search_kind, search_term),
+            False,
+        )
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    ApproximateCountMixin, FullTextSearchMixin, admin.ModelAdmin
+):
     list_display = ("pk", "text", "created", "author", "group", "image")
-    search_fields = ("text",)
+    search_fields = ("title", "text")
+    search_kind = search.POST
     list_filter = ("created",)
     empty_value_display = "-пусто-"
     list_editable = ("group",)
@@ -41,7 +69,9 @@ class GroupAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(
+    ApproximateCountMixin, FullTextSearchMixin, admin.ModelAdmin
+):
     list_display = (
         "pk",
         "author",
@@ -52,6 +82,7 @@ class CommentAdmin(admin.ModelAdmin):
         "is_child",
     )
     search_fields = ("text",)
+    search_kind = search.COMMENT
     list_filter = ("created",)
     empty_value_display = "-пусто-"
     list_select_related = ("author", "child")
@@ -0,0 +1,241 @@
+"""Замеры производительности страниц и API на синтетических данных.
+
+seed() наполняет базу пользователями, группами, постами, деревьями
+комментариев, подписками и оценками с перекосом (немногие авторы пишут
+большую часть постов), run() прогоняет сценарии SCENARIOS тестовым
+клиентом и для каждого считает время ответа, число запросов к БД и пик
+выделенной памяти. Результат - словарь, который команда benchmark пишет
+в JSON; compare() сравнивает два таких результата.
+"""
+
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+from mixer.backend.django import mixer
+
+from . import rating, timeline
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Размер данных при scale = 1.
+BASE_SIZES = {
+    "users": 50,
+    "groups": 5,
+    "posts": 500,
+    "comments": 1500,
+    "follows": 5,
+    "ratings": 1000,
+}
+REPLY_SHARE = 0.4
+
+Scenario = namedtuple("Scenario", "name path login")
+
+SCENARIOS = (
+    Scenario("index", lambda data: "/", False),
+    Scenario("group", lambda data: f"/group/{data['group']}/", False),
+    Scenario("post", lambda data: f"/posts/{data['post']}/", False),
+    Scenario("follow", lambda data: "/follow/", True),
+    Scenario("profile", lambda data: f"/profile/{data['author']}/", False),
+    Scenario("api_posts", lambda data: "/api/v1/posts/?limit=10", True),
+    Scenario(
+        "api_post", lambda data: f"/api/v1/posts/{data['post']}/", True
+    ),
+    Scenario(
+        "api_comments",
+        lambda data: f"/api/v1/posts/{data['post']}/comments/",
+        True,
+    ),
+    Scenario("api_groups", lambda data: "/api/v1/groups/", True),
+    Scenario("api_follow", lambda data: "/api/v1/follow/", True),
+)
+
+
+def sizes(scale):
+    return {
+        name: max(1, round(size * scale)) for name, size in BASE_SIZES.items()
+    }
+
+
+def skewed(rng, population, k):
+    """Выборка с весами 1/ранг: первые элементы встречаются чаще."""
+
+    weights = [1 / rank for rank in range(1, len(population) + 1)]
+    return rng.choices(population, weights=weights, k=k)
+
+
+def seed(scale=1, seed=0):
+    """Наполняет базу и возвращает объекты для адресов сценариев."""
+
+    rng = random.Random(seed)
+    fake = Faker("ru_RU")
+    fake.seed_instance(seed)
+    counts = sizes(scale)
+
+    users = mixer.cycle(counts["users"]).blend(
+        User, username=mixer.sequence("bench_user_{0}")
+    )
+    groups = mixer.cycle(counts["groups"]).blend(
+        Group, slug=mixer.sequence("bench-group-{0}")
+    )
+
+    posts = []
+    for author in skewed(rng, users, counts["posts"]):
+        posts.append(
+            Post.objects.create(
+                title=fake.sentence(nb_words=4)[:255],
+                text=fake.text(max_nb_chars=600),
+                author=author,
+                group=rng.choice(groups + [None]),
+            )
+        )
+
+    comments = []
+    for post in skewed(rng, posts, counts["comments"]):
+        thread = [c for c in comments[-20:] if c.post_id == post.pk]
+        parent = (
+            rng.choice(thread)
+            if thread and rng.random() < REPLY_SHARE else None
+        )
+        comments.append(
+            Comment.objects.create(
+                post=post,
+                author=rng.choice(users),
+                text=fake.text(max_nb_chars=200),
+                child=parent,
+            )
+        )
+
+    for user in users:
+        following = set(skewed(rng, users, counts["follows"])) - {user}
+        Follow.objects.bulk_create(
+            [Follow(user=user, following=author) for author in following],
+            ignore_conflicts=True,
+        )
+        timeline.build_timeline(user.id)
+
+    for _ in range(counts["ratings"]):
+        rating.set_rating(
+            rng.choice(users),
+            skewed(rng, posts, 1)[0],
+            rng.choice((rating.LIKE, rating.DISLIKE)),
+        )
+
+    busiest_post = max(posts, key=lambda post: post.comments.count())
+    return {
+        "user": users[0],
+        "author": users[0].username,
+        "group": groups[0].slug,
+        "post": busiest_post.pk,
+        "counts": counts,
+    }
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def measure(client, path, repeat, warm_cache=False):
+    """Время ответа, запросы к БД и пик памяти для одного адреса.
+
+    Без warm_cache кэш очищается перед каждым запросом, то есть
+    замеряется полная обработка, а не выдача из кэша страниц.
+    """
+
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        if not warm_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise ValueError(f"{path}: код ответа {response.status_code}")
+        queries.append(len(captured))
+
+    # Память меряется отдельным запросом: tracemalloc замедляет код.
+    if not warm_cache:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        client.get(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "path": path,
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "min_ms": min(timings) * 1000,
+        "queries": max(queries),
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def run(scale=1, repeat=20, seed_value=0, warm_cache=False, names=None):
+    """Наполняет текущую базу и замеряет сценарии."""
+
+    data = seed(scale, seed_value)
+    anonymous = Client()
+    user = Client()
+    user.force_login(data["user"])
+
+    results = {}
+    with override_settings(QUERY_INSPECTION=None):
+        for scenario in SCENARIOS:
+            if names and scenario.name not in names:
+                continue
+            client = user if scenario.login else anonymous
+            results[scenario.name] = measure(
+                client, scenario.path(data), repeat, warm_cache
+            )
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": scale,
+            "repeat": repeat,
+            "seed": seed_value,
+            "warm_cache": warm_cache,
+            "counts": data["counts"],
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "results": results,
+    }
+
+
+def compare(previous, current, threshold=0.2):
+    """Сценарии, где медиана времени выросла больше чем на threshold или
+    стало больше запросов. Список (сценарий, метрика, было, стало).
+    """
+
+    regressions = []
+    for name, result in current["results"].items():
+        before = previous["results"].get(name)
+        if before is None:
+            continue
+        if result["median_ms"] > before["median_ms"] * (1 + threshold):
+            regressions.append(
+                (name, "median_ms", before["median_ms"], result["median_ms"])
+            )
+        if result["queries"] > before["queries"]:
+            regressions.append(
+                (name, "queries", before["queries"], result["queries"])
+            )
+    return regressions
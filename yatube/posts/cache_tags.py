@@ -0,0 +1,31 @@
+"""Теги версионированного кэша (core.cache) для объектов posts."""
+
+POSTS = "posts"
+GROUPS = "groups"
+
+
+def group(group_id):
+    return f"group:{group_id}"
+
+
+def author(user_id):
+    return f"author:{user_id}"
+
+
+def post(post_id):
+    return f"post:{post_id}"
+
+
+def feed(user_id):
+    return f"feed:{user_id}"
+
+
+def for_post(instance):
+    """Теги страниц, на которых выводится пост."""
+
+    return (
+        POSTS,
+        post(instance.pk),
+        author(instance.author_id),
+        group(instance.group_id),
+    )
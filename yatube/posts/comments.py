@@ -0,0 +1,82 @@
+"""Дерево комментариев на материализованном пути.
+
+Каждый комментарий хранит путь из id предков (Comment.path) и ссылку на
+корень треда (Comment.thread), поэтому треды страницы загружаются одним
+запросом с сортировкой по пути, а вложенность собирается за один проход.
+
+Ответы в треде пронумерованы в порядке добавления (Comment.position).
+Родитель всегда добавлен раньше ответа, поэтому первые N ответов треда -
+замкнутое поддерево: на странице поста показываются только они, остальное
+догружается по частям через API.
+"""
+
+from .models import Comment
+
+REPLIES_PREVIEW = 3
+
+
+class CommentNode:
+    """Комментарий и его ответы, уже разложенные по уровням."""
+
+    __slots__ = ("comment", "replies")
+
+    def __init__(self, comment):
+        self.comment = comment
+        self.replies = []
+
+    @property
+    def has_more_replies(self):
+        return self.comment.replies_count > REPLIES_PREVIEW
+
+
+def build_tree(comments):
+    """Собирает вложенную структуру из комментариев, отсортированных по
+
+    пути. Ответы, родитель которых не загружен, пропускаются.
+    """
+
+    nodes = {}
+    roots = []
+    for comment in comments:
+        node = CommentNode(comment)
+        nodes[comment.pk] = node
+        if comment.child_id is None:
+            roots.append(node)
+            continue
+        parent = nodes.get(comment.child_id)
+        if parent is not None:
+            parent.replies.append(node)
+    return roots
+
+
+def load_threads(roots, preview=REPLIES_PREVIEW):
+    """Деревья для страницы корневых комментариев в порядке страницы.
+
+    В каждом треде загружаются только первые preview ответов.
+    """
+
+    root_ids = [root.pk for root in roots]
+    comments = (
+        Comment.objects.filter(thread_id__in=root_ids, position__lte=preview)
+        .select_related("author")
+        .prefetch_related("derivatives")
+        .order_by("path")
+    )
+    threads = {node.comment.pk: node for node in build_tree(comments)}
+    return [threads.get(root.pk) or CommentNode(root) for root in roots]
+
+
+def replies_after(comment, after=0):
+    """Ответы на комментарий (на любую глубину) с номером больше after,
+
+    в порядке добавления.
+    """
+
+    replies = Comment.objects.filter(
+        thread_id=comment.thread_id or comment.pk, position__gt=after
+    )
+    if comment.depth:
+        replies = replies.filter(path__startswith=comment.path).exclude(
+            pk=comment.pk
+        )
+    return replies.select_related("author").order_by("position")
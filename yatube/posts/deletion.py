@@ -0,0 +1,34 @@
+"""Удаление постов в фоне.
+
+Удаление поста каскадно удаляет комментарии, оценки, записи лент и копии
+картинок, а для каждого комментария срабатывают сигналы: поисковый
+индекс, ссылки на картинки, сброс кэша. Чтобы запрос не ждал этого, пост
+только помечается is_deleted - менеджер Post.objects его больше не
+отдает, - а удаляет его фоновая задача purge (core.jobs). Комментарии
+скрытого поста до этого остаются в поисковом индексе, но в результаты
+поиска не попадают (posts.search).
+"""
+
+from core import jobs
+from core.cache import invalidate
+
+from . import cache_tags, search
+from .models import Post
+
+
+def schedule(post):
+    """Скрывает пост и ставит его удаление в очередь."""
+
+    Post.all_objects.filter(pk=post.pk).update(is_deleted=True)
+    post.is_deleted = True
+    invalidate(*cache_tags.for_post(post))
+    search.remove(post)
+    jobs.enqueue(purge, post.pk, priority=jobs.LOW)
+
+
+def purge(post_id):
+    """Фоновая задача: удаляет скрытый пост со всеми связанными данными."""
+
+    post = Post.all_objects.filter(pk=post_id, is_deleted=True).first()
+    if post is not None:
+        post.delete()
@@ -1,10 +1,9 @@
-from email.mime.image import MIMEImage
-
 from captcha.fields import CaptchaField
 from django import forms
-from django.core.mail import EmailMessage
 from django.utils.translation import gettext_lazy as _
 
+from core import mail
+
 from .models import Comment, Post
 from .utils import ValidationMixin
 from .validators import clean_text
@@ -91,30 +90,22 @@ class FeedbackForm(forms.Form):
     )
 
     def save(self):
+        """Ставит письмо в очередь отправки (core.mail)."""
 
-        image = self.cleaned_data.get("image", None)
         name = self.cleaned_data["name"]
         msg = self.cleaned_data["message"]
-        from_email = self.cleaned_data["email"]
-        subject = self.cleaned_data["description"]
 
         body = f"""Обращение от {name}.
         Текст обращения: {msg}
         """
 
-        message = EmailMessage(
-            subject,
+        return mail.enqueue(
+            self.cleaned_data["description"],
             body,
-            from_email,
+            self.cleaned_data["email"],
             [
                 "yatubesupport@yandex.com",
             ],
+            image=self.cleaned_data.get("image", None),
+            content_subtype="html",
         )
-
-        message.content_subtype = "html"
-        if image:
-            mime_image = MIMEImage(image.read())
-            mime_image.add_header("Content-ID", "<image>")
-            message.attach(mime_image)
-
-        message.send()
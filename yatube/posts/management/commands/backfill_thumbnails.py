@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    """Постановка в очередь копий картинок, у которых их еще нет."""
+
+    help = (
+        "Ставит в очередь создание копий картинок постов и комментариев, "
+        "загруженных до появления пайплайна миниатюр."
+    )
+
+    def handle(self, *args, **options):
+        scheduled = 0
+        for model in (Post, Comment):
+            for instance in thumbnails.missing(model).iterator():
+                thumbnails.schedule(instance)
+                scheduled += 1
+
+        if options["verbosity"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Поставлено в очередь: {scheduled}")
+            )
@@ -0,0 +1,115 @@
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from posts import benchmark
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ("git", "rev-parse", "--short", "HEAD"),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Замеры страниц и API на синтетических данных (posts.benchmark)."""
+
+    help = (
+        "Наполняет временную тестовую базу синтетическими данными и "
+        "замеряет время ответа, число запросов и пик памяти страниц и API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1,
+            help="Множитель объема данных (1 - 500 постов)",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Запросов на сценарий"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=[scenario.name for scenario in benchmark.SCENARIOS],
+            help="Только указанные сценарии",
+        )
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Не очищать кэш между запросами",
+        )
+        parser.add_argument("--output", help="Файл для результатов в JSON")
+        parser.add_argument(
+            "--compare", help="JSON прошлого запуска для сравнения"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Допустимый рост медианы времени при сравнении",
+        )
+
+    def handle(self, *args, **options):
+        previous = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as previous_file:
+                previous = json.load(previous_file)
+
+        # Данные создаются во временной базе, рабочая не затрагивается.
+        setup_test_environment(debug=False)
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            report = benchmark.run(
+                scale=options["scale"],
+                repeat=options["repeat"],
+                seed_value=options["seed"],
+                warm_cache=options["warm_cache"],
+                names=options["scenarios"],
+            )
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+        report["meta"]["commit"] = current_commit()
+
+        for name, result in report["results"].items():
+            self.stdout.write(
+                f"{name:<14} {result['median_ms']:8.1f} мс "
+                f"(p95 {result['p95_ms']:.1f}) "
+                f"{result['queries']:3} запросов "
+                f"{result['peak_memory_kb']:8.0f} КБ"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+
+        if previous is not None:
+            regressions = benchmark.compare(
+                previous, report, options["threshold"]
+            )
+            for name, metric, before, after in regressions:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"{name}: {metric} {before:.1f} -> {after:.1f}"
+                    )
+                )
+            if regressions:
+                raise CommandError("Производительность ухудшилась")
+            self.stdout.write(self.style.SUCCESS("Регрессий нет"))
@@ -0,0 +1,77 @@
+import random
+import string
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.moderation import WordMatcher
+
+
+def naive_find(words, text):
+    """Прежняя проверка: подстрока для каждого слова списка."""
+
+    for word in words:
+        if word in text.lower():
+            return word
+    return None
+
+
+class Command(BaseCommand):
+    """Сравнение автомата запрещенных слов с перебором списка."""
+
+    help = (
+        "Сравнивает скорость проверки текста автоматом Ахо-Корасик "
+        "и перебором слов на случайных данных."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--words", type=int, default=20000, help="Размер списка слов"
+        )
+        parser.add_argument(
+            "--text-length",
+            type=int,
+            default=2000,
+            help="Длина проверяемого текста",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Проверок на замер"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        alphabet = string.ascii_lowercase
+        words = [
+            "".join(rng.choices(alphabet, k=rng.randint(6, 12)))
+            for _ in range(options["words"])
+        ]
+        # Текст без совпадений - худший случай для обеих проверок.
+        text = " ".join(
+            "".join(rng.choices(alphabet, k=rng.randint(2, 5)))
+            for _ in range(options["text_length"] // 4)
+        )[:options["text_length"]]
+        repeat = options["repeat"]
+
+        build = timeit.timeit(lambda: WordMatcher(words), number=1)
+        matcher = WordMatcher(words)
+        if matcher.find(text) != naive_find(words, text):
+            raise CommandError("Результаты проверок не совпадают")
+
+        naive = timeit.timeit(lambda: naive_find(words, text), number=repeat)
+        compiled = timeit.timeit(lambda: matcher.find(text), number=repeat)
+
+        self.stdout.write(
+            f"Слов: {len(words)}, длина текста: {len(text)}, "
+            f"проверок: {repeat}"
+        )
+        self.stdout.write(f"Построение автомата: {build * 1000:.1f} мс")
+        self.stdout.write(
+            f"Перебор: {naive / repeat * 1000:.3f} мс на проверку"
+        )
+        self.stdout.write(
+            f"Автомат: {compiled / repeat * 1000:.3f} мс на проверку"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Ускорение: {naive / compiled:.1f}x")
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Follow, User
+
+
+class Command(BaseCommand):
+    """Построение материализованных лент подписок."""
+
+    help = "Строит ленты подписок для пользователей, у которых их еще нет."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "usernames",
+            nargs="*",
+            help="Пользователи, для которых строить ленту (по умолчанию все)",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Перестроить уже существующие ленты",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(
+            id__in=Follow.objects.values("user_id")
+        ).order_by("id")
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+        if not options["rebuild"]:
+            users = users.filter(timeline__isnull=True)
+
+        built = 0
+        for user in users.iterator():
+            timeline.build_timeline(user.id)
+            built += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Построена лента {user.username}")
+
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS(f"Построено лент: {built}"))
@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import synthetic
+
+
+class Command(BaseCommand):
+    """Генерация синтетических данных для нагрузочного тестирования."""
+
+    help = (
+        "Массово создает пользователей, группы, посты, деревья "
+        "комментариев, подписки и оценки (posts.synthetic)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--groups", type=int, default=100)
+        parser.add_argument("--posts", type=int, default=1000000)
+        parser.add_argument("--comments", type=int, default=5000000)
+        parser.add_argument(
+            "--follows",
+            type=int,
+            default=20,
+            help="Среднее число подписок пользователя",
+        )
+        parser.add_argument("--ratings", type=int, default=3000000)
+        parser.add_argument(
+            "--days", type=int, default=365, help="Период публикаций"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Процессов для подготовки строк",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("Нужен хотя бы один пользователь")
+        if options["posts"] < 1 and (
+            options["comments"] or options["ratings"]
+        ):
+            raise CommandError("Для комментариев и оценок нужны посты")
+
+        plan = synthetic.make_plan(
+            users=options["users"],
+            groups=options["groups"],
+            posts=options["posts"],
+            comments=options["comments"],
+            follows=options["follows"],
+            ratings=options["ratings"],
+            days=options["days"],
+            seed=options["seed"],
+        )
+        started = time.perf_counter()
+
+        def progress(stage, inserted):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{stage}: {inserted}")
+
+        totals = synthetic.generate(
+            plan,
+            batch_size=options["batch_size"],
+            processes=options["processes"],
+            progress=progress,
+        )
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        if options["verbosity"]:
+            for stage, count in totals.items():
+                self.stdout.write(f"{stage}: {count}")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Создано строк: {rows} за {elapsed:.0f} с "
+                    f"({rows / max(elapsed, 1e-9):.0f} строк/с). Пароль "
+                    f"пользователей: {synthetic.PASSWORD}"
+                )
+            )
+            self.stdout.write(
+                "Ленты подписок и поисковый индекс не обновлены: "
+                "build_timelines, rebuild_search_index."
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    """Полная переиндексация постов и комментариев."""
+
+    help = "Заново строит полнотекстовый индекс постов и комментариев."
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        if options["verbosity"]:
+            self.stdout.write(self.style.SUCCESS("Индекс перестроен"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import rating
+
+
+class Command(BaseCommand):
+    """Сверка денормализованных счетчиков рейтинга с таблицей Rating."""
+
+    help = "Пересчитывает рейтинг, лайки и дизлайки постов по таблице Rating."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Сколько постов пересчитывать за один запрос",
+        )
+
+    def handle(self, *args, **options):
+        fixed = rating.reconcile(batch_size=options["batch_size"])
+        if options["verbosity"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Исправлено постов: {fixed}")
+            )
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:12
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_rating_counters(apps, schema_editor):
+    Post = apps.get_model("posts", "Post")
+    Rating = apps.get_model("posts", "Rating")
+
+    totals = Rating.objects.values("post_id").annotate(
+        total=Sum("rating"),
+        likes=Count("id", filter=Q(rating=1)),
+        dislikes=Count("id", filter=Q(rating=-1)),
+    )
+    for row in totals.iterator():
+        Post.objects.filter(pk=row["post_id"]).update(
+            rating=row["total"] or 0,
+            likes_count=row["likes"],
+            dislikes_count=row["dislikes"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0036_auto_20261018_0709'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Количество дизлайков, обновляется автоматически', verbose_name='Дизлайки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Количество лайков, обновляется автоматически', verbose_name='Лайки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='rating',
+            field=models.IntegerField(default=0, editable=False, help_text='Сумма лайков и дизлайков, обновляется автоматически', verbose_name='Рейтинг'),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
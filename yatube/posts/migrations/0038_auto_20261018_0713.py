@@ -0,0 +1,65 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+PATH_STEP = 6
+PATH_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BATCH_SIZE = 1000
+
+
+def path_segment(pk):
+    segment = ""
+    while pk:
+        pk, digit = divmod(pk, len(PATH_DIGITS))
+        segment = PATH_DIGITS[digit] + segment
+    return segment.rjust(PATH_STEP, "0")
+
+
+def fill_comment_tree(apps, schema_editor):
+    Comment = apps.get_model("posts", "Comment")
+
+    positions = {}
+    pending = []
+    comments = Comment.objects.order_by("pk").only("id", "child_id")
+    for comment in comments.iterator():
+        parent = positions.get(comment.child_id)
+        if parent is None:
+            path, depth, thread_id = path_segment(comment.pk), 0, comment.pk
+        else:
+            path = parent[0] + path_segment(comment.pk)
+            depth, thread_id = parent[1] + 1, parent[2]
+        positions[comment.pk] = (path, depth, thread_id)
+
+        comment.path, comment.depth, comment.thread_id = positions[comment.pk]
+        pending.append(comment)
+        if len(pending) >= BATCH_SIZE:
+            Comment.objects.bulk_update(pending, ("path", "depth", "thread"))
+            pending = []
+    Comment.objects.bulk_update(pending, ("path", "depth", "thread"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0037_auto_20261018_0712'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Уровень вложенности'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, help_text='Id всех предков и самого комментария, по которому дерево сортируется одним запросом', max_length=255, verbose_name='Путь в дереве'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='thread',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Комментарий верхнего уровня, с которого начат тред', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='thread_comments', to='posts.Comment', verbose_name='Тред'),
+        ),
+        migrations.RunPython(fill_comment_tree, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_reply_positions(apps, schema_editor):
+    Comment = apps.get_model("posts", "Comment")
+
+    counts = {}
+    pending = []
+    replies = (
+        Comment.objects.filter(depth__gt=0, thread__isnull=False)
+        .order_by("thread_id", "pk")
+        .only("id", "thread_id")
+    )
+    for reply in replies.iterator():
+        counts[reply.thread_id] = counts.get(reply.thread_id, 0) + 1
+        reply.position = counts[reply.thread_id]
+        pending.append(reply)
+        if len(pending) >= BATCH_SIZE:
+            Comment.objects.bulk_update(pending, ("position",))
+            pending = []
+    Comment.objects.bulk_update(pending, ("position",))
+
+    for thread_id, count in counts.items():
+        Comment.objects.filter(pk=thread_id).update(replies_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0038_auto_20261018_0713'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='position',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Порядковый номер ответа в треде, у корня - 0', verbose_name='Номер ответа в треде'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='replies_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество ответов в треде'),
+        ),
+        migrations.RunPython(fill_reply_positions, migrations.RunPython.noop),
+    ]
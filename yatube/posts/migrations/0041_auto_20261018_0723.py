@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('posts', '0040_post_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageDerivative',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('source', models.CharField(help_text='Имя файла, из которого получена копия', max_length=255, verbose_name='Исходная картинка')),
+                ('image', models.ImageField(max_length=255, upload_to='', verbose_name='Копия')),
+                ('format', models.CharField(max_length=10, verbose_name='Формат')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+            ],
+            options={
+                'verbose_name': 'копия картинки',
+                'verbose_name_plural': 'Копии картинок',
+                'ordering': ('format', 'width'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='imagederivative',
+            index=models.Index(fields=['content_type', 'object_id'], name='derivative_object'),
+        ),
+    ]
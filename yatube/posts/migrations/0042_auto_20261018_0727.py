@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:27
+
+from collections import Counter
+
+import core.storage
+from django.db import migrations, models
+
+
+def count_image_references(apps, schema_editor):
+    """Заводит Blob для уже загруженных картинок, чтобы и они удалялись,
+    когда на них не останется ссылок.
+    """
+
+    Blob = apps.get_model("core", "Blob")
+    references = Counter()
+    for model_name in ("Post", "Comment"):
+        model = apps.get_model("posts", model_name)
+        names = (
+            model.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .values_list("image", flat=True)
+        )
+        references.update(names.iterator())
+    Blob.objects.bulk_create(
+        Blob(name=name, references=count)
+        for name, count in references.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('posts', '0041_auto_20261018_0723'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Выберите файл (опционально)', null=True, storage=core.storage.ContentAddressedStorage(), upload_to='', verbose_name='Изображение'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Выберите картинку (опционально)', null=True, storage=core.storage.ContentAddressedStorage(), upload_to='', verbose_name='Изображение'),
+        ),
+        migrations.RunPython(
+            count_image_references, migrations.RunPython.noop
+        ),
+    ]
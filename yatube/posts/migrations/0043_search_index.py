@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-18 07:31
+
+from django.db import migrations
+
+CREATE_INDEX = (
+    "CREATE VIRTUAL TABLE posts_search USING fts5("
+    "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+)
+FILL_INDEX = (
+    "INSERT INTO posts_search (rowid, title, text) "
+    "SELECT 2 * id, title, text FROM posts_post "
+    "UNION ALL "
+    "SELECT 2 * id + 1, '', text FROM posts_comment"
+)
+
+
+def create_search_index(apps, schema_editor):
+    # Полнотекстовый индекс FTS5 есть только у SQLite, для других баз
+    # нужен свой бэкенд поиска (SEARCH_BACKEND).
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE_INDEX)
+    schema_editor.execute(FILL_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS posts_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0042_auto_20261018_0727'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
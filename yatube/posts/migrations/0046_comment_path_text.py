@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0045_post_is_deleted'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='path',
+            field=models.TextField(db_index=True, default='', editable=False, help_text='Id всех предков и самого комментария, по которому дерево сортируется одним запросом', verbose_name='Путь в дереве'),
+        ),
+    ]
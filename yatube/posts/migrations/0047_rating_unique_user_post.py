@@ -0,0 +1,57 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:50
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def remove_duplicate_ratings(apps, schema_editor):
+    """Оставляет одну (последнюю) оценку пользователя посту и
+    пересчитывает счетчики затронутых постов.
+    """
+
+    Post = apps.get_model("posts", "Post")
+    Rating = apps.get_model("posts", "Rating")
+    duplicates = (
+        Rating.objects.values("user_id", "post_id")
+        .annotate(count=Count("id"), last_id=Max("id"))
+        .filter(count__gt=1)
+    )
+    post_ids = set()
+    for row in duplicates.iterator():
+        Rating.objects.filter(
+            user_id=row["user_id"], post_id=row["post_id"]
+        ).exclude(pk=row["last_id"]).delete()
+        post_ids.add(row["post_id"])
+
+    for post_id in post_ids:
+        totals = Rating.objects.filter(post_id=post_id).aggregate(
+            total=Sum("rating"),
+            likes=Count("id", filter=Q(rating=1)),
+            dislikes=Count("id", filter=Q(rating=-1)),
+        )
+        Post.objects.filter(pk=post_id).update(
+            rating=totals["total"] or 0,
+            likes_count=totals["likes"],
+            dislikes_count=totals["dislikes"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0046_comment_path_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_ratings, migrations.RunPython.noop
+        ),
+        migrations.RemoveConstraint(
+            model_name='rating',
+            name='unique_rating',
+        ),
+        migrations.AddConstraint(
+            model_name='rating',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_rating'),
+        ),
+    ]
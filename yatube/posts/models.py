@@ -1,12 +1,20 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 
 from core.models import CreatedModel
+from core.storage import storage as content_storage
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.contrib.contenttypes.fields import (
+    GenericForeignKey,
+    GenericRelation,
+)
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
 from django.urls import reverse
 
 User = get_user_model()
 TEXT_TRANCATECHARS = 30
+COMMENT_PATH_STEP = 6
+COMMENT_PATH_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
 
 class Group(models.Model):
     """Создание модели группы."""
@@ -32,6 +40,13 @@ class Group(models.Model):
         return self.title
 
 
+class PostManager(models.Manager):
+    """Посты без помеченных на удаление (posts.deletion)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Post(CreatedModel):
     """Создание модели постов."""
 
@@ -41,7 +56,7 @@ class Post(CreatedModel):
         max_length=255
     )
     image = models.ImageField(
-        upload_to="photos/posts/%Y/%m/%d/",
+        storage=content_storage,
         verbose_name="Изображение",
         blank=True,
         null=True,
@@ -63,6 +78,37 @@ class Post(CreatedModel):
         verbose_name="Группа",
         help_text="Выберите группу из списка (опционально)",
     )
+    rating = models.IntegerField(
+        verbose_name="Рейтинг",
+        help_text="Сумма лайков и дизлайков, обновляется автоматически",
+        default=0,
+        editable=False,
+    )
+    likes_count = models.PositiveIntegerField(
+        verbose_name="Лайки",
+        help_text="Количество лайков, обновляется автоматически",
+        default=0,
+        editable=False,
+    )
+    dislikes_count = models.PositiveIntegerField(
+        verbose_name="Дизлайки",
+        help_text="Количество дизлайков, обновляется автоматически",
+        default=0,
+        editable=False,
+    )
+    updated = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
+    is_deleted = models.BooleanField(
+        verbose_name="Удаляется",
+        help_text="Пост скрыт и будет удален фоновой задачей",
+        default=False,
+        editable=False,
+    )
+    derivatives = GenericRelation("ImageDerivative")
+
+    objects = PostManager()
+    all_objects = models.Manager()
 
     class Meta:
         """Мета для вывода человекочитаемых имен"""
@@ -71,6 +117,17 @@ class Post(CreatedModel):
         ordering = ("-created", )
         verbose_name = "пост"
         verbose_name_plural = "Посты"
+        # Страницы группы и профиля: отбор и сортировка по одному индексу.
+        # created по возрастанию: при обратном обходе SQLite получает и
+        # (-created, -id) пагинации по ключу - id входит в индекс неявно.
+        indexes = (
+            models.Index(
+                fields=("group", "created"), name="post_group_created"
+            ),
+            models.Index(
+                fields=("author", "created"), name="post_author_created"
+            ),
+        )
 
     def __str__(self):
         return self.text[:TEXT_TRANCATECHARS]
@@ -90,7 +147,7 @@ class Comment(CreatedModel):
         help_text="Укажите автора комментария (обязательное поле)",
     )
     image = models.ImageField(
-        upload_to="photos/comments/%Y/%m/%d/",
+        storage=content_storage,
         verbose_name="Изображение",
         blank=True,
         null=True,
@@ -113,6 +170,41 @@ class Comment(CreatedModel):
         help_text="Выберите комментарий из списка (опционально)",
     )
     is_child = models.BooleanField(default=False)
+    thread = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        related_name="thread_comments",
+        verbose_name="Тред",
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Комментарий верхнего уровня, с которого начат тред",
+    )
+    # Каждый уровень добавляет COMMENT_PATH_STEP символов, поэтому длина
+    # пути (и глубина дерева) не ограничена.
+    path = models.TextField(
+        verbose_name="Путь в дереве",
+        default="",
+        editable=False,
+        db_index=True,
+        help_text="Id всех предков и самого комментария, по которому "
+                  "дерево сортируется одним запросом",
+    )
+    depth = models.PositiveSmallIntegerField(
+        verbose_name="Уровень вложенности", default=0, editable=False
+    )
+    position = models.PositiveIntegerField(
+        verbose_name="Номер ответа в треде",
+        default=0,
+        editable=False,
+        help_text="Порядковый номер ответа в треде, у корня - 0",
+    )
+    replies_count = models.PositiveIntegerField(
+        verbose_name="Количество ответов в треде",
+        default=0,
+        editable=False,
+    )
+    derivatives = GenericRelation("ImageDerivative")
 
     class Meta:
         """Мета для вывода человекочитаемых имен и сортировки"""
@@ -121,10 +213,64 @@ class Comment(CreatedModel):
         default_related_name = "commentary"
         verbose_name_plural = "Комментарии"
         verbose_name = "комментарий"
+        # Корневые комментарии страницы поста.
+        indexes = (
+            models.Index(
+                fields=("post", "is_child", "created"),
+                name="comment_post_root_created",
+            ),
+        )
 
     def __str__(self):
         return self.text[:TEXT_TRANCATECHARS]
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if not self.path:
+            self.set_tree_position()
+
+    @staticmethod
+    def path_segment(pk):
+        """Id в base36 фиксированной ширины - сортируется как строка."""
+
+        segment = ""
+        while pk:
+            pk, digit = divmod(pk, len(COMMENT_PATH_DIGITS))
+            segment = COMMENT_PATH_DIGITS[digit] + segment
+        return segment.rjust(COMMENT_PATH_STEP, "0")
+
+    @transaction.atomic
+    def set_tree_position(self):
+        """Вычисляет путь, уровень, тред и номер ответа по родителю (поле
+
+        child).
+        """
+
+        parent = self.child
+        self.path = self.path_segment(self.pk)
+        self.depth = 0
+        self.thread_id = self.pk
+        self.position = 0
+        if parent is not None:
+            self.path = parent.path + self.path
+            self.depth = parent.depth + 1
+            self.thread_id = parent.thread_id or parent.pk
+
+            threads = Comment.objects.filter(pk=self.thread_id)
+            threads.update(replies_count=models.F("replies_count") + 1)
+            self.position = threads.values_list(
+                "replies_count", flat=True
+            ).get()
+
+        self.is_child = parent is not None
+        Comment.objects.filter(pk=self.pk).update(
+            is_child=self.is_child,
+            path=self.path,
+            depth=self.depth,
+            thread_id=self.thread_id,
+            position=self.position,
+        )
+
 
 class Follow(models.Model):
     """Модель подписки на авторов."""
@@ -185,7 +331,102 @@ class Rating(models.Model):
     class Meta:
         constraints = (
             models.UniqueConstraint(
-                fields=('user', 'post', 'rating'),
+                fields=('user', 'post'),
                 name='unique_rating'
             ),
         )
+        # Покрывающий индекс для сумм и счетчиков оценок поста.
+        indexes = (
+            models.Index(fields=("post", "rating"), name="rating_post_value"),
+        )
+
+
+class Timeline(models.Model):
+    """Признак того, что лента подписок пользователя материализована."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+        verbose_name="Пользователь",
+        help_text="Владелец ленты",
+    )
+    built = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата построения ленты"
+    )
+
+    class Meta:
+        verbose_name = "лента"
+        verbose_name_plural = "Ленты"
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пользователь",
+        help_text="Владелец ленты",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пост",
+        help_text="Пост в ленте",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор",
+        help_text="Автор поста, нужен для очистки ленты при отписке",
+    )
+    created = models.DateTimeField(verbose_name="Дата публикации поста")
+
+    class Meta:
+        verbose_name = "запись ленты"
+        verbose_name_plural = "Записи ленты"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "post"), name="unique_timeline_entry"
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("user", "-created"), name="timeline_user_created"
+            ),
+            models.Index(
+                fields=("user", "author"), name="timeline_user_author"
+            ),
+        )
+
+
+class ImageDerivative(models.Model):
+    """Уменьшенная копия картинки поста или комментария."""
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey()
+    source = models.CharField(
+        max_length=255,
+        verbose_name="Исходная картинка",
+        help_text="Имя файла, из которого получена копия",
+    )
+    image = models.ImageField(max_length=255, verbose_name="Копия")
+    format = models.CharField(max_length=10, verbose_name="Формат")
+    width = models.PositiveIntegerField(verbose_name="Ширина")
+    height = models.PositiveIntegerField(verbose_name="Высота")
+
+    class Meta:
+        ordering = ("format", "width")
+        verbose_name = "копия картинки"
+        verbose_name_plural = "Копии картинок"
+        indexes = (
+            models.Index(
+                fields=("content_type", "object_id"),
+                name="derivative_object",
+            ),
+        )
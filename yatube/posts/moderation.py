@@ -0,0 +1,144 @@
+"""Проверка текста на запрещенные слова.
+
+Список слов (настройки PROHIBITED_WORDS и PROHIBITED_WORDS_FILE - файл
+по слову в строке) компилируется в автомат Ахо-Корасик один раз на
+процесс, и любой текст проверяется за один проход независимо от длины
+списка. Файл перечитывается, когда меняется время его изменения; время
+проверяется не чаще раза в WORDS_FILE_CHECK_INTERVAL секунд.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class WordMatcher:
+    """Автомат Ахо-Корасик для поиска подстрок без учета регистра."""
+
+    def __init__(self, words):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.output = [None]
+        for word in words:
+            word = word.strip().lower()
+            if word:
+                self.add(word)
+        self.build()
+
+    def add(self, word):
+        state = 0
+        for char in word:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            state = next_state
+        self.output[state] = word
+
+    def build(self):
+        """Строит ссылки неудач обходом бора в ширину."""
+
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.transitions[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.transitions[fail].get(char, 0)
+                # Слово, заканчивающееся в суффиксе, тоже найдено.
+                if self.output[next_state] is None:
+                    self.output[next_state] = self.output[
+                        self.fail[next_state]
+                    ]
+
+    def __len__(self):
+        return sum(word is not None for word in self.output)
+
+    def find(self, text):
+        """Первое найденное в тексте слово или None."""
+
+        transitions, fail, output = self.transitions, self.fail, self.output
+        state = 0
+        for char in text.lower():
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+
+def load_words():
+    words = list(settings.PROHIBITED_WORDS)
+    path = settings.PROHIBITED_WORDS_FILE
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as words_file:
+            words.extend(words_file)
+    return words
+
+
+def words_file_version():
+    path = settings.PROHIBITED_WORDS_FILE
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except FileNotFoundError:
+        return None
+
+
+WORDS_FILE_CHECK_INTERVAL = 5
+
+_matcher = None
+_version = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def refresh():
+    """Перестраивает автомат, если его нет или файл со словами изменился."""
+
+    global _matcher, _version, _checked_at
+    with _lock:
+        version = words_file_version()
+        if _matcher is None or version != _version:
+            _matcher = WordMatcher(load_words())
+            _version = version
+        _checked_at = time.monotonic()
+
+
+def get_matcher():
+    """Общий автомат, перестраивается при изменении файла со словами."""
+
+    if (
+        _matcher is None
+        or time.monotonic() - _checked_at >= WORDS_FILE_CHECK_INTERVAL
+    ):
+        refresh()
+    return _matcher
+
+
+def reload():
+    """Сбрасывает автомат, он будет построен заново при первой проверке."""
+
+    global _matcher
+    with _lock:
+        _matcher = None
+
+
+def find_prohibited(text):
+    return get_matcher().find(text)
+
+
+@receiver(setting_changed)
+def reload_on_setting_change(setting, **kwargs):
+    if setting in ("PROHIBITED_WORDS", "PROHIBITED_WORDS_FILE"):
+        reload()
@@ -0,0 +1,134 @@
+"""Оценки постов с денормализованными счетчиками на Post.
+
+Итоговый рейтинг, лайки и дизлайки хранятся в самом посте и меняются
+атомарными UPDATE через F(), поэтому странице поста не нужен SUM по
+Rating. Расхождения (например, после каскадного удаления оценок)
+исправляет команда reconcile_ratings.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from core.cache import invalidate
+
+from . import cache_tags
+from .models import Post, Rating
+
+LIKE = 1
+DISLIKE = -1
+
+
+def _apply_change(post_id, old, new):
+    """Переносит смену оценки old -> new на счетчики поста."""
+
+    if old == new:
+        return
+    Post.objects.filter(pk=post_id).update(
+        rating=F("rating") + (new - old),
+        likes_count=F("likes_count") + (new == LIKE) - (old == LIKE),
+        dislikes_count=(
+            F("dislikes_count") + (new == DISLIKE) - (old == DISLIKE)
+        ),
+    )
+    invalidate(cache_tags.post(post_id))
+
+
+@transaction.atomic
+def set_rating(user, post, value):
+    """Устанавливает оценку пользователя посту. Возвращает Rating."""
+
+    rating = Rating.objects.filter(user=user, post=post).first()
+    if rating is None:
+        try:
+            with transaction.atomic():
+                rating = Rating.objects.create(
+                    user=user, post=post, rating=value
+                )
+        except IntegrityError:
+            # Параллельный запрос успел создать такую же оценку - меняем ее
+            # так же, как существующую.
+            rating = Rating.objects.get(user=user, post=post)
+        else:
+            _apply_change(post.id, 0, value)
+            return rating
+
+    old = rating.rating
+    # Обновляем только если оценку никто не поменял между чтением и записью.
+    if Rating.objects.filter(pk=rating.pk, rating=old).update(rating=value):
+        _apply_change(post.id, old, value)
+        rating.rating = value
+    return rating
+
+
+def vote(user, post, step):
+    """Лайк (step=1) или дизлайк (step=-1).
+
+    Повторный голос в ту же сторону ничего не меняет, противоположный
+    сначала снимает оценку.
+    """
+
+    rating = Rating.objects.filter(user=user, post=post).first()
+    value = step if rating is None else rating.rating + step
+    if abs(value) <= abs(step):
+        return set_rating(user, post, value)
+    return rating
+
+
+@transaction.atomic
+def remove_rating(rating):
+    """Удаляет оценку и вычитает ее из счетчиков поста."""
+
+    if Rating.objects.filter(pk=rating.pk).delete()[0]:
+        _apply_change(rating.post_id, rating.rating, 0)
+
+
+def reconcile(batch_size=1000):
+    """Пересчитывает счетчики всех постов по таблице Rating пачками.
+
+    Возвращает количество исправленных постов.
+    """
+
+    fixed = 0
+    last_id = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .only("id", "rating", "likes_count", "dislikes_count")[
+                :batch_size
+            ]
+        )
+        if not posts:
+            return fixed
+        last_id = posts[-1].pk
+
+        totals = {
+            row["post_id"]: row
+            for row in Rating.objects.filter(
+                post_id__in=[post.pk for post in posts]
+            )
+            .values("post_id")
+            .annotate(
+                total=Sum("rating"),
+                likes=Count("id", filter=Q(rating=LIKE)),
+                dislikes=Count("id", filter=Q(rating=DISLIKE)),
+            )
+        }
+
+        changed = []
+        for post in posts:
+            row = totals.get(post.pk, {})
+            actual = (
+                row.get("total") or 0,
+                row.get("likes", 0),
+                row.get("dislikes", 0),
+            )
+            if actual != (post.rating, post.likes_count, post.dislikes_count):
+                post.rating, post.likes_count, post.dislikes_count = actual
+                changed.append(post)
+
+        with transaction.atomic():
+            Post.objects.bulk_update(
+                changed, ("rating", "likes_count", "dislikes_count")
+            )
+        fixed += len(changed)
@@ -0,0 +1,239 @@
+"""Полнотекстовый поиск по постам и комментариям.
+
+Индекс хранится отдельно от моделей и обновляется сигналами при
+сохранении и удалении. Работа с индексом спрятана за SearchBackend: по
+умолчанию это таблица FTS5 в SQLite (настройка SEARCH_BACKEND), для
+другой базы достаточно реализовать тот же интерфейс.
+"""
+
+import functools
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .models import Comment, Post
+
+POST = "post"
+COMMENT = "comment"
+KINDS = (POST, COMMENT)
+TERM_RE = re.compile(r"\w+")
+
+
+def document(instance):
+    """Вид, id, заголовок и текст объекта для индекса."""
+
+    if isinstance(instance, Post):
+        return POST, instance.pk, instance.title, instance.text
+    return COMMENT, instance.pk, "", instance.text
+
+
+class SearchBackend:
+    """Интерфейс поискового индекса."""
+
+    def index(self, kind, pk, title, text):
+        """Добавляет документ в индекс или обновляет его."""
+
+        raise NotImplementedError
+
+    def remove(self, kind, pk):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, query, kinds=KINDS, limit=None, offset=0):
+        """Список (вид, id) по убыванию релевантности."""
+
+        raise NotImplementedError
+
+    def count(self, query, kinds=KINDS):
+        raise NotImplementedError
+
+    def filter_queryset(self, queryset, kind, query):
+        """Оставляет в queryset только найденные объекты вида kind."""
+
+        ids = [pk for _, pk in self.search(query, kinds=(kind,))]
+        return queryset.filter(pk__in=ids)
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Индекс в виртуальной таблице FTS5 (миграция posts 0043).
+
+    Вид и id документа закодированы в rowid (пост - 2 * id, комментарий -
+    2 * id + 1), поэтому обновление и удаление идут по первичному ключу
+    таблицы, а не перебором.
+    """
+
+    table = "posts_search"
+    # Веса столбцов title и text для bm25.
+    weights = (10.0, 1.0)
+
+    @staticmethod
+    def rowid(kind, pk):
+        return 2 * pk + KINDS.index(kind)
+
+    @staticmethod
+    def match_expression(query):
+        """Запрос пользователя как выражение MATCH: все слова по префиксу.
+
+        Синтаксис FTS5 (кавычки, операторы) из запроса не пропускается.
+        """
+
+        return " ".join(
+            f'"{term}"*' for term in TERM_RE.findall(query.lower())
+        )
+
+    def where(self, kinds):
+        sql = f"{self.table} MATCH %s"
+        if set(kinds) != set(KINDS):
+            rows = " OR ".join(
+                f"rowid %% 2 = {KINDS.index(kind)}" for kind in kinds
+            )
+            sql += f" AND ({rows})"
+        return sql
+
+    def index(self, kind, pk, title, text):
+        rowid = self.rowid(kind, pk)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [rowid]
+            )
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, text) "
+                "VALUES (%s, %s, %s)",
+                [rowid, title, text],
+            )
+
+    def remove(self, kind, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [self.rowid(kind, pk)],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def search(self, query, kinds=KINDS, limit=None, offset=0):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        title_weight, text_weight = self.weights
+        sql = (
+            f"SELECT rowid FROM {self.table} WHERE {self.where(kinds)} "
+            f"ORDER BY bm25({self.table}, {title_weight}, {text_weight}) "
+            "LIMIT %s OFFSET %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql, [match, -1 if limit is None else limit, offset]
+            )
+            rows = cursor.fetchall()
+        return [(KINDS[rowid % 2], rowid // 2) for rowid, in rows]
+
+    def count(self, query, kinds=KINDS):
+        match = self.match_expression(query)
+        if not match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE {self.where(kinds)}",
+                [match],
+            )
+            return cursor.fetchone()[0]
+
+    def filter_queryset(self, queryset, kind, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        column = f'"{queryset.model._meta.db_table}"."id"'
+        return queryset.extra(
+            where=[
+                f"{column} IN (SELECT rowid / 2 FROM {self.table} "
+                f"WHERE {self.where((kind,))})"
+            ],
+            params=[match],
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def index(instance):
+    get_backend().index(*document(instance))
+
+
+def remove(instance):
+    kind, pk, _, _ = document(instance)
+    get_backend().remove(kind, pk)
+
+
+def rebuild():
+    """Заново индексирует все посты и комментарии."""
+
+    backend = get_backend()
+    backend.clear()
+    for queryset in (
+        Post.objects.all(),
+        Comment.objects.filter(post__is_deleted=False),
+    ):
+        for instance in queryset.iterator():
+            backend.index(*document(instance))
+
+
+class SearchResults:
+    """Найденные объекты в порядке релевантности.
+
+    Поддерживает len() и срезы, поэтому подходит для Paginator: каждая
+    страница - один запрос к индексу и по запросу на вид объектов.
+    """
+
+    def __init__(self, query, kinds=KINDS):
+        self.query = query
+        self.kinds = kinds
+        self.backend = get_backend()
+
+    @cached_property
+    def total(self):
+        return self.backend.count(self.query, self.kinds)
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = None if key.stop is None else max(key.stop - offset, 0)
+        hits = self.backend.search(self.query, self.kinds, limit, offset)
+        return self.load(hits)
+
+    @staticmethod
+    def load(hits):
+        querysets = {
+            POST: Post.objects.select_related(
+                "author", "group"
+            ).prefetch_related("derivatives"),
+            # Комментарии скрытого поста остаются в индексе, пока пост не
+            # удалит фоновая задача (posts.deletion).
+            COMMENT: Comment.objects.filter(
+                post__is_deleted=False
+            ).select_related("author", "post"),
+        }
+        objects = {}
+        for kind, queryset in querysets.items():
+            ids = [pk for hit_kind, pk in hits if hit_kind == kind]
+            if ids:
+                for pk, instance in queryset.in_bulk(ids).items():
+                    instance.search_kind = kind
+                    objects[kind, pk] = instance
+        return [objects[hit] for hit in hits if hit in objects]
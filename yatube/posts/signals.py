@@ -0,0 +1,141 @@
+"""Реакция на изменение объектов posts: точечная инвалидация кэша,
+
+обновление поискового индекса и лент подписок, учет ссылок на картинки в
+хранилище и постановка их копий в очередь.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import storage
+from core.cache import invalidate
+
+from . import cache_tags, search, thumbnails, timeline
+from .models import Comment, Follow, Group, Post, Rating
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    """Запоминает прежнюю группу, чтобы сбросить и ее страницу."""
+
+    instance._previous_group_id = None
+    if instance.pk:
+        instance._previous_group_id = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list("group_id", flat=True)
+            .first()
+        )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def remember_image(sender, instance, **kwargs):
+    """Запоминает прежнюю картинку, чтобы не пересоздавать миниатюры."""
+
+    instance._previous_image = None
+    if instance.pk:
+        instance._previous_image = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("image", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def schedule_thumbnails(sender, instance, **kwargs):
+    previous_image = getattr(instance, "_previous_image", None)
+    if instance.image and instance.image.name != previous_image:
+        thumbnails.schedule(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_image_references(sender, instance, **kwargs):
+    previous_image = getattr(instance, "_previous_image", None)
+    if (instance.image.name or None) == (previous_image or None):
+        return
+    if instance.image:
+        storage.acquire(instance.image.name)
+    if previous_image:
+        storage.release(previous_image)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def release_image(sender, instance, **kwargs):
+    if instance.image:
+        storage.release(instance.image.name)
+
+
+@receiver(storage.blob_released)
+def delete_derivatives(sender, name, **kwargs):
+    thumbnails.delete_derivatives(name)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    tags = list(cache_tags.for_post(instance))
+    previous_group_id = getattr(instance, "_previous_group_id", None)
+    if previous_group_id != instance.group_id:
+        tags.append(cache_tags.group(previous_group_id))
+    invalidate(*tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    invalidate(cache_tags.post(instance.post_id))
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_rating(sender, instance, **kwargs):
+    invalidate(cache_tags.post(instance.post_id))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    # Название и slug группы выводятся в карточках постов на всех лентах.
+    invalidate(cache_tags.GROUPS, cache_tags.group(instance.pk))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow(sender, instance, **kwargs):
+    invalidate(
+        cache_tags.feed(instance.user_id),
+        cache_tags.author(instance.following_id),
+    )
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    # Срабатывает для постов из вьюх, API, админки, shell и фикстур.
+    if created:
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Follow)
+def extend_timeline(sender, instance, created, **kwargs):
+    if created:
+        timeline.add_author(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_timeline(sender, instance, **kwargs):
+    timeline.remove_author(instance.user_id, instance.following_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_document(sender, instance, **kwargs):
+    search.index(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_document(sender, instance, **kwargs):
+    search.remove(instance)
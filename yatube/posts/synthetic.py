@@ -0,0 +1,499 @@
+"""Массовая генерация синтетических данных для нагрузочного тестирования.
+
+Пользователи, группы, посты, деревья комментариев, подписки и оценки
+вставляются пачками с заранее назначенными id, поэтому пачки можно
+готовить независимо, в том числе в нескольких процессах (вставляет только
+основной процесс - SQLite допускает одного писателя). Пачка уходит одним
+executemany того же INSERT, что строит bulk_create: подготовка значений
+полей в ORM и разбиение на запросы по 999 параметров SQLite обходятся
+дороже самой вставки.
+
+Распределения неравномерные: число подписчиков у пользователей и
+внимание к постам (комментарии, оценки) подчиняются степенному закону,
+свежие посты популярнее старых.
+
+Методы save() и сигналы не вызываются, поэтому денормализованные поля
+считаются здесь же: путь, тред и номер ответа комментариев, рейтинг
+постов. Ленты подписок и поисковый индекс строятся
+отдельно (build_timelines, rebuild_search_index).
+"""
+
+import contextlib
+import datetime
+import functools
+import itertools
+import multiprocessing
+import random
+import time
+from collections import namedtuple
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import (
+    Count,
+    IntegerField,
+    Max,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce
+from faker import Faker
+
+from core.cache import invalidate
+
+from . import cache_tags, rating
+from .models import Comment, Follow, Group, Post, Rating, User
+
+PASSWORD = "password"
+# Кэш страниц SQLite на время генерации, КиБ: индексы больших таблиц
+# должны помещаться в память.
+SQLITE_CACHE_SIZE = 512 * 1024
+SENTENCES = 2000
+REPLY_SHARE = 0.5
+MAX_DEPTH = 8
+# Показатель степенного закона для популярности авторов и постов.
+EXPONENT = 1.1
+
+Plan = namedtuple(
+    "Plan",
+    (
+        "seed users groups posts comments follows ratings "
+        "first_user first_group first_post first_comment "
+        "started span password"
+    ),
+)
+
+
+def make_plan(
+    users, groups, posts, comments, follows, ratings, days=365, seed=0
+):
+    """План генерации: объемы и первые свободные id каждой таблицы."""
+
+    def first_id(model):
+        return (model.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+
+    now = time.time()
+    return Plan(
+        seed=seed,
+        users=users,
+        groups=groups,
+        posts=posts,
+        comments=comments,
+        follows=follows,
+        ratings=ratings,
+        first_user=first_id(User),
+        first_group=first_id(Group),
+        first_post=first_id(Post),
+        first_comment=first_id(Comment),
+        started=now - days * 24 * 60 * 60,
+        span=days * 24 * 60 * 60,
+        password=make_password(PASSWORD),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def cum_weights(count):
+    """Накопленные веса 1 / rank ** EXPONENT для random.choices."""
+
+    return list(
+        itertools.accumulate(
+            1 / rank ** EXPONENT for rank in range(1, count + 1)
+        )
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def sentences(seed):
+    fake = Faker("ru_RU")
+    fake.seed_instance(seed)
+    return [fake.sentence(nb_words=10) for _ in range(SENTENCES)]
+
+
+def text(rng, plan, min_sentences, max_sentences):
+    return " ".join(
+        rng.choices(
+            sentences(plan.seed), k=rng.randint(min_sentences, max_sentences)
+        )
+    )
+
+
+def post_time(plan, index):
+    """Время публикации поста: id растут вместе со временем."""
+
+    return plan.started + plan.span * (index + 0.5) / plan.posts
+
+
+def to_db_datetime(timestamp):
+    return connection.ops.adapt_datetimefield_value(
+        datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    )
+
+
+def hot_post(rng, plan):
+    """Номер поста с перекосом в пользу свежих."""
+
+    index = rng.choices(range(plan.posts), cum_weights=cum_weights(plan.posts))
+    return plan.posts - 1 - index[0]
+
+
+def popular_user(rng, plan):
+    index = rng.choices(range(plan.users), cum_weights=cum_weights(plan.users))
+    return plan.first_user + index[0]
+
+
+def chunk_rng(plan, kind, start):
+    return random.Random(f"{plan.seed}:{kind}:{start}")
+
+
+# Функции *_rows готовят строки пачки [start, stop) - кортежи значений
+# в порядке полей этапа (STAGES), уже приведенные к виду для базы. К самой
+# базе они не обращаются, поэтому выполняются и в дочерних процессах.
+
+
+def user_rows(plan, start, stop):
+    joined = to_db_datetime(plan.started)
+    return [
+        (
+            plan.first_user + index,
+            f"load_user_{plan.first_user + index}",
+            plan.password,
+            False,
+            "",
+            "",
+            "",
+            False,
+            True,
+            joined,
+        )
+        for index in range(start, stop)
+    ]
+
+
+def group_rows(plan, start, stop):
+    rng = chunk_rng(plan, "groups", start)
+    rows = []
+    for index in range(start, stop):
+        pk = plan.first_group + index
+        rows.append(
+            (pk, f"Группа {pk}", f"load-group-{pk}", text(rng, plan, 1, 3))
+        )
+    return rows
+
+
+def post_rows(plan, start, stop):
+    rng = chunk_rng(plan, "posts", start)
+    rows = []
+    for index in range(start, stop):
+        group = (
+            plan.first_group + rng.randrange(plan.groups)
+            if plan.groups and rng.random() < 0.7 else None
+        )
+        created = to_db_datetime(post_time(plan, index))
+        rows.append(
+            (
+                plan.first_post + index,
+                text(rng, plan, 1, 1)[:255],
+                text(rng, plan, 2, 12),
+                popular_user(rng, plan),
+                group,
+                created,
+                created,
+                0,
+                0,
+                0,
+                False,
+            )
+        )
+    return rows
+
+
+def comment_rows(plan, start, stop):
+    """Комментарии с деревьями ответов.
+
+    Ответы ссылаются только на комментарии той же пачки, поэтому тред
+    целиком помещается в пачку и число ответов корня известно сразу.
+    """
+
+    rng = chunk_rng(plan, "comments", start)
+    now = plan.started + plan.span
+    rows = []
+    by_post = {}
+    replies = {}
+    times = {}
+    for index in range(start, stop):
+        pk = plan.first_comment + index
+        post_index = hot_post(rng, plan)
+        siblings = by_post.setdefault(post_index, [])
+        parent = None
+        if siblings and rng.random() < REPLY_SHARE:
+            parent = rng.choice(siblings[-10:])
+            if parent["depth"] + 1 >= MAX_DEPTH:
+                parent = None
+
+        # Ответ пишется после родителя, комментарий - после поста.
+        posted = times[parent["id"]] if parent else post_time(
+            plan, post_index
+        )
+        times[pk] = min(now, posted + rng.expovariate(1 / 3600))
+        row = {
+            "id": pk,
+            "post_id": plan.first_post + post_index,
+            "author_id": popular_user(rng, plan),
+            "text": text(rng, plan, 1, 4),
+            "created": to_db_datetime(times[pk]),
+            "child_id": None,
+            "is_child": False,
+            "thread_id": pk,
+            "path": Comment.path_segment(pk),
+            "depth": 0,
+            "position": 0,
+            "replies_count": 0,
+        }
+        if parent is not None:
+            thread_id = parent["thread_id"]
+            replies[thread_id] = replies.get(thread_id, 0) + 1
+            row.update(
+                child_id=parent["id"],
+                is_child=True,
+                thread_id=thread_id,
+                path=parent["path"] + row["path"],
+                depth=parent["depth"] + 1,
+                position=replies[thread_id],
+            )
+        siblings.append(row)
+        rows.append(row)
+
+    for row in rows:
+        row["replies_count"] = replies.get(row["id"], 0)
+    return [tuple(row[field] for field in COMMENT_FIELDS) for row in rows]
+
+
+def follow_rows(plan, start, stop):
+    """Подписки пользователей [start, stop): на популярных авторов
+    подписываются чаще.
+    """
+
+    rng = chunk_rng(plan, "follows", start)
+    rows = []
+    for index in range(start, stop):
+        user_id = plan.first_user + index
+        count = min(int(rng.expovariate(1 / plan.follows)), plan.users - 1)
+        following = set()
+        for _ in range(count * 2):
+            if len(following) >= count:
+                break
+            author_id = popular_user(rng, plan)
+            if author_id != user_id:
+                following.add(author_id)
+        rows.extend((user_id, author_id) for author_id in following)
+    return rows
+
+
+def rating_rows(plan, start, stop):
+    """Оценки пользователей [start, stop), не больше одной на пост."""
+
+    rng = chunk_rng(plan, "ratings", start)
+    per_user = plan.ratings / plan.users
+    rows = []
+    for index in range(start, stop):
+        user_id = plan.first_user + index
+        count = min(int(rng.expovariate(1 / per_user)), plan.posts)
+        posts = {plan.first_post + hot_post(rng, plan) for _ in range(count)}
+        rows.extend(
+            (
+                user_id,
+                post_id,
+                rating.LIKE if rng.random() < 0.8 else rating.DISLIKE,
+            )
+            for post_id in posts
+        )
+    return rows
+
+
+USER_FIELDS = (
+    "id",
+    "username",
+    "password",
+    "is_superuser",
+    "first_name",
+    "last_name",
+    "email",
+    "is_staff",
+    "is_active",
+    "date_joined",
+)
+POST_FIELDS = (
+    "id",
+    "title",
+    "text",
+    "author_id",
+    "group_id",
+    "created",
+    "updated",
+    "rating",
+    "likes_count",
+    "dislikes_count",
+    "is_deleted",
+)
+COMMENT_FIELDS = (
+    "id",
+    "post_id",
+    "author_id",
+    "text",
+    "created",
+    "child_id",
+    "is_child",
+    "thread_id",
+    "path",
+    "depth",
+    "position",
+    "replies_count",
+)
+
+# Этапы в порядке вставки: имя объема в Plan, модель, поля строк, объем,
+# по которому режутся пачки, и функция подготовки строк.
+STAGES = (
+    ("users", User, USER_FIELDS, "users", user_rows),
+    ("groups", Group, ("id", "title", "slug", "description"), "groups",
+     group_rows),
+    ("posts", Post, POST_FIELDS, "posts", post_rows),
+    ("comments", Comment, COMMENT_FIELDS, "comments", comment_rows),
+    ("follows", Follow, ("user_id", "following_id"), "users", follow_rows),
+    ("ratings", Rating, ("user_id", "post_id", "rating"), "users",
+     rating_rows),
+)
+
+
+def _rows(task):
+    rows_function, plan, start, stop = task
+    return rows_function(plan, start, stop)
+
+
+def insert(model, fields, rows):
+    """Вставляет пачку строк одним executemany."""
+
+    quote = connection.ops.quote_name
+    columns = ", ".join(
+        quote(model._meta.get_field(field).column) for field in fields
+    )
+    placeholders = ", ".join(["%s"] * len(fields))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote(model._meta.db_table)} ({columns}) "
+            f"VALUES ({placeholders})",
+            rows,
+        )
+
+
+def count_ratings(plan):
+    """Заполняет рейтинг, лайки и дизлайки созданных постов одним UPDATE.
+
+    Оценки ставятся только созданным постам, поэтому счетчики считаются
+    с нуля, без сверки rating.reconcile.
+    """
+
+    def aggregate(ratings, expression):
+        return Coalesce(
+            Subquery(
+                ratings.annotate(value=expression).values("value"),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+
+    ratings = Rating.objects.filter(post=OuterRef("pk")).order_by().values(
+        "post"
+    )
+    with transaction.atomic():
+        Post.objects.filter(pk__gte=plan.first_post).update(
+            rating=aggregate(ratings, Sum("rating")),
+            likes_count=aggregate(
+                ratings.filter(rating=rating.LIKE), Count("id")
+            ),
+            dislikes_count=aggregate(
+                ratings.filter(rating=rating.DISLIKE), Count("id")
+            ),
+        )
+
+
+@contextlib.contextmanager
+def sqlite_bulk_mode():
+    """Для SQLite на время генерации увеличивает кэш страниц и отключает
+    fsync при коммите: данные синтетические, при сбое их проще создать
+    заново. Внутри транзакции SQLite не дает менять synchronous, и
+    настройки не трогаются.
+    """
+
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA cache_size")
+        cache_size = cursor.fetchone()[0]
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+        cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE}")
+        cursor.execute("PRAGMA synchronous = OFF")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA cache_size = {cache_size}")
+            cursor.execute(f"PRAGMA synchronous = {synchronous}")
+
+
+def analyze():
+    """Обновляет статистику планировщика после массовой вставки (по ней
+    же оцениваются большие списки, posts.utils.estimate_rows)."""
+
+    if connection.vendor in ("sqlite", "postgresql"):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+
+def insert_stage(plan, stage, batch_size, mapper, progress):
+    name, model, fields, size, rows_function = stage
+    total = getattr(plan, size)
+    tasks = (
+        (rows_function, plan, start, min(start + batch_size, total))
+        for start in range(0, total, batch_size)
+    )
+    inserted = 0
+    for rows in mapper(_rows, tasks):
+        insert(model, fields, rows)
+        inserted += len(rows)
+        if progress:
+            progress(name, inserted)
+    return inserted
+
+
+def generate(plan, batch_size=5000, processes=1, progress=None):
+    """Вставляет данные по плану. progress(этап, вставлено строк)
+    вызывается после каждой пачки. Возвращает число строк по этапам.
+    """
+
+    # Дочерние процессы получают настроенный Django через fork.
+    pool = (
+        multiprocessing.get_context("fork").Pool(processes)
+        if processes > 1 else None
+    )
+    mapper = pool.imap if pool else map
+    totals = {}
+    try:
+        with sqlite_bulk_mode():
+            for stage in STAGES:
+                if getattr(plan, stage[0]):
+                    totals[stage[0]] = insert_stage(
+                        plan, stage, batch_size, mapper, progress
+                    )
+            if plan.ratings:
+                count_ratings(plan)
+        analyze()
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    invalidate(cache_tags.POSTS, cache_tags.GROUPS)
+    return totals
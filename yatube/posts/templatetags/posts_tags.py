@@ -0,0 +1,55 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.cache import make_key
+from posts import cache_tags, thumbnails
+from posts.models import Follow
+
+register = template.Library()
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+
+@register.simple_tag
+def post_card(post, group=False, no_author=False):
+    """Карточка поста (includes/fullpost.html) из фрагментного кэша.
+
+    Ключ включает id и дату изменения поста и версии тегов поста и его
+    группы, поэтому правка поста, смена картинки или группы и готовность
+    миниатюры дают новую карточку.
+    """
+
+    key = make_key(
+        "post-card",
+        (cache_tags.post(post.pk), cache_tags.group(post.group_id)),
+        post.pk,
+        post.updated.timestamp(),
+        int(bool(group)),
+        int(bool(no_author)),
+    )
+    card = cache.get(key)
+    if card is None:
+        card = render_to_string(
+            "includes/fullpost.html",
+            {"post": post, "group": group, "no_author": no_author},
+        )
+        cache.set(key, card, POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(card)
+
+
+@register.simple_tag
+def is_following(user, username):
+    """Подписан ли пользователь на автора с данным username."""
+
+    return Follow.objects.filter(
+        user_id=user.id, following__username=username
+    ).exists()
+
+
+@register.inclusion_tag("includes/responsive_image.html")
+def responsive_image(instance, css_class=""):
+    """Картинка поста или комментария с копиями разных ширин в srcset."""
+
+    return {"image": thumbnails.get_image(instance), "css_class": css_class}
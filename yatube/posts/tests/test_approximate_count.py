@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, Post, User
+from posts.utils import ApproximateCountPaginator, estimate_rows
+
+THRESHOLD = 5
+
+
+@mock.patch.object(ApproximateCountPaginator, "threshold", THRESHOLD)
+class ApproximateCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_user")
+        cls.test_group = Group.objects.create(
+            title="test_group", slug="test_slug", description="test"
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Тестовый пост {num}", author=cls.test_user)
+            for num in range(12)
+        )
+        Post.objects.bulk_create(
+            Post(
+                text=f"Пост группы {num}",
+                author=cls.test_user,
+                group=cls.test_group,
+            )
+            for num in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_exact_count_below_threshold(self):
+        """До порога число точное."""
+
+        paginator = ApproximateCountPaginator(
+            Post.objects.filter(group=self.test_group), 2
+        )
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.is_approximate)
+
+    def test_count_cached_above_threshold(self):
+        """Выше порога подсчет выборки кэшируется."""
+
+        queryset = Post.objects.filter(author=self.test_user)
+        self.assertEqual(ApproximateCountPaginator(queryset, 2).count, 15)
+
+        Post.objects.create(text="Новый пост", author=self.test_user)
+        paginator = ApproximateCountPaginator(queryset, 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 15, "Подсчет не из кэша")
+        self.assertTrue(paginator.is_approximate)
+
+    def test_whole_table_uses_statistics(self):
+        """Для выборки по всей таблице берется оценка по статистике."""
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        estimate = estimate_rows(Post, "default")
+        self.assertIsNotNone(estimate, "Нет статистики после ANALYZE")
+
+        paginator = ApproximateCountPaginator(Post.objects.all(), 2)
+        # Ограниченный подсчет до порога и чтение статистики.
+        with self.assertNumQueries(2):
+            self.assertEqual(paginator.count, max(estimate, THRESHOLD + 1))
+
+    def test_pages_beyond_estimate(self):
+        """Страница за оценкой открывается, пока на ней есть записи;
+        следующая определяется по самой выборке."""
+
+        queryset = Post.objects.all()
+        cache.set(
+            ApproximateCountPaginator(queryset, 2).cache_key(
+                queryset.order_by()
+            ),
+            THRESHOLD + 1,
+        )
+        paginator = ApproximateCountPaginator(queryset, 2)
+        self.assertEqual(paginator.num_pages, 3)
+
+        page = paginator.page(7)
+        self.assertEqual(len(page), 2)
+        self.assertTrue(page.has_next())
+        last_page = paginator.page(8)
+        self.assertEqual(len(last_page), 1)
+        self.assertFalse(last_page.has_next())
+        with self.assertRaises(EmptyPage):
+            paginator.page(9)
+
+    def test_index_shows_approximate_pages(self):
+        """Главная страница выводит приблизительное число страниц."""
+
+        response = Client().get(reverse("posts:index"))
+        self.assertTrue(response.context["paginator"].is_approximate)
+        self.assertContains(response, "Около")
+        self.assertNotContains(response, "Последняя")
+
+    def test_admin_changelist_approximate(self):
+        """Список постов в админке использует приблизительный подсчет."""
+
+        client = Client()
+        client.force_login(
+            User.objects.create_superuser("admin", "a@a.ru", "password")
+        )
+        response = client.get(reverse("admin:posts_post_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["cl"].paginator.is_approximate)
@@ -0,0 +1,42 @@
+import copy
+
+from django.test import TestCase
+from posts import benchmark
+from posts.models import Post
+
+
+class BenchmarkTest(TestCase):
+    def test_benchmark_run_measures_scenarios(self):
+        """Замер наполняет базу и возвращает метрики сценариев."""
+
+        report = benchmark.run(
+            scale=0.02, repeat=2, names=("index", "post", "api_posts")
+        )
+
+        self.assertEqual(
+            Post.objects.count(), report["meta"]["counts"]["posts"]
+        )
+        self.assertEqual(
+            set(report["results"]), {"index", "post", "api_posts"}
+        )
+        for result in report["results"].values():
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["peak_memory_kb"], 0)
+
+    def test_benchmark_compare_finds_regressions(self):
+        """Сравнение находит рост времени и числа запросов."""
+
+        previous = {
+            "results": {"index": {"median_ms": 10.0, "queries": 4}},
+        }
+        current = copy.deepcopy(previous)
+        current["results"]["index"]["median_ms"] = 11.0
+        self.assertEqual(benchmark.compare(previous, current), [])
+
+        current["results"]["index"].update(median_ms=20.0, queries=5)
+        self.assertEqual(
+            [metric for _, metric, _, _ in benchmark.compare(
+                previous, current
+            )],
+            ["median_ms", "queries"],
+        )
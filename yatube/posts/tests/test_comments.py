@@ -0,0 +1,164 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.comments import REPLIES_PREVIEW
+from posts.models import COMMENT_PATH_STEP, Comment, Post, User
+
+
+class CommentTreeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_author = User.objects.create_user("test_author")
+        cls.test_user = User.objects.create_user("test_user")
+        cls.test_post = Post.objects.create(
+            text="Тестовый пост для комментариев", author=cls.test_author
+        )
+
+    def setUp(self):
+        self.test_client = Client()
+        self.test_client.force_login(self.test_user)
+
+    def reply(self, parent=None, text="Тестовый ответ в треде"):
+        """Комментирует пост или комментарий через страницу ответа."""
+
+        if parent is None:
+            adress = reverse("posts:post_comment", args=[self.test_post.pk])
+        else:
+            adress = reverse(
+                "posts:comment_comment", args=[self.test_post.pk, parent.pk]
+            )
+        self.test_client.post(adress, data={"text": text})
+        return Comment.objects.order_by("-pk").first()
+
+    def test_comments_tree_position(self):
+        """Путь, уровень и тред вычисляются для любой вложенности."""
+
+        root = self.reply()
+        child = self.reply(root)
+        grandchild = self.reply(child)
+
+        for comment, depth in ((root, 0), (child, 1), (grandchild, 2)):
+            with self.subTest(depth=depth):
+                self.assertEqual(comment.depth, depth)
+                self.assertEqual(comment.thread_id, root.pk)
+        self.assertTrue(grandchild.path.startswith(child.path))
+        self.assertTrue(child.path.startswith(root.path))
+
+    def test_comments_deep_thread_path_is_not_limited(self):
+        """Путь глубокого треда длиннее прежнего предела в 255 символов."""
+
+        parent = Comment.objects.create(
+            post=self.test_post, author=self.test_user, text="Корень"
+        )
+        for _ in range(50):
+            parent = Comment.objects.create(
+                post=self.test_post,
+                author=self.test_user,
+                text="Ответ",
+                child=parent,
+            )
+
+        deepest = Comment.objects.get(pk=parent.pk)
+        self.assertEqual(deepest.depth, 50)
+        self.assertEqual(len(deepest.path), 51 * COMMENT_PATH_STEP)
+        root_segment = deepest.path[:COMMENT_PATH_STEP]
+        self.assertEqual(
+            Comment.objects.filter(path__startswith=root_segment).count(), 51
+        )
+
+    def test_comments_show_post_has_nested_tree(self):
+        """На страницу поста передается готовое дерево комментариев."""
+
+        first_root = self.reply()
+        second_root = self.reply()
+        child = self.reply(first_root)
+        grandchild = self.reply(child)
+
+        response = self.test_client.get(
+            reverse("posts:show_post", args=[self.test_post.pk])
+        )
+        tree = response.context["comment_tree"]
+
+        self.assertEqual(
+            [node.comment for node in tree],
+            [second_root, first_root],
+            "Проверьте порядок комментариев верхнего уровня",
+        )
+        self.assertEqual(tree[1].replies[0].comment, child)
+        self.assertEqual(tree[1].replies[0].replies[0].comment, grandchild)
+        self.assertContains(response, grandchild.text)
+
+    def test_comments_queries_do_not_grow_with_replies(self):
+        """Количество запросов не зависит от размера треда."""
+
+        root = self.reply()
+        adress = reverse("posts:show_post", args=[self.test_post.pk])
+
+        with CaptureQueriesContext(connection) as small:
+            self.test_client.get(adress)
+
+        parent = root
+        for _ in range(5):
+            parent = self.reply(parent)
+
+        with CaptureQueriesContext(connection) as large:
+            self.test_client.get(adress)
+
+        self.assertEqual(
+            len(small.captured_queries),
+            len(large.captured_queries),
+            "Убедитесь, что треды загружаются одним запросом",
+        )
+
+    def test_comments_thread_preview_is_bounded(self):
+        """На странице поста в треде не больше REPLIES_PREVIEW ответов."""
+
+        root = self.reply()
+        replies = [self.reply(root) for _ in range(REPLIES_PREVIEW + 2)]
+
+        response = self.test_client.get(
+            reverse("posts:show_post", args=[self.test_post.pk])
+        )
+        node = response.context["comment_tree"][0]
+
+        self.assertEqual(
+            [reply.comment for reply in node.replies],
+            replies[:REPLIES_PREVIEW],
+            "Убедитесь, что в треде загружаются только первые ответы",
+        )
+        self.assertTrue(node.has_more_replies)
+        self.assertContains(response, "Показать ещё ответы")
+
+    def test_comments_api_replies_slices(self):
+        """API отдает ответы треда порциями после указанного номера."""
+
+        root = self.reply()
+        child = self.reply(root)
+        replies = [child, self.reply(child), self.reply(root)]
+
+        adress = (
+            f"/api/v1/posts/{self.test_post.pk}/comments/{root.pk}/replies/"
+        )
+        data = self.test_client.get(adress, {"after": 0, "limit": 2}).json()
+        self.assertEqual(
+            [reply["id"] for reply in data["results"]],
+            [reply.pk for reply in replies[:2]],
+        )
+
+        data = self.test_client.get(data["next"]).json()
+        self.assertEqual(
+            [reply["id"] for reply in data["results"]], [replies[2].pk]
+        )
+        self.assertIsNone(data["next"])
+
+        data = self.test_client.get(
+            f"/api/v1/posts/{self.test_post.pk}/comments/{child.pk}/replies/"
+        ).json()
+        self.assertEqual(
+            [reply["id"] for reply in data["results"]],
+            [replies[1].pk],
+            "Убедитесь, что для ответа отдаются только его потомки",
+        )
@@ -0,0 +1,52 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import deletion, search
+from posts.models import Comment, Post, User
+
+from core.models import Job
+
+
+class PostDeletionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.test_user = User.objects.create_user("test_user")
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.test_user)
+        self.post = Post.objects.create(
+            text="Тестовый пост", author=self.test_user
+        )
+        Comment.objects.create(
+            text="Комментарий", author=self.test_user, post=self.post
+        )
+
+    def test_delete_hides_post_and_schedules_purge(self):
+        """Удаление скрывает пост сразу, а удаляет его фоновая задача."""
+
+        response = self.client.post(
+            reverse("posts:post_delete", args=[self.post.pk])
+        )
+        self.assertRedirects(
+            response, reverse("posts:show_profile", args=[self.test_user])
+        )
+
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertTrue(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.assertEqual(
+            self.client.get(self.post.get_absolute_url()).status_code, 404
+        )
+        job = Job.objects.get()
+        self.assertEqual(job.name, "posts.deletion.purge")
+
+        deletion.purge(self.post.pk)
+        self.assertFalse(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(Comment.objects.filter(post=self.post.pk).exists())
+
+    def test_delete_hides_comments_from_search(self):
+        """Комментарии скрытого поста не находятся поиском."""
+
+        deletion.schedule(self.post)
+
+        self.assertEqual(list(search.SearchResults("Комментарий")[:10]), [])
@@ -1,4 +1,4 @@
-import datetime
+import hashlib
 import http.client
 import os.path
 import shutil
@@ -149,11 +149,11 @@ class PostCreateFormTests(TestCase):
         )
 
         last_post = Post.objects.last()
-        now = datetime.datetime.today()
+        digest = hashlib.sha256(small_gif).hexdigest()
 
-        image_path_rel = f"photos/posts/{now.year}/{now.month:02d}/{now.day:02d}/"
+        image_path_rel = f"blobs/{digest[:2]}/{digest[2:4]}/{digest}.gif"
 
-        image_path_abs = os.path.join(TEMP_MEDIA_ROOT, image_path_rel, uploaded.name)
+        image_path_abs = os.path.join(TEMP_MEDIA_ROOT, image_path_rel)
 
         with open(image_path_abs, "rb") as file:
             saved_image = file.read()
@@ -169,12 +169,12 @@ class PostCreateFormTests(TestCase):
         self.assertTrue(
             Post.objects.filter(
                 text=form_data["text"],
-                image=image_path_rel + uploaded.name,
+                image=image_path_rel,
                 group=self.test_group,
             ).exists(),
             (
-                "Убедитесь, что сохраняется пост и картинка в правильной папке"
-                " по пути photos/posts/%Y/%m/%d/"
+                "Убедитесь, что сохраняется пост и картинка под именем "
+                "из хэша ее содержимого"
             ),
         )
 
@@ -0,0 +1,54 @@
+import unittest
+
+from django.db import connection
+from django.db.models import Q, Sum
+from django.test import TestCase
+from django.utils import timezone
+from posts.models import Comment, Follow, Post, Rating
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "План запроса SQLite")
+class HotQueryIndexTest(TestCase):
+    """Частые запросы идут по индексу: без полного просмотра таблицы и
+    без сортировки во временном B-дереве.
+    """
+
+    @staticmethod
+    def query_plan(queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_hot_queries_use_indexes(self):
+        """Ни один частый запрос не просматривает таблицу целиком."""
+
+        now = timezone.now()
+        queries = {
+            "посты группы": Post.objects.filter(group_id=1)[:10],
+            "посты группы по ключу": Post.objects.filter(group_id=1)
+            .filter(Q(created__lt=now) | Q(created=now, pk__lt=10))
+            .order_by("-created", "-pk")[:11],
+            "посты автора": Post.objects.filter(author_id=1)[:10],
+            "корневые комментарии": Comment.objects.filter(
+                post_id=1, is_child=False
+            )[:10],
+            "сумма оценок": Rating.objects.filter(post_id=1)
+            .values("post_id")
+            .annotate(total=Sum("rating")),
+            "оценка пользователя": Rating.objects.filter(
+                user_id=1, post_id=1
+            ),
+            "подписки": Follow.objects.filter(user_id=1),
+        }
+        for name, queryset in queries.items():
+            with self.subTest(query=name):
+                plan = self.query_plan(queryset)
+                for step in plan:
+                    self.assertFalse(
+                        step.startswith("SCAN") and "INDEX" not in step,
+                        f"Полный просмотр таблицы: {plan}",
+                    )
+                    self.assertNotIn(
+                        "TEMP B-TREE", step, f"Сортировка без индекса: {plan}"
+                    )
@@ -0,0 +1,104 @@
+import http
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, Post, User
+
+
+class KeysetPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_keyset_user")
+        cls.test_group = Group.objects.create(
+            title="test_group", slug="test_slug", description="test"
+        )
+        cls.test_cases = 25
+
+        # bulk_create дает одинаковые created у части постов - ключ (created,
+        # id) должен их различать.
+        Post.objects.bulk_create(
+            Post(
+                text=f"Тестовый пост {num}",
+                author=cls.test_user,
+                group=cls.test_group,
+            )
+            for num in range(cls.test_cases)
+        )
+
+    def setUp(self):
+        self.test_client = Client()
+        cache.clear()
+
+    def walk(self, adress):
+        """Проходит все страницы вперед, возвращает посты и курсоры."""
+
+        posts, pages, cursor = [], [], ""
+        while cursor is not None:
+            response = self.test_client.get(adress, {"cursor": cursor})
+            self.assertEqual(response.status_code, http.HTTPStatus.OK)
+            page = response.context["page_obj"]
+            posts.extend(page.object_list)
+            pages.append(page)
+            cursor = page.next_cursor
+        return posts, pages
+
+    def test_keyset_pages_cover_all_posts_in_order(self):
+        """Курсоры проходят все посты без пропусков и повторов."""
+
+        expected = list(Post.objects.order_by("-created", "-id"))
+        used_adresses = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=[self.test_group.slug]),
+            reverse("posts:show_profile", args=[self.test_user.username]),
+        )
+
+        for adress in used_adresses:
+            with self.subTest(adress=adress):
+                posts, pages = self.walk(adress)
+                self.assertEqual(
+                    posts,
+                    expected,
+                    "Проверьте, что пагинация по ключу выводит все посты",
+                )
+                self.assertEqual(len(pages), 3)
+
+    def test_keyset_previous_cursor_returns_previous_page(self):
+        """Курсор назад возвращает предыдущую страницу."""
+
+        adress = reverse("posts:index")
+        _, pages = self.walk(adress)
+
+        response = self.test_client.get(
+            adress, {"cursor": pages[2].previous_cursor}
+        )
+        page = response.context["page_obj"]
+        self.assertEqual(list(page.object_list), list(pages[1].object_list))
+        self.assertTrue(page.has_next())
+
+    def test_keyset_invalid_cursor_returns_404(self):
+        """Некорректный курсор дает 404."""
+
+        response = self.test_client.get(
+            reverse("posts:index"), {"cursor": "broken"}
+        )
+        self.assertEqual(response.status_code, http.HTTPStatus.NOT_FOUND)
+
+    def test_keyset_api_posts(self):
+        """API отдает курсоры next/previous в режиме ?cursor=."""
+
+        adress = "/api/v1/posts/"
+        response = self.test_client.get(
+            adress, {"cursor": "", "page_size": 20}
+        )
+        data = response.json()
+
+        self.assertEqual(len(data["results"]), 20)
+        self.assertIsNone(data["previous"])
+
+        data = self.test_client.get(data["next"]).json()
+        self.assertEqual(len(data["results"]), self.test_cases - 20)
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
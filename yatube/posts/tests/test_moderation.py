@@ -0,0 +1,98 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from posts import moderation
+from posts.forms import CommentForm, FeedbackForm, PostForm
+from posts.moderation import WordMatcher, find_prohibited
+
+
+class WordMatcherTest(TestCase):
+    def test_moderation_matcher_finds_overlapping_words(self):
+        """Автомат находит слова внутри других и без учета регистра."""
+
+        matcher = WordMatcher(["he", "she", "hers", "его", " ", ""])
+
+        cases = {
+            "USHERS": "she",
+            "ahers": "he",
+            "Про ЕГО дело": "его",
+            "nothing": None,
+        }
+        for text, word in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(matcher.find(text), word)
+        self.assertEqual(len(matcher), 4)
+
+    def test_moderation_matcher_agrees_with_substring_check(self):
+        """Результат совпадает с проверкой подстрок."""
+
+        words = ["abcab", "bca", "cab", "aa", "bcb"]
+        matcher = WordMatcher(words)
+        for text in ("abcacabcab", "aabc", "bcbca", "ccccc", "acbacb"):
+            with self.subTest(text=text):
+                self.assertEqual(
+                    matcher.find(text) is not None,
+                    any(word in text for word in words),
+                )
+
+
+@override_settings(PROHIBITED_WORDS=["редиска"], PROHIBITED_WORDS_FILE=None)
+class ProhibitedWordsTest(TestCase):
+    def test_moderation_forms_reject_prohibited_words(self):
+        """Посты, комментарии и обратная связь проверяют текст."""
+
+        text = "Этот человек - Редиска и точка."
+        forms = {
+            "post": (PostForm(data={"title": "t", "text": text}), "text"),
+            "comment": (CommentForm(data={"text": text}), "text"),
+            "feedback": (
+                FeedbackForm(
+                    data={
+                        "name": "Имя",
+                        "email": "mail@mail.ru",
+                        "description": "Описание",
+                        "message": text,
+                    }
+                ),
+                "message",
+            ),
+        }
+        for name, (form, field) in forms.items():
+            with self.subTest(form=name):
+                self.assertFalse(form.is_valid())
+                self.assertIn("Не надо материться.", form.errors[field])
+
+    def test_moderation_words_file_reloaded(self):
+        """Изменение файла со словами подхватывается без перезапуска, но
+
+        время изменения проверяется не на каждой проверке текста.
+        """
+
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".txt", delete=False, encoding="utf-8"
+        ) as words_file:
+            words_file.write("первое\n")
+        self.addCleanup(os.remove, words_file.name)
+
+        with override_settings(PROHIBITED_WORDS_FILE=words_file.name):
+            self.assertEqual(find_prohibited("Это первое слово"), "первое")
+            self.assertIsNone(find_prohibited("Это второе слово"))
+
+            with open(words_file.name, "a", encoding="utf-8") as update:
+                update.write("второе\n")
+            stat = os.stat(words_file.name)
+            os.utime(
+                words_file.name,
+                ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+            )
+
+            self.assertIsNone(
+                find_prohibited("Это второе слово"),
+                "Файл не должен проверяться чаще интервала",
+            )
+            with mock.patch.object(moderation, "WORDS_FILE_CHECK_INTERVAL", 0):
+                self.assertEqual(
+                    find_prohibited("Это второе слово"), "второе"
+                )
@@ -0,0 +1,147 @@
+from unittest import mock
+
+from core.cache import invalidate
+from core.db_router import pin
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts import cache_tags
+from posts.models import Follow, Group, Post, User
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_author = User.objects.create_user("test_author")
+        cls.test_user = User.objects.create_user("test_user")
+        cls.test_group = Group.objects.create(
+            title="test_group", slug="test_slug", description="test"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.test_post = Post.objects.create(
+            text="Тестовый пост",
+            author=self.test_author,
+            group=self.test_group,
+        )
+        self.author_client = Client()
+        self.author_client.force_login(self.test_author)
+        self.user_client = Client()
+        self.user_client.force_login(self.test_user)
+
+    def test_page_cache_shared_page_has_personal_header(self):
+        """Закэшированная страница получает шапку текущего пользователя."""
+
+        adress = reverse("posts:index")
+        self.user_client.get(adress)
+        Post.objects.filter(pk=self.test_post.pk).update(text="Без сигнала")
+
+        response = self.author_client.get(adress)
+        self.assertContains(
+            response, "Тестовый пост", msg_prefix="Страница не из кэша"
+        )
+        self.assertContains(response, "test_author")
+        self.assertNotContains(
+            response,
+            "test_user",
+            msg_prefix="Шапка чужого пользователя попала в кэш",
+        )
+
+    def test_page_cache_group_invalidated_by_new_post(self):
+        """Новый пост группы сбрасывает кэш страницы группы."""
+
+        adress = reverse("posts:group_list", args=[self.test_group.slug])
+        self.user_client.get(adress)
+        Post.objects.create(
+            text="Новый пост группы",
+            author=self.test_author,
+            group=self.test_group,
+        )
+        self.assertContains(self.user_client.get(adress), "Новый пост группы")
+
+    def test_page_cache_follow_button_is_personal(self):
+        """Кнопка подписки на закэшированном профиле отражает подписку."""
+
+        adress = reverse(
+            "posts:show_profile", args=[self.test_author.username]
+        )
+        self.assertContains(self.user_client.get(adress), "Подписаться")
+
+        Follow.objects.create(user=self.test_user, following=self.test_author)
+        self.assertContains(self.user_client.get(adress), "Отписаться")
+        self.assertNotContains(
+            self.author_client.get(adress),
+            "Подписаться",
+            msg_prefix="Автор не может подписаться на себя",
+        )
+
+    def test_page_cache_headers(self):
+        """Анонимам страница разрешается к кэшированию, остальным - нет."""
+
+        adress = reverse("posts:index")
+        self.assertIn("max-age=20", Client().get(adress)["Cache-Control"])
+        self.assertIn("private", self.user_client.get(adress)["Cache-Control"])
+
+    @override_settings(PAGE_CACHE_TIMEOUT=7)
+    def test_page_cache_timeout_from_settings(self):
+        """Страницы хранятся в кэше settings.PAGE_CACHE_TIMEOUT секунд."""
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.user_client.get(reverse("posts:real_group_list"))
+        timeouts = [
+            call.args[2]
+            for call in cache_set.call_args_list
+            if call.args[0].startswith("page:")
+        ]
+        self.assertEqual(timeouts, [7])
+
+    def test_page_cache_debug_toolbar_is_outside(self):
+        """HTML тулбара не попадает в кэш страниц."""
+
+        middleware = list(settings.MIDDLEWARE)
+        toolbar = "debug_toolbar.middleware.DebugToolbarMiddleware"
+        page_cache = "core.custom_middleware.page_cache.PageCacheMiddleware"
+        self.assertLess(
+            middleware.index(toolbar), middleware.index(page_cache)
+        )
+
+    @override_settings(REPLICA_PIN_SECONDS=3)
+    @mock.patch(
+        "core.custom_middleware.page_cache.read_from_replica",
+        return_value=True,
+    )
+    def test_page_cache_replica_page_short_lived(self, read_from_replica):
+        """Страница с реплики хранится не дольше REPLICA_PIN_SECONDS и не
+
+        отдается клиенту, который недавно писал.
+        """
+
+        adress = reverse("posts:index")
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.user_client.get(adress)
+        timeouts = [
+            call.args[2]
+            for call in cache_set.call_args_list
+            if call.args[0].startswith("page:")
+        ]
+        self.assertEqual(timeouts, [3])
+
+        # Меняем пост в обход сигналов и сбрасываем только кэш его
+        # карточки: закэшированная страница остается действительной.
+        Post.objects.filter(pk=self.test_post.pk).update(text="Без сигнала")
+        invalidate(cache_tags.post(self.test_post.pk))
+        self.assertContains(self.user_client.get(adress), "Тестовый пост")
+
+        pinned = HttpResponse()
+        pin(pinned)
+        self.author_client.cookies.update(pinned.cookies)
+        self.assertContains(
+            self.author_client.get(adress),
+            "Без сигнала",
+            msg_prefix="Недавно писавший клиент получил страницу с реплики",
+        )
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+from posts.models import Post, User
+from posts.utils import ApproximateCountPaginator, ElidedPaginator
+
+E = ElidedPaginator.ELLIPSIS
+
+
+class ElidedPaginatorTest(SimpleTestCase):
+    def page_range(self, pages, number):
+        paginator = ElidedPaginator(range(pages), 1)
+        return paginator.page(number).elided_page_range
+
+    def test_elided_page_range(self):
+        """Первая и последняя страницы, окно вокруг текущей и пропуски."""
+
+        cases = {
+            (5, 3): [1, 2, 3, 4, 5],
+            (100, 1): [1, 2, 3, E, 100],
+            (100, 5): [1, 2, 3, 4, 5, 6, 7, E, 100],
+            (100, 50): [1, E, 48, 49, 50, 51, 52, E, 100],
+            (100, 96): [1, E, 94, 95, 96, 97, 98, 99, 100],
+            (100, 100): [1, E, 98, 99, 100],
+        }
+        for (pages, number), expected in cases.items():
+            with self.subTest(pages=pages, number=number):
+                self.assertEqual(self.page_range(pages, number), expected)
+
+    def test_elided_page_range_size_is_bounded(self):
+        """Число ссылок не зависит от числа страниц."""
+
+        for pages in (10, 1000, 100000):
+            with self.subTest(pages=pages):
+                self.assertLessEqual(
+                    len(self.page_range(pages, pages // 2)), 9
+                )
+
+
+@mock.patch.object(ApproximateCountPaginator, "threshold", 5)
+class PaginatorTemplateTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.test_user = User.objects.create_user("test_user")
+        Post.objects.bulk_create(
+            Post(text=f"Тестовый пост {num}", author=cls.test_user)
+            for num in range(120)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_profile_renders_window_of_links(self):
+        """Профиль выводит окно ссылок на страницы, а не все страницы;
+        страницы за оценкой числа не выводятся."""
+
+        response = Client().get(
+            reverse("posts:show_profile", args=[self.test_user.username]),
+            {"page": 6},
+        )
+        self.assertEqual(
+            response.context["page_obj"].elided_page_range,
+            [1, E, 4, 5, 6, 7, 8, E],
+        )
+        self.assertContains(response, 'class="page-link">6<', count=1)
+        self.assertNotContains(response, "page=12")
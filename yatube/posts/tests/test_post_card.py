@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+from posts.models import Group, Post, User
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_user")
+        cls.test_group = Group.objects.create(
+            title="test_group", slug="test_slug", description="test"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.test_post = Post.objects.create(
+            text="Тестовый пост", author=self.test_user, group=self.test_group
+        )
+
+    def render(self, **flags):
+        post = Post.objects.select_related("author", "group").get(
+            pk=self.test_post.pk
+        )
+        template = Template(
+            "{% load posts_tags %}"
+            "{% post_card post group=group no_author=no_author %}"
+        )
+        return template.render(
+            Context(
+                {
+                    "post": post,
+                    "group": flags.get("group", False),
+                    "no_author": flags.get("no_author", False),
+                }
+            )
+        )
+
+    def test_post_card_is_cached_until_post_changes(self):
+        """Карточка берется из кэша, пока пост не изменен."""
+
+        self.assertIn("Тестовый пост", self.render())
+
+        # update() не меняет updated - карточка должна остаться прежней.
+        Post.objects.filter(pk=self.test_post.pk).update(text="Без сигнала")
+        self.assertIn(
+            "Тестовый пост",
+            self.render(),
+            "Проверьте, что карточка поста кэшируется",
+        )
+
+        self.test_post.text = "Измененный пост"
+        self.test_post.save()
+        self.assertIn(
+            "Измененный пост",
+            self.render(),
+            "Убедитесь, что изменение поста сбрасывает его карточку",
+        )
+
+    def test_post_card_invalidated_by_group_change(self):
+        """Переименование группы сбрасывает карточки ее постов."""
+
+        self.render()
+        self.test_group.slug = "new_slug"
+        self.test_group.save()
+        self.assertIn("new_slug", self.render())
+
+    def test_post_card_flags_are_cached_separately(self):
+        """Варианты карточки без автора и без группы кэшируются отдельно."""
+
+        self.assertIn("Автор", self.render())
+        self.assertNotIn("Автор", self.render(no_author=True))
+        self.assertNotIn("Группа:", self.render(group=True))
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Group, Post, User
+
+
+@override_settings(QUERY_INSPECTION="raise", QUERY_REPEAT_THRESHOLD=5)
+class QueryBudgetTest(TestCase):
+    """Число запросов страниц не растет с числом постов и комментариев:
+    N+1 или превышение query_budget вызывают ошибку в middleware.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_group = Group.objects.create(
+            title="test_group", slug="test_slug", description="test"
+        )
+        authors = [
+            User.objects.create_user(f"test_author_{index}")
+            for index in range(12)
+        ]
+        cls.test_post = Post.objects.create(
+            text="Тестовый пост", author=authors[0], group=cls.test_group
+        )
+        for author in authors:
+            Post.objects.create(
+                text="Тестовый пост", author=author, group=cls.test_group
+            )
+            Comment.objects.create(
+                post=cls.test_post, author=author, text="Комментарий"
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.user_client = Client()
+        self.user_client.force_login(User.objects.first())
+
+    def test_query_budget_pages(self):
+        """Главная страница и страница поста укладываются в бюджет."""
+
+        addresses = (
+            reverse("posts:index"),
+            reverse("posts:show_post", args=[self.test_post.pk]),
+        )
+        for address in addresses:
+            with self.subTest(address=address):
+                response = self.user_client.get(address)
+                self.assertEqual(response.status_code, 200)
+
+    def test_query_budget_api_posts(self):
+        """Список постов API не запрашивает авторов комментариев по
+        одному.
+        """
+
+        for address in ("/api/v1/posts/", "/api/v1/posts/?limit=10"):
+            with self.subTest(address=address):
+                response = self.user_client.get(address)
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import rating
+from posts.models import Post, Rating, User
+
+
+class RatingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_author = User.objects.create_user("test_author")
+        cls.test_user = User.objects.create_user("test_user")
+        cls.test_post = Post.objects.create(
+            text="Тестовый пост для оценок", author=cls.test_author
+        )
+
+    def setUp(self):
+        self.test_client = Client()
+        self.test_client.force_login(self.test_user)
+
+    def counters(self):
+        post = Post.objects.get(pk=self.test_post.pk)
+        return post.rating, post.likes_count, post.dislikes_count
+
+    def test_rating_like_and_dislike_update_counters(self):
+        """Лайк и дизлайк атомарно меняют счетчики поста."""
+
+        like = reverse("posts:post_like", args=[self.test_post.pk])
+        dislike = reverse("posts:post_dislike", args=[self.test_post.pk])
+
+        steps = (
+            (like, (1, 1, 0)),
+            (like, (1, 1, 0)),
+            (dislike, (0, 0, 0)),
+            (dislike, (-1, 0, 1)),
+        )
+        for adress, expected in steps:
+            with self.subTest(adress=adress, expected=expected):
+                self.test_client.get(adress)
+                self.assertEqual(
+                    self.counters(),
+                    expected,
+                    "Проверьте обновление счетчиков рейтинга поста",
+                )
+
+        response = self.test_client.get(
+            reverse("posts:show_post", args=[self.test_post.pk])
+        )
+        self.assertEqual(response.context["rating"], -1)
+
+    def test_rating_author_cannot_rate_own_post(self):
+        """Автор не может оценивать свой пост."""
+
+        self.test_client.force_login(self.test_author)
+        self.test_client.get(
+            reverse("posts:post_like", args=[self.test_post.pk])
+        )
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_rating_api_create_and_delete(self):
+        """Оценка через API учитывается в счетчиках и снимается при
+
+        удалении.
+        """
+
+        adress = f"/api/v1/posts/{self.test_post.pk}/rating/"
+        self.test_client.post(adress, {"rating": 1})
+        self.test_client.post(adress, {"rating": -1})
+        self.assertEqual(self.counters(), (-1, 0, 1))
+        self.assertEqual(Rating.objects.count(), 1)
+
+        rating = Rating.objects.get()
+        self.test_client.delete(f"{adress}{rating.pk}/")
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_rating_concurrent_create_applies_value(self):
+        """Если оценку параллельно создал другой запрос, новое значение
+
+        все равно применяется к ней и к счетчикам.
+        """
+
+        # Оценка создана другим запросом уже после того, как set_rating
+        # проверил ее отсутствие: первая выборка ничего не находит, а
+        # вставка противоположной оценки нарушает уникальность в базе.
+        Rating.objects.create(
+            user=self.test_user, post=self.test_post, rating=rating.LIKE
+        )
+        rating._apply_change(self.test_post.pk, 0, rating.LIKE)
+        real_filter = Rating.objects.filter
+        calls = []
+
+        def filter_missing_first(*args, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                return Rating.objects.none()
+            return real_filter(*args, **kwargs)
+
+        with mock.patch.object(
+            Rating.objects, "filter", side_effect=filter_missing_first
+        ):
+            result = rating.set_rating(
+                self.test_user, self.test_post, rating.DISLIKE
+            )
+
+        self.assertEqual(result.rating, rating.DISLIKE)
+        self.assertEqual(
+            Rating.objects.get(user=self.test_user).rating, rating.DISLIKE
+        )
+        self.assertEqual(self.counters(), (-1, 0, 1))
+
+    def test_rating_one_per_user_and_post(self):
+        """Лайк и дизлайк одного пользователя одному посту не хранятся
+
+        одновременно.
+        """
+
+        Rating.objects.create(
+            user=self.test_user, post=self.test_post, rating=rating.LIKE
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Rating.objects.create(
+                user=self.test_user, post=self.test_post, rating=rating.DISLIKE
+            )
+
+    def test_rating_reconcile_command_fixes_drift(self):
+        """Команда reconcile_ratings пересчитывает счетчики."""
+
+        Rating.objects.create(
+            user=self.test_user, post=self.test_post, rating=1
+        )
+        Post.objects.filter(pk=self.test_post.pk).update(rating=42)
+
+        call_command("reconcile_ratings", batch_size=1, verbosity=0)
+
+        self.assertEqual(self.counters(), (1, 1, 0))
@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Post, User
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_user")
+
+    def setUp(self):
+        cache.clear()
+        self.test_client = Client()
+        self.in_text = Post.objects.create(
+            title="Про котов",
+            text="Черепахи живут долго",
+            author=self.test_user,
+        )
+        self.in_title = Post.objects.create(
+            title="Черепахи",
+            text="Заметки натуралиста",
+            author=self.test_user,
+        )
+        self.comment = Comment.objects.create(
+            text="Моя черепаха любит салат",
+            author=self.test_user,
+            post=self.in_text,
+        )
+
+    def search(self, query):
+        response = self.test_client.get(reverse("posts:search"), {"q": query})
+        return response.context["results"]
+
+    def test_search_ranked_posts_and_comments(self):
+        """Совпадение в заголовке важнее, комментарии тоже находятся."""
+
+        self.assertEqual(
+            self.search("черепахи"),
+            [self.in_title, self.in_text],
+            "Проверьте ранжирование результатов поиска",
+        )
+        results = self.search("черепах")
+        self.assertEqual(results[0], self.in_title)
+        self.assertCountEqual(
+            results,
+            [self.in_title, self.in_text, self.comment],
+            "Убедитесь, что слова ищутся по префиксу",
+        )
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении объектов."""
+
+        self.in_text.text = "Теперь про собак"
+        self.in_text.save()
+        self.comment.delete()
+
+        self.assertEqual(self.search("черепах"), [self.in_title])
+        self.assertEqual(self.search("собак"), [self.in_text])
+
+    def test_search_query_syntax_is_escaped(self):
+        """Операторы FTS5 в запросе не ломают поиск."""
+
+        for query in ('"черепахи', "черепахи OR", "NEAR(", "*", ""):
+            with self.subTest(query=query):
+                response = self.test_client.get(
+                    reverse("posts:search"), {"q": query}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_search_pagination_keeps_query(self):
+        """Ссылки пагинации сохраняют поисковый запрос."""
+
+        for number in range(12):
+            Post.objects.create(
+                title=f"Пост {number}",
+                text="Общее слово",
+                author=self.test_user,
+            )
+
+        response = self.test_client.get(
+            reverse("posts:search"), {"q": "общее", "page": 2}
+        )
+        self.assertEqual(len(response.context["results"]), 2)
+        self.assertContains(response, "?q=%D0%BE%D0%B1%D1%89%D0%B5%D0%B5")
+
+    def test_search_api(self):
+        """API поиска отдает результаты и фильтрует по виду."""
+
+        data = self.test_client.get(
+            "/api/v1/search/", {"q": "черепах", "type": "comment"}
+        ).json()
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(
+            data["results"][0],
+            {
+                "type": "comment",
+                "id": self.comment.pk,
+                "post": self.in_text.pk,
+                "title": self.in_text.title,
+                "text": self.comment.text,
+                "author": self.test_user.username,
+                "created": data["results"][0]["created"],
+            },
+        )
+
+        response = self.test_client.get(
+            "/api/v1/search/", {"q": "черепах", "type": "group"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_admin_uses_index(self):
+        """Поиск в админке находит посты по заголовку через индекс."""
+
+        admin = User.objects.create_superuser("admin", "a@a.ru", "pass")
+        self.test_client.force_login(admin)
+
+        response = self.test_client.get(
+            reverse("admin:posts_post_changelist"), {"q": "черепахи"}
+        )
+        self.assertEqual(
+            set(response.context["cl"].result_list),
+            {self.in_title, self.in_text},
+        )
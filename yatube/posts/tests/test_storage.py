@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from core.models import Blob
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from posts.models import Comment, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name="meme.png", color="red"):
+    content = BytesIO()
+    Image.new("RGB", (400, 300), color).save(content, "PNG")
+    return SimpleUploadedFile(
+        name=name, content=content.getvalue(), content_type="image/png"
+    )
+
+
+def run_on_commit(func):
+    func()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=True)
+@mock.patch("core.storage.transaction.on_commit", run_on_commit)
+class ContentAddressedStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_user")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, image):
+        return Post.objects.create(
+            text="Пост с картинкой", author=self.test_user, image=image
+        )
+
+    def test_storage_same_content_stored_once(self):
+        """Одинаковые загрузки хранятся одним файлом со счетчиком ссылок."""
+
+        first = self.create_post(make_image("first.png"))
+        second = self.create_post(make_image("second.png"))
+        comment = Comment.objects.create(
+            text="Тот же мем",
+            author=self.test_user,
+            post=first,
+            image=make_image("third.png"),
+        )
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(first.image.name, comment.image.name)
+        self.assertTrue(first.image.name.startswith("blobs/"))
+        self.assertEqual(Blob.objects.get(name=first.image.name).references, 3)
+
+    def test_storage_derivatives_reused(self):
+        """Копии одинаковой картинки не создаются повторно."""
+
+        first = self.create_post(make_image())
+        with mock.patch("posts.thumbnails.render_derivatives") as render:
+            second = self.create_post(make_image())
+        render.assert_not_called()
+
+        self.assertEqual(
+            sorted(first.derivatives.values_list("image", flat=True)),
+            sorted(second.derivatives.values_list("image", flat=True)),
+        )
+
+    def test_storage_blob_reclaimed_with_last_reference(self):
+        """Файл и его копии удаляются вместе с последней ссылкой."""
+
+        first = self.create_post(make_image())
+        second = self.create_post(make_image())
+        name = first.image.name
+        derivatives = list(first.derivatives.values_list("image", flat=True))
+
+        first.delete()
+        self.assertTrue(default_storage.exists(name))
+
+        second.delete()
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        for derivative in derivatives:
+            with self.subTest(derivative=derivative):
+                self.assertFalse(default_storage.exists(derivative))
+
+    def test_storage_replaced_image_released(self):
+        """Замена картинки снимает ссылку с прежней."""
+
+        post = self.create_post(make_image())
+        old_name = post.image.name
+
+        post.image = make_image(color="blue")
+        post.save()
+
+        self.assertFalse(default_storage.exists(old_name))
+        self.assertEqual(Blob.objects.get(name=post.image.name).references, 1)
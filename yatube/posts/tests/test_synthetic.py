@@ -0,0 +1,75 @@
+from django.contrib.auth import authenticate
+from django.db.models import Count
+from django.test import TestCase
+from posts import rating, synthetic
+from posts.models import Comment, Follow, Post, Rating, User
+
+
+class SyntheticDataTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.existing = User.objects.create_user("test_user")
+        cls.plan = synthetic.make_plan(
+            users=30, groups=3, posts=200, comments=600, follows=4,
+            ratings=300,
+        )
+        cls.totals = synthetic.generate(cls.plan, batch_size=150)
+
+    def test_synthetic_counts(self):
+        """Создано запрошенное число строк, существующие данные целы."""
+
+        self.assertEqual(User.objects.count(), 31)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 600)
+        self.assertEqual(Follow.objects.count(), self.totals["follows"])
+        self.assertEqual(Rating.objects.count(), self.totals["ratings"])
+        self.assertTrue(User.objects.filter(pk=self.existing.pk).exists())
+        self.assertIsNotNone(
+            authenticate(
+                username=f"load_user_{self.plan.first_user}",
+                password=synthetic.PASSWORD,
+            ),
+            "Созданные пользователи не могут войти",
+        )
+
+    def test_synthetic_comment_trees(self):
+        """Путь, тред, номер ответа и число ответов согласованы."""
+
+        comments = {comment.pk: comment for comment in Comment.objects.all()}
+        replies = Comment.objects.filter(is_child=True)
+        self.assertTrue(replies.exists(), "Ответов в тредах нет")
+
+        for reply in replies:
+            parent = comments[reply.child_id]
+            self.assertTrue(reply.path.startswith(parent.path))
+            self.assertEqual(reply.depth, parent.depth + 1)
+            self.assertEqual(reply.thread_id, parent.thread_id)
+            self.assertEqual(reply.post_id, parent.post_id)
+            self.assertGreaterEqual(reply.created, parent.created)
+
+        threads = (
+            Comment.objects.filter(is_child=True)
+            .order_by()
+            .values("thread")
+            .annotate(replies=Count("id"))
+        )
+        for thread in threads:
+            root = comments[thread["thread"]]
+            self.assertEqual(root.replies_count, thread["replies"])
+            positions = Comment.objects.filter(
+                thread_id=root.pk, is_child=True
+            ).values_list("position", flat=True)
+            self.assertCountEqual(
+                positions, range(1, thread["replies"] + 1)
+            )
+
+    def test_synthetic_ratings_and_skew(self):
+        """Счетчики рейтинга посчитаны, свежие посты популярнее."""
+
+        self.assertEqual(rating.reconcile(), 0, "Счетчики рейтинга неверны")
+
+        posts = Post.objects.order_by("created").annotate(
+            comments_number=Count("comments")
+        )
+        numbers = [post.comments_number for post in posts]
+        self.assertGreater(sum(numbers[-20:]), sum(numbers[:100]))
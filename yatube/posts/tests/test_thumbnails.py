@@ -0,0 +1,177 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from core.models import Job
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from posts import thumbnails
+from posts.models import Comment, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name="small.png", size=(64, 48)):
+    content = BytesIO()
+    Image.new("RGB", size, "red").save(content, "PNG")
+    return SimpleUploadedFile(
+        name=name, content=content.getvalue(), content_type="image/png"
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=True)
+class ThumbnailPipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_user = User.objects.create_user("test_user")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_thumbnails_generated_after_upload(self):
+        """Копии картинки поста создаются при загрузке, а не при просмотре."""
+
+        post = Post.objects.create(
+            text="Пост с картинкой",
+            author=self.test_user,
+            image=make_image(size=(1600, 1200)),
+        )
+
+        formats = [name for name, _ in thumbnails.supported_formats()]
+        self.assertEqual(
+            sorted(
+                post.derivatives.values_list("format", "width", "height")
+            ),
+            sorted(
+                (name, width, width * 3 // 4)
+                for name in formats
+                for width in thumbnails.WIDTHS["post"]
+            ),
+            "Проверьте набор ширин и пропорции копий",
+        )
+
+        image = thumbnails.get_image(post)
+        self.assertFalse(image.is_placeholder)
+        self.assertEqual((image.width, image.height), (1280, 960))
+
+        response = Client().get(reverse("posts:show_post", args=[post.pk]))
+        self.assertContains(response, f'srcset="{image.srcset}"')
+        self.assertContains(response, f'sizes="{image.sizes}"')
+
+    def test_thumbnails_not_upscaled(self):
+        """Копии не шире исходной картинки."""
+
+        post = Post.objects.create(
+            text="Пост с картинкой",
+            author=self.test_user,
+            image=make_image(size=(700, 350)),
+        )
+        widths = set(post.derivatives.values_list("width", flat=True))
+        self.assertEqual(widths, {320, 640, 700})
+
+    def test_thumbnails_comment_image_is_resized(self):
+        """Картинка комментария выводится копиями, а не оригиналом."""
+
+        post = Post.objects.create(text="Пост", author=self.test_user)
+        comment = Comment.objects.create(
+            text="Комментарий с картинкой",
+            author=self.test_user,
+            post=post,
+            image=make_image(size=(1200, 1200)),
+        )
+
+        image = thumbnails.get_image(comment)
+        self.assertEqual((image.width, image.height), (1000, 1000))
+
+        response = Client().get(reverse("posts:show_post", args=[post.pk]))
+        self.assertContains(response, image.srcset)
+        self.assertNotContains(
+            response,
+            comment.image.url,
+            msg_prefix="Убедитесь, что комментарий не отдает оригинал",
+        )
+
+    def test_thumbnails_replaced_with_new_image(self):
+        """Новая картинка заменяет копии прежней."""
+
+        post = Post.objects.create(
+            text="Пост с картинкой", author=self.test_user, image=make_image()
+        )
+        post.image = make_image(name="other.png", size=(80, 40))
+        post.save()
+
+        self.assertEqual(
+            set(post.derivatives.values_list("source", flat=True)),
+            {post.image.name},
+        )
+
+    def test_thumbnails_placeholder_until_ready(self):
+        """Пока миниатюры нет, страница выводит заглушку и не ресайзит."""
+
+        with mock.patch("posts.thumbnails.enqueue") as enqueue:
+            post = Post.objects.create(
+                text="Пост с картинкой",
+                author=self.test_user,
+                image=make_image(),
+            )
+            response = Client().get(
+                reverse("posts:show_post", args=[post.pk])
+            )
+        self.assertContains(response, thumbnails.PLACEHOLDER)
+        enqueue.assert_called_once_with(
+            "posts.Post", post.pk, post.image.name
+        )
+
+    def test_thumbnails_not_rescheduled_without_new_image(self):
+        """Правка поста без новой картинки не ставит миниатюры в очередь."""
+
+        post = Post.objects.create(
+            text="Пост с картинкой", author=self.test_user, image=make_image()
+        )
+        with mock.patch("posts.thumbnails.enqueue") as enqueue:
+            post.text = "Измененный пост"
+            post.save()
+        enqueue.assert_not_called()
+
+    @override_settings(JOBS_EAGER=False)
+    def test_thumbnails_not_enqueued_while_running_or_dead(self):
+        """Задача для картинки не дублируется, пока прежняя выполняется или
+
+        не выполнилась.
+        """
+
+        post = Post.objects.create(
+            text="Пост с картинкой", author=self.test_user, image=make_image()
+        )
+        job = Job.objects.get()
+        for status in (Job.RUNNING, Job.DEAD):
+            with self.subTest(status=status):
+                Job.objects.filter(pk=job.pk).update(status=status)
+                thumbnails.schedule(post)
+                self.assertEqual(Job.objects.count(), 1)
+
+    def test_thumbnails_backfill_command(self):
+        """Команда backfill_thumbnails создает копии старых картинок."""
+
+        with mock.patch("posts.thumbnails.enqueue"):
+            post = Post.objects.create(
+                text="Пост с картинкой",
+                author=self.test_user,
+                image=make_image(),
+            )
+        self.assertFalse(post.derivatives.exists())
+
+        call_command("backfill_thumbnails", verbosity=0)
+
+        self.assertTrue(post.derivatives.exists())
+        self.assertFalse(thumbnails.missing(Post).exists())
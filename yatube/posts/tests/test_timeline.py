@@ -0,0 +1,152 @@
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Follow, Post, Timeline, TimelineEntry, User
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.test_follower = User.objects.create_user("test_follower")
+        cls.test_author = User.objects.create_user("test_author")
+        cls.test_other_author = User.objects.create_user("test_other")
+
+        for author in (cls.test_author, cls.test_other_author):
+            Post.objects.bulk_create(
+                Post(text=f"Тестовый пост {num}", author=author)
+                for num in range(3)
+            )
+
+    def setUp(self):
+        self.test_client = Client()
+        self.test_client.force_login(self.test_follower)
+
+    def feed(self):
+        response = self.test_client.get(reverse("posts:show_follows"))
+        return list(response.context["object_list"])
+
+    def test_timeline_follow_builds_timeline(self):
+        """Подписка строит ленту и раскладывает в нее посты автора."""
+
+        self.test_client.get(
+            reverse("posts:profile_follow", args=[self.test_author])
+        )
+
+        self.assertTrue(
+            Timeline.objects.filter(user=self.test_follower).exists(),
+            "Убедитесь, что подписка строит ленту пользователя",
+        )
+        self.assertEqual(
+            self.feed(),
+            list(Post.objects.filter(author=self.test_author)),
+            "Убедитесь, что в ленте все посты автора в порядке публикации",
+        )
+
+    def test_timeline_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков."""
+
+        self.test_client.get(
+            reverse("posts:profile_follow", args=[self.test_author])
+        )
+        author_client = Client()
+        author_client.force_login(self.test_author)
+        author_client.post(
+            reverse("posts:post_create"),
+            data={"title": "Заголовок", "text": "Новый пост для ленты"},
+        )
+
+        new_post = Post.objects.get(text="Новый пост для ленты")
+        self.assertEqual(
+            self.feed()[0],
+            new_post,
+            "Убедитесь, что новый пост раскладывается в ленты подписчиков",
+        )
+
+    def test_timeline_unfollow_and_delete_trim_timeline(self):
+        """Отписка и удаление поста убирают записи из ленты."""
+
+        for author in (self.test_author, self.test_other_author):
+            self.test_client.get(
+                reverse("posts:profile_follow", args=[author])
+            )
+        Post.objects.filter(author=self.test_other_author).first().delete()
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.test_follower).count(),
+            5,
+            "Убедитесь, что удаленный пост пропадает из ленты",
+        )
+
+        self.test_client.get(
+            reverse("posts:profile_unfollow", args=[self.test_author])
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(
+                user=self.test_follower, author=self.test_author
+            ).exists(),
+            "Убедитесь, что отписка убирает посты автора из ленты",
+        )
+        self.assertEqual(len(self.feed()), 2)
+
+    def test_timeline_follow_deleted_outside_views_trims_timeline(self):
+        """Удаление подписки в обход вьюхи (админка, shell) тоже убирает
+
+        посты автора из ленты.
+        """
+
+        self.test_client.get(
+            reverse("posts:profile_follow", args=[self.test_author])
+        )
+        Follow.objects.filter(
+            user=self.test_follower, following=self.test_author
+        ).delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.test_follower).exists(),
+            "Убедитесь, что удаление подписки убирает посты автора из ленты",
+        )
+
+    def test_timeline_orm_follow_and_post_reach_timeline(self):
+        """Подписка и пост, созданные в обход вьюх (админка, shell,
+
+        фикстуры), тоже попадают в ленту.
+        """
+
+        Follow.objects.create(
+            user=self.test_follower, following=self.test_author
+        )
+        self.assertTrue(
+            Timeline.objects.filter(user=self.test_follower).exists(),
+            "Убедитесь, что подписка строит ленту пользователя",
+        )
+        new_post = Post.objects.create(
+            text="Пост из shell", author=self.test_author
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.test_follower).count(), 4
+        )
+        self.assertEqual(self.feed()[0], new_post)
+
+    def test_timeline_fallback_and_backfill_command(self):
+        """Без построенной ленты (подписки созданы bulk_create, в обход
+
+        сигналов) работает прежний запрос, команда строит ленту.
+        """
+
+        Follow.objects.bulk_create(
+            [Follow(user=self.test_follower, following=self.test_other_author)]
+        )
+        expected = list(Post.objects.filter(author=self.test_other_author))
+
+        self.assertEqual(
+            self.feed(),
+            expected,
+            "Убедитесь, что без ленты используется запрос через подписки",
+        )
+
+        call_command("build_timelines", verbosity=0)
+
+        self.assertTrue(
+            Timeline.objects.filter(user=self.test_follower).exists()
+        )
+        self.assertEqual(self.feed(), expected)
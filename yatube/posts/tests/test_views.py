@@ -752,7 +752,7 @@ class NewClass(TestCase):
         профиля.
         """
 
-        Post.objects.create(
+        test_post = Post.objects.create(
             text="Тестовый пост",
             author=self.test_user,
             group=self.test_group,
@@ -763,7 +763,8 @@ class NewClass(TestCase):
         response = self.test_client.get(reverse("posts:index"))
         initial_content = response.content
 
-        Post.objects.get(id=1).delete()
+        # update() не отправляет сигналов - кэш не инвалидируется.
+        Post.objects.filter(id=test_post.id).update(text="Измененный текст")
 
         response = self.test_client.get(reverse("posts:index"))
         self.assertEqual(
@@ -772,13 +773,13 @@ class NewClass(TestCase):
             "Проверьте, что добавили кэширование на главную страницу",
         )
 
-        cache.clear()
+        test_post.delete()
 
         response = self.test_client.get(reverse("posts:index"))
         self.assertNotEqual(
             response.content,
             initial_content,
-            "Кэширование работает некорректно",
+            "Убедитесь, что удаление поста сбрасывает кэш главной страницы",
         )
 
         cache_control = response.get("cache-control", None)
@@ -792,3 +793,32 @@ class NewClass(TestCase):
                 f"{cache_timer_seconds} секунд"
             ),
         )
+
+    def test_posts_index_cache_separates_users_and_survives_login(self):
+        """Закэшированная главная не отдается другому пользователю, а вход
+
+        на сайт не сбрасывает кэш.
+        """
+
+        Post.objects.create(text="Тестовый пост", author=self.test_user)
+        anonymous_content = self.test_client.get(
+            reverse("posts:index")
+        ).content
+
+        user_client = Client()
+        user_client.force_login(self.test_user)
+        user_content = user_client.get(reverse("posts:index")).content
+        self.assertNotEqual(
+            anonymous_content,
+            user_content,
+            "Убедитесь, что кэш главной страницы учитывает пользователя",
+        )
+
+        Post.objects.update(text="Измененный текст")
+        user_client.get(reverse("users:logout"))
+        Client().get(reverse("users:login"))
+        self.assertEqual(
+            Client().get(reverse("posts:index")).content,
+            anonymous_content,
+            "Убедитесь, что вход на сайт не очищает кэш",
+        )
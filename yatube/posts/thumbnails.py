@@ -0,0 +1,269 @@
+"""Фоновая подготовка уменьшенных копий картинок постов и комментариев.
+
+Для каждой картинки создаются копии фиксированного набора ширин (WIDTHS)
+в WebP и JPEG, их размеры хранятся в ImageDerivative. После сохранения
+объекта с новой картинкой копии создает фоновая задача (core.jobs), а
+шаблоны только выводят уже готовые копии через srcset/sizes и до их
+появления показывают заглушку. Поэтому ни один запрос страницы не
+занимается ресайзом и не пишет в базу. Копии картинок, загруженных до
+появления пайплайна, ставит в очередь команда backfill_thumbnails.
+
+Файлы копий принадлежат исходной картинке, а не объекту: одинаковые
+загрузки хранятся одним файлом (core.storage), и объект с уже обработанной
+картинкой получает готовые копии. Удаляются копии вместе с картинкой.
+"""
+
+import hashlib
+from io import BytesIO
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.templatetags.static import static
+from PIL import Image, ImageOps
+
+from core import jobs
+from core.cache import invalidate
+from core.models import Job
+
+from . import cache_tags
+from .models import ImageDerivative, Post
+
+# Ширины копий и атрибут sizes по имени модели.
+WIDTHS = {
+    "post": (320, 640, 960, 1280),
+    "comment": (320, 500, 1000),
+}
+SIZES = {
+    "post": "(min-width: 768px) 75vw, 100vw",
+    "comment": "(min-width: 576px) 500px, 100vw",
+}
+# Формат копии, формат Pillow и MIME-тип в порядке предпочтения браузером.
+FORMATS = (
+    ("webp", "WEBP", "image/webp"),
+    ("jpeg", "JPEG", "image/jpeg"),
+)
+QUALITY = 80
+PLACEHOLDER = "img/thumbnail-placeholder.svg"
+PLACEHOLDER_SIZE = (1280, 1024)
+
+
+class Placeholder:
+    """Заглушка с пропорциями будущей картинки."""
+
+    is_placeholder = True
+
+    def __init__(self):
+        self.url = static(PLACEHOLDER)
+        self.width, self.height = PLACEHOLDER_SIZE
+
+
+class ResponsiveImage:
+    """Готовые копии картинки, сгруппированные по форматам."""
+
+    is_placeholder = False
+
+    def __init__(self, derivatives, sizes):
+        self.sizes = sizes
+        by_format = {}
+        for derivative in derivatives:
+            by_format.setdefault(derivative.format, []).append(derivative)
+        # JPEG понимают все браузеры, остальные форматы идут в <source>.
+        fallback_format = "jpeg" if "jpeg" in by_format else next(
+            iter(by_format)
+        )
+        self.sources = [
+            (mime_type, srcset(by_format[name]))
+            for name, _, mime_type in FORMATS
+            if name in by_format and name != fallback_format
+        ]
+        fallback = by_format[fallback_format]
+        largest = max(fallback, key=lambda derivative: derivative.width)
+        self.srcset = srcset(fallback)
+        self.url = largest.image.url
+        self.width = largest.width
+        self.height = largest.height
+
+
+def srcset(derivatives):
+    return ", ".join(
+        f"{derivative.image.url} {derivative.width}w"
+        for derivative in sorted(derivatives, key=lambda d: d.width)
+    )
+
+
+def supported_formats():
+    """Форматы из FORMATS, которые текущая сборка Pillow умеет сохранять."""
+
+    Image.init()
+    return [
+        (name, pil_format)
+        for name, pil_format, _ in FORMATS
+        if pil_format in Image.SAVE
+    ]
+
+
+def target_widths(model_name, source_width):
+    """Ширины копий без увеличения: большие исходника заменяются им."""
+
+    widths = WIDTHS[model_name]
+    targets = [width for width in widths if width < source_width]
+    if len(targets) < len(widths):
+        targets.append(source_width)
+    return targets
+
+
+def get_image(instance):
+    """Копии картинки объекта или заглушка, пока их нет.
+
+    Копии берутся из instance.derivatives, поэтому на страницах списков
+    их стоит загружать через prefetch_related.
+    """
+
+    model_name = instance._meta.model_name
+    derivatives = [
+        derivative
+        for derivative in instance.derivatives.all()
+        if derivative.source == instance.image.name
+    ]
+    if derivatives:
+        return ResponsiveImage(derivatives, SIZES[model_name])
+    return Placeholder()
+
+
+def schedule(instance):
+    """Ставит создание копий картинки объекта в очередь."""
+
+    enqueue(instance._meta.label, instance.pk, instance.image.name)
+
+
+def missing(model):
+    """Объекты модели с картинкой, для которой еще нет копий."""
+
+    ready = ImageDerivative.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=OuterRef("pk"),
+        source=OuterRef("image"),
+    )
+    return (
+        model.objects.exclude(image="")
+        .annotate(ready=Exists(ready))
+        .filter(ready=False)
+    )
+
+
+def enqueue(label, pk, name):
+    """Передает создание копий фоновой задаче (core.jobs). Повторно для
+    той же картинки задача не ставится, пока прежняя ждет в очереди или
+    выполняется, а также если прежняя не выполнилась (ее перезапускают
+    из админки).
+    """
+
+    key = f"thumbnails:{label}:{pk}:{name}"
+    if Job.objects.filter(
+        key=key, status__in=(Job.RUNNING, Job.DEAD)
+    ).exists():
+        return
+    jobs.enqueue(generate, label, pk, priority=jobs.HIGH, key=key)
+
+
+def derivatives_folder(source):
+    return f"derivatives/{hashlib.md5(source.encode()).hexdigest()}"
+
+
+def render_derivatives(instance):
+    """Сохраняет копии картинки в хранилище, возвращает несохраненные
+    ImageDerivative.
+    """
+
+    model_name = instance._meta.model_name
+    folder = derivatives_folder(instance.image.name)
+
+    with instance.image.open("rb") as image_file:
+        source = ImageOps.exif_transpose(Image.open(image_file))
+        source = source.convert("RGB")
+
+    derivatives = []
+    for width in target_widths(model_name, source.width):
+        height = max(1, round(source.height * width / source.width))
+        resized = source.resize((width, height), Image.LANCZOS)
+        for name, pil_format in supported_formats():
+            content = BytesIO()
+            resized.save(content, pil_format, quality=QUALITY)
+            path = default_storage.save(
+                f"{folder}/{width}.{name}", ContentFile(content.getvalue())
+            )
+            derivatives.append(
+                ImageDerivative(
+                    content_object=instance,
+                    source=instance.image.name,
+                    image=path,
+                    format=name,
+                    width=width,
+                    height=height,
+                )
+            )
+    return derivatives
+
+
+def reuse_derivatives(instance):
+    """Копии той же картинки, уже созданные для другого объекта того же
+    типа, или пустой список.
+    """
+
+    existing = {}
+    derivatives = ImageDerivative.objects.filter(
+        source=instance.image.name,
+        content_type__model=instance._meta.model_name,
+        content_type__app_label=instance._meta.app_label,
+    )
+    for derivative in derivatives:
+        existing.setdefault((derivative.format, derivative.width), derivative)
+    return [
+        ImageDerivative(
+            content_object=instance,
+            source=derivative.source,
+            image=derivative.image.name,
+            format=derivative.format,
+            width=derivative.width,
+            height=derivative.height,
+        )
+        for derivative in existing.values()
+    ]
+
+
+def generate(label, pk):
+    """Создает копии картинки объекта взамен прежних и сбрасывает кэш
+    страниц с ним.
+    """
+
+    model = apps.get_model(label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not instance.image:
+        return
+
+    derivatives = reuse_derivatives(instance) or render_derivatives(instance)
+    with transaction.atomic():
+        instance.derivatives.all().delete()
+        ImageDerivative.objects.bulk_create(derivatives)
+
+    if isinstance(instance, Post):
+        invalidate(*cache_tags.for_post(instance))
+    else:
+        invalidate(cache_tags.post(instance.post_id))
+
+
+def delete_derivatives(source):
+    """Удаляет копии картинки, которая больше нигде не используется."""
+
+    ImageDerivative.objects.filter(source=source).delete()
+    folder = derivatives_folder(source)
+    try:
+        _, files = default_storage.listdir(folder)
+    except FileNotFoundError:
+        return
+    for name in files:
+        default_storage.delete(f"{folder}/{name}")
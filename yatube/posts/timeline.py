@@ -0,0 +1,109 @@
+"""Материализованная лента подписок (fan-out on write).
+
+При публикации пост раскладывается в ленты подписчиков (сигналы
+posts.signals срабатывают и для объектов из админки, shell и фикстур),
+поэтому страница
+подписок читается одним индексным диапазоном по TimelineEntry вместо
+join'а Post -> Follow с сортировкой. Для пользователей, чья лента еще не
+построена, остается прежний запрос через Follow.
+"""
+
+from django.db import transaction
+
+from .models import Follow, Post, Timeline, TimelineEntry
+
+BATCH_SIZE = 1000
+
+
+def has_timeline(user_id):
+    """Построена ли у пользователя материализованная лента."""
+
+    return Timeline.objects.filter(user_id=user_id).exists()
+
+
+def get_feed(user):
+    """Посты ленты подписок пользователя, новые сверху."""
+
+    if has_timeline(user.id):
+        return Post.objects.filter(timeline_entries__user=user).order_by(
+            "-timeline_entries__created", "-id"
+        )
+    return Post.objects.filter(author__following__user=user)
+
+
+def _add_posts(user_id, posts):
+    """Раскладывает посты в ленту пользователя пачками."""
+
+    entries = []
+    for post_id, author_id, created in posts.values_list(
+        "id", "author_id", "created"
+    ).iterator():
+        entries.append(
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                created=created,
+            )
+        )
+        if len(entries) >= BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+            entries = []
+    if entries:
+        TimelineEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+@transaction.atomic
+def build_timeline(user_id):
+    """Строит (или перестраивает) ленту пользователя с нуля."""
+
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    _add_posts(
+        user_id,
+        Post.objects.filter(
+            author_id__in=Follow.objects.filter(user_id=user_id).values(
+                "following_id"
+            )
+        ),
+    )
+    Timeline.objects.get_or_create(user_id=user_id)
+
+
+def fan_out_post(post):
+    """Добавляет новый пост в ленты всех подписчиков автора."""
+
+    followers = Timeline.objects.filter(
+        user__follower__following_id=post.author_id
+    ).values_list("user_id", flat=True)
+
+    entries = [
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post.id,
+            author_id=post.author_id,
+            created=post.created,
+        )
+        for user_id in followers.iterator()
+    ]
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+@transaction.atomic
+def add_author(user_id, author_id):
+    """Подписка: добавляет посты автора в ленту пользователя.
+
+    Если лента еще не построена, строит ее целиком.
+    """
+
+    if not has_timeline(user_id):
+        build_timeline(user_id)
+        return
+    _add_posts(user_id, Post.objects.filter(author_id=author_id))
+
+
+def remove_author(user_id, author_id):
+    """Отписка: убирает посты автора из ленты пользователя."""
+
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
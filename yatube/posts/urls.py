@@ -1,21 +1,18 @@
 from django.urls import path
-from django.views.decorators.cache import cache_page
 
 from . import views
 
 app_name = "posts"
-CACHE_TIMER_SECONDS = 20
 
 urlpatterns = [
     path(
         "",
-        cache_page(CACHE_TIMER_SECONDS, cache="default", key_prefix="index")(
-            views.PostsView.as_view()
-        ),
+        views.PostsView.as_view(),
         name="index",
     ),
     path("follow/", views.ShowFollowVies.as_view(), name="show_follows"),
     path("feedback/", views.FeedbackView.as_view(), name="feedback"),
+    path("search/", views.SearchView.as_view(), name="search"),
     path("group/list/", views.GroupListView.as_view(), name="real_group_list"),
     path(
         "group/<slug:slug>/", views.PostGroupView.as_view(), name="group_list"
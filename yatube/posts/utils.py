@@ -1,6 +1,29 @@
+import base64
+import binascii
+import hashlib
+from collections.abc import Sequence
+
 from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage,
+    InvalidPage,
+    Page,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
 from django.utils.translation import gettext_lazy as _
 
+from core.cache import get_versions
+
+from .moderation import find_prohibited
+
 
 class TemplateMixin:
     """Контейнер хранения шаблонов."""
@@ -12,18 +35,338 @@ class TemplateMixin:
     ADD_POST_TEMPLATE = "posts/creation.html"
     POST_PROFILE_TEMPLATE = "posts/profile.html"
     FEEDBACK_TEMPLATE = "posts/feedback.html"
+    SEARCH_TEMPLATE = "posts/search.html"
+
+
+class KeysetPage(Sequence):
+    """Страница пагинации по ключу. Номера страницы и общего числа нет."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинация по ключу (created, id) вместо OFFSET/LIMIT.
+
+    Курсор - непрозрачная строка с ключом последней (или первой) записи
+    страницы и направлением. Любая страница стоит как первая: индексный
+    поиск по ключу и LIMIT, без пропуска строк и без COUNT(*).
+    """
+
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    @staticmethod
+    def encode_cursor(direction, obj):
+        raw = f"{direction}|{obj.created.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            direction, created, pk = raw.split("|")
+            created = parse_datetime(created)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidPage(_("Некорректный курсор."))
+        if created is None or direction not in (cls.NEXT, cls.PREVIOUS):
+            raise InvalidPage(_("Некорректный курсор."))
+        return direction, created, pk
+
+    def page(self, cursor=None):
+        queryset = self.object_list
+        direction = self.NEXT
+        if cursor:
+            direction, created, pk = self.decode_cursor(cursor)
+            if direction == self.NEXT:
+                queryset = queryset.filter(
+                    Q(created__lt=created) | Q(created=created, pk__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created__gt=created) | Q(created=created, pk__gt=pk)
+                )
+
+        if direction == self.NEXT:
+            queryset = queryset.order_by("-created", "-pk")
+        else:
+            queryset = queryset.order_by("created", "pk")
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == self.PREVIOUS:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows, None, None)
+
+        has_next, has_previous = has_more, bool(cursor)
+        if direction == self.PREVIOUS:
+            has_next, has_previous = True, has_more
+
+        return KeysetPage(
+            rows,
+            self.encode_cursor(self.NEXT, rows[-1]) if has_next else None,
+            (
+                self.encode_cursor(self.PREVIOUS, rows[0])
+                if has_previous else None
+            ),
+        )
+
+
+def estimate_rows(model, using):
+    """Оценка числа строк таблицы по статистике СУБД или None.
+
+    Для SQLite статистику собирают ANALYZE и PRAGMA optimize (см.
+    core.backends.sqlite3), для PostgreSQL - autovacuum.
+    """
+
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = {
+        "sqlite": "SELECT stat FROM sqlite_stat1 WHERE tbl = %s",
+        "postgresql": "SELECT reltuples FROM pg_class WHERE relname = %s",
+    }
+    if connection.vendor not in queries:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(queries[connection.vendor], [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    # В sqlite_stat1 первое число stat - количество строк.
+    rows = int(str(row[0]).split()[0])
+    return rows if rows > 0 else None
+
+
+class ElidedPage(Page):
+    @property
+    def elided_page_range(self):
+        """Номера страниц для ссылок вокруг текущей (см. ElidedPaginator)."""
+
+        return list(self.paginator.get_elided_page_range(self.number))
+
+
+class ElidedPaginator(Paginator):
+    """Пагинатор с сокращенным списком страниц для ссылок.
+
+    Вместо всех страниц выводятся on_ends первых и последних, on_each_side
+    по обе стороны от текущей и ELLIPSIS на месте пропусков, поэтому
+    шаблон рендерит одинаковое число ссылок при любом числе страниц.
+    """
+
+    ELLIPSIS = "…"
+    on_each_side = 2
+    on_ends = 1
+
+    def _get_page(self, *args, **kwargs):
+        return ElidedPage(*args, **kwargs)
+
+    def elided_head(self, number):
+        """Страницы до текущей включительно."""
+
+        if number > self.on_each_side + self.on_ends + 2:
+            yield from range(1, self.on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - self.on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+
+    def get_elided_page_range(self, number):
+        last = self.num_pages
+        yield from self.elided_head(number)
+        if number < last - self.on_each_side - self.on_ends - 1:
+            yield from range(number + 1, number + self.on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(last - self.on_ends + 1, last + 1)
+        else:
+            yield from range(number + 1, last + 1)
+
+
+class ApproximatePage(ElidedPage):
+    """Страница приблизительной пагинации: есть ли следующая, известно по
+    лишней строке выборки, а не по числу страниц."""
+
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+
+class ApproximateCountPaginator(ElidedPaginator):
+    """Пагинатор без точного COUNT(*) на больших выборках.
+
+    Сначала считаются строки не дальше threshold (COUNT по подзапросу с
+    LIMIT) - до порога число точное. Выше порога берется закэшированный
+    на count_timeout подсчет, для выборки по всей таблице - оценка по
+    статистике СУБД, а точный COUNT(*) выполняется, только если ни того,
+    ни другого нет, и попадает в кэш. Тогда is_approximate = True:
+    шаблоны выводят "около N страниц", а номер страницы за оценкой не
+    считается ошибкой, пока на странице есть записи.
+    """
+
+    threshold = 1000
+    count_timeout = 10 * 60
+    cache_prefix = "approximate-count"
+
+    is_approximate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        queryset = queryset.order_by()
+        bounded = queryset[:self.threshold + 1].count()
+        if bounded <= self.threshold:
+            return bounded
+
+        self.is_approximate = True
+        key = self.cache_key(queryset)
+        count = cache.get(key)
+        if count is None and self.whole_table(queryset):
+            count = estimate_rows(queryset.model, queryset.db)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.count_timeout)
+        # Точно известно, что строк больше порога.
+        return max(count, bounded)
+
+    def cache_key(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+        return f"{self.cache_prefix}:{queryset.db}:{digest}"
+
+    @staticmethod
+    def whole_table(queryset):
+        """Отбирает ли выборка те же строки, что менеджер модели."""
+
+        def where(queryset):
+            query = queryset.query
+            compiler = query.get_compiler(queryset.db)
+            return compiler.compile(query.where)
+
+        return where(queryset) == where(queryset.model._default_manager.all())
+
+    def validate_number(self, number):
+        # count определяет, приблизительна ли пагинация.
+        self.count
+        if not self.is_approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def get_elided_page_range(self, number):
+        if not self.is_approximate:
+            yield from super().get_elided_page_range(number)
+            return
+        # Последние страницы по оценке могут не существовать: справа
+        # только окно в пределах оценки.
+        yield from self.elided_head(number)
+        end = min(number + self.on_each_side, self.num_pages)
+        yield from range(number + 1, end + 1)
+        if end < self.num_pages:
+            yield self.ELLIPSIS
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_approximate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return ApproximatePage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
 
 
 class PaginationMixin:
-    """Миксин пагинации."""
+    """Миксин пагинации.
+
+    По умолчанию постраничная пагинация с приблизительным числом страниц
+    на больших выборках. С параметром ?cursor= включается пагинация по
+    ключу (created, id).
+    """
 
     paginate_by = 10
+    paginator_class = ApproximateCountPaginator
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.cursor_kwarg not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET[self.cursor_kwarg])
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PageCacheMixin:
+    """Включает кэш страниц (core.custom_middleware.page_cache).
+
+    Версии тегов фиксируются до того, как шаблон прочитает данные, поэтому
+    изменение, пришедшее во время рендера, не закрепится в кэше.
+    По умолчанию страница хранится settings.PAGE_CACHE_TIMEOUT секунд.
+    """
+
+    page_cache_timeout = None
+
+    def get_page_cache_tags(self):
+        return ()
+
+    def render_to_response(self, context, **response_kwargs):
+        self.request.page_cache = (
+            self.page_cache_timeout or settings.PAGE_CACHE_TIMEOUT,
+            get_versions(*self.get_page_cache_tags()),
+        )
+        return super().render_to_response(context, **response_kwargs)
 
 
 class ValidationMixin:
 
     MIN_TEXT_LENGTH = 10
-    PROHIBITED_WORDS = []
 
     def clean_text(self):
         data = self.cleaned_data["text"]
@@ -35,8 +378,7 @@ class ValidationMixin:
                 )
             )
 
-        for word in self.PROHIBITED_WORDS:
-            if word in data.lower():
-                raise forms.ValidationError(_("Не надо материться."))
+        if find_prohibited(data) is not None:
+            raise forms.ValidationError(_("Не надо материться."))
 
         return data
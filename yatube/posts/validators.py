@@ -1,8 +1,9 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
 
+from .moderation import find_prohibited
+
 MIN_TEXT_LENGTH = 10
-PROHIBITED_WORDS = []
 
 def clean_text(data):
 
@@ -14,8 +15,7 @@ def clean_text(data):
             )
         )
 
-    for word in PROHIBITED_WORDS:
-        if word in data.lower():
-            raise forms.ValidationError(_("Не надо материться."))
+    if find_prohibited(data) is not None:
+        raise forms.ValidationError(_("Не надо материться."))
 
     return data
@@ -2,7 +2,7 @@ import datetime
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum
+from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404, redirect
 from django.views.generic import (
     CreateView,
@@ -15,51 +15,79 @@ from django.views.generic import (
 from django.urls import reverse
 from django.views.generic.list import MultipleObjectMixin
 
+from . import cache_tags, comments, deletion, rating, search, timeline
 from .forms import CommentForm, FeedbackForm, PostForm
 from .models import Comment, Follow, Group, Post, Rating
-from .utils import PaginationMixin, TemplateMixin
+from .utils import (
+    ElidedPaginator,
+    PageCacheMixin,
+    PaginationMixin,
+    TemplateMixin,
+)
 
 User = get_user_model()
 
 
-class PostsView(PaginationMixin, TemplateMixin, ListView):
+class PostsView(PageCacheMixin, PaginationMixin, TemplateMixin, ListView):
     """Отображение основной страницы."""
 
     model = Post
     context_object_name = "posts"
+    query_budget = 8
+    replica_reads = True
+
+    def get_page_cache_tags(self):
+        return cache_tags.POSTS, cache_tags.GROUPS
 
     def get_template_names(self):
         return self.INDEX_TEMPLATE
 
     def get_queryset(self):
-        return Post.objects.all().select_related("group", "author")
+        return (
+            Post.objects.all()
+            .select_related("group", "author")
+            .prefetch_related("derivatives")
+        )
 
 
-class PostGroupView(TemplateMixin, PaginationMixin, ListView):
+class PostGroupView(
+    PageCacheMixin, TemplateMixin, PaginationMixin, ListView
+):
     """Отображение страницы группы."""
 
     model = Post
     context_object_name = "posts"
+    replica_reads = True
+
+    def get_page_cache_tags(self):
+        return cache_tags.group(self.group.pk), cache_tags.GROUPS
 
     def get_template_names(self):
         return self.GROUPS_TEMPLATE
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["group"] = get_object_or_404(Group, slug=self.kwargs["slug"])
+        self.group = get_object_or_404(Group, slug=self.kwargs["slug"])
+        context["group"] = self.group
         return context
 
     def get_queryset(self):
-        return Post.objects.filter(
-            group__slug=self.kwargs["slug"]
-        ).select_related("group", "author")
+        return (
+            Post.objects.filter(group__slug=self.kwargs["slug"])
+            .select_related("group", "author")
+            .prefetch_related("derivatives")
+        )
 
 
-class GroupListView(TemplateMixin, ListView):
+class GroupListView(PageCacheMixin, TemplateMixin, ListView):
     """Отображение списка групп."""
 
     model = Group
     context_object_name = "groups"
+    replica_reads = True
+
+    def get_page_cache_tags(self):
+        return (cache_tags.GROUPS,)
 
     def get_template_names(self):
         return self.GROUP_LIST_TEMPLATE
@@ -72,6 +100,7 @@ class ShowPostView(
 
     model = Post
     pk_url_kwarg = "post_id"
+    query_budget = 12
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(
@@ -81,28 +110,12 @@ class ShowPostView(
             **kwargs
         )
 
-        comment_children = self.object.comments.filter(
-            is_child=True
-        ).select_related("author")
-
-        for comment_child in comment_children:
-
-            if "treads" not in context:
-                context["treads"] = {comment_child.child_id: [comment_child]}
-            else:
-                if comment_child.child_id not in context["treads"]:
-                    context["treads"][comment_child.child_id] = [comment_child]
-                else:
-                    context["treads"][comment_child.child_id].append(
-                        comment_child
-                    )
-        post_rating = Rating.objects.filter(post=self.get_object()).aggregate(
-            rating=Sum("rating")
-        )["rating"]
-        if not post_rating:
-            post_rating = 0
+        context["comment_tree"] = comments.load_threads(
+            context["object_list"]
+        )
+        context["replies_preview"] = comments.REPLIES_PREVIEW
         context["comments_count"] = self.get_queryset().count()
-        context["rating"] = post_rating
+        context["rating"] = self.object.rating
         context["form"] = CommentForm()
         return context
 
@@ -110,8 +123,14 @@ class ShowPostView(
         return self.SHOW_POST_TEMPLATE
 
     def get_object(self, queryset=None):
-        return Post.objects.select_related("author").get(
-            id=self.kwargs["post_id"]
+        return get_object_or_404(
+            Post.objects.select_related("author", "group").annotate(
+                author_posts_count=Count(
+                    "author__posts",
+                    filter=Q(author__posts__is_deleted=False),
+                )
+            ),
+            id=self.kwargs["post_id"],
         )
 
     def get_queryset(self):
@@ -121,7 +140,11 @@ class ShowPostView(
 
 
 class ShowProfileView(
-    TemplateMixin, PaginationMixin, DetailView, MultipleObjectMixin
+    PageCacheMixin,
+    TemplateMixin,
+    PaginationMixin,
+    DetailView,
+    MultipleObjectMixin,
 ):
     """Отображение профиля юзера."""
 
@@ -129,28 +152,20 @@ class ShowProfileView(
     slug_url_kwarg = "username"
     slug_field = "username"
 
+    def get_page_cache_tags(self):
+        return cache_tags.author(self.object.pk), cache_tags.GROUPS
+
     def get_template_names(self):
         return self.POST_PROFILE_TEMPLATE
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(
-            object_list=self.object.posts.select_related("group"), **kwargs
+        return super().get_context_data(
+            object_list=self.object.posts.select_related(
+                "group"
+            ).prefetch_related("derivatives"),
+            **kwargs
         )
 
-        if self.object.id == self.request.user.id:
-            context["self"] = True
-            return context
-
-        exists = Follow.objects.filter(
-            user=self.request.user.id, author=self.object.id
-        ).exists()
-
-        context["following"] = False
-        if exists:
-            context["following"] = True
-
-        return context
-
 
 class AddPostView(LoginRequiredMixin, TemplateMixin, CreateView):
     """Отображение страницы добавления поста."""
@@ -216,6 +231,10 @@ class DeletePostView(LoginRequiredMixin, DeleteView):
     def get_success_url(self, **kwargs):
         return reverse("posts:show_profile", args=[self.request.user])
 
+    def delete(self, request, *args, **kwargs):
+        deletion.schedule(self.get_object())
+        return redirect(self.get_success_url())
+
 
 class AddCommentaryView(
     LoginRequiredMixin, TemplateMixin, PaginationMixin, CreateView
@@ -298,9 +317,11 @@ class ShowFollowVies(
         return self.INDEX_TEMPLATE
 
     def get_queryset(self):
-        return Post.objects.filter(
-            author__following__user=self.request.user
-        ).select_related("author", "group")
+        return (
+            timeline.get_feed(self.request.user)
+            .select_related("author", "group")
+            .prefetch_related("derivatives")
+        )
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -322,7 +343,7 @@ class ProfileFollowView(LoginRequiredMixin, CreateView):
 
         if request.user.id and author_to_follow != self.request.user:
             Follow.objects.get_or_create(
-                user=self.request.user, author=author_to_follow
+                user=self.request.user, following=author_to_follow
             )
 
         return super().dispatch(request, *args, *kwargs)
@@ -338,9 +359,9 @@ class ProfileUnfollowView(LoginRequiredMixin, DeleteView):
     slug_url_kwarg = "username"
 
     def get_object(self, queryset=None):
-        return Follow.objects.get(
+        return Follow.objects.select_related("following").get(
             user_id=self.request.user.id,
-            author_id=User.objects.get(username=self.kwargs["username"]),
+            following__username=self.kwargs["username"],
         )
 
     def get_success_url(self, **kwargs):
@@ -363,20 +384,30 @@ class RatingView(LoginRequiredMixin, CreateView):
         post_author = post.author
 
         if request.user.id and post_author != self.request.user:
-
-            rating = Rating.objects.filter(user=self.request.user, post=post)
-            step = 1
+            step = rating.LIKE
             if "/dislike" in self.request.path:
-                step = -1
-            if not rating:
-                Rating.objects.create(
-                    user=self.request.user, post=post, rating=step
-                )
-            else:
-                value = rating[0].rating + step
-                if abs(value) <= abs(step):
-                    rating.update(rating=value)
+                step = rating.DISLIKE
+            rating.vote(self.request.user, post, step)
         return super().dispatch(request, *args, *kwargs)
 
     def get(self, request, *args, **kwargs):
         return redirect("posts:show_post", self.kwargs["post_id"])
+
+
+class SearchView(TemplateMixin, ListView):
+    """Поиск по постам и комментариям, лучшие совпадения первыми."""
+
+    context_object_name = "results"
+    paginate_by = 10
+    paginator_class = ElidedPaginator
+
+    def get_template_names(self):
+        return self.SEARCH_TEMPLATE
+
+    def get_queryset(self):
+        return search.SearchResults(self.request.GET.get("q", ""))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.request.GET.get("q", "")
+        return context
@@ -0,0 +1,34 @@
+// Догрузка ответов треда порциями через /api/v1/posts/<id>/comments/<id>/replies/
+document.addEventListener("click", function (event) {
+  var link = event.target.closest(".js-more-replies");
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+
+  fetch(link.href, {headers: {"Accept": "application/json"}})
+    .then(function (response) { return response.json(); })
+    .then(function (data) {
+      var container = link.closest("[data-thread]");
+      data.results.forEach(function (reply) {
+        var item = document.createElement("li");
+        item.className = "list-group-item";
+        item.style.marginLeft = (reply.depth - 1) * 40 + "px";
+
+        var author = document.createElement("p");
+        author.textContent = "Автор комментария: " + reply.author;
+        var text = document.createElement("p");
+        text.textContent = reply.text;
+
+        item.appendChild(author);
+        item.appendChild(text);
+        container.insertBefore(item, link.parentNode);
+      });
+
+      if (data.next) {
+        link.href = data.next;
+      } else {
+        link.parentNode.remove();
+      }
+    });
+});
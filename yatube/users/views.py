@@ -2,7 +2,6 @@ from django.contrib.auth import logout
 from django.contrib.auth.forms import PasswordChangeForm, PasswordResetForm
 from django.contrib.auth.views import (LoginView, LogoutView,
                                        PasswordChangeView, PasswordResetView)
-from django.core.cache import cache
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
@@ -40,16 +39,9 @@ class ResetPasswordView(PasswordResetView):
 class MyLogoutView(LogoutView):
 
     template_name = "users/logged_out.html"
-    def render_to_response(self, context, **response_kwargs):
-        cache.clear()
-        return super().render_to_response(context, **response_kwargs)
 
 
 class MyLoginView(LoginView):
 
     success_url = reverse_lazy("posts:index")
     template_name = "users/login.html"
-
-    def render_to_response(self, context, **response_kwargs):
-        cache.clear()
-        return super().render_to_response(context, **response_kwargs)
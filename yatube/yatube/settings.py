@@ -38,15 +38,19 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE = (
+    'core.custom_middleware.metrics.MetricsMiddleware',
+    'core.custom_middleware.queries.QueryInspectionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.custom_middleware.db_routing.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Тулбар снаружи кэша страниц: его HTML не должен попасть в кэш.
     'debug_toolbar.middleware.DebugToolbarMiddleware',
-    'core.custom_middleware.middleware.timing'
+    'core.custom_middleware.page_cache.PageCacheMiddleware',
 )
 
 ROOT_URLCONF = 'yatube.urls'
@@ -74,11 +78,29 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # WAL, PRAGMA и BEGIN IMMEDIATE - см. core.backends.sqlite3
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплики для чтения (core.db_router): пути к копиям базы через запятую.
+# Копии обновляет команда sync_replicas.
+DATABASE_REPLICAS = []
+for index, path in enumerate(
+    filter(None, os.getenv('YATUBE_DB_REPLICAS', '').split(','))
+):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+DATABASE_ROUTERS = ('core.db_router.ReplicaRouter',)
+# Сколько секунд после записи пользователь читает из основной базы
+REPLICA_PIN_SECONDS = 10
+
 
 AUTH_PASSWORD_VALIDATORS = (
     {
@@ -125,13 +147,48 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# InstrumentedCache учитывает попадания в метриках запроса и оборачивает
+# бэкенд из OPTIONS['BACKEND'] - его можно заменить на Memcached или Redis,
+# не теряя метрик.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache_backends.InstrumentedCache',
         'LOCATION': os.path.join(BASE_DIR, 'yatube_cache'),
+        'OPTIONS': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
     }
 }
 
+# Проверка запросов к БД (core.queries): None, 'warn' или 'raise'.
+# В тестах core.test_runner включает 'raise'.
+QUERY_INSPECTION = 'warn' if DEBUG else None
+QUERY_REPEAT_THRESHOLD = 5
+TEST_RUNNER = 'core.test_runner.QueryInspectingRunner'
+
+# Запрещенные слова (posts.moderation): список и файл по слову в строке
+PROHIBITED_WORDS = []
+PROHIBITED_WORDS_FILE = os.path.join(BASE_DIR, 'prohibited_words.txt')
+
+# Бэкенд полнотекстового поиска (posts.search)
+SEARCH_BACKEND = 'posts.search.SQLiteFTSBackend'
+
+# Выполнять фоновые задачи (core.jobs) сразу, без manage.py runworker
+JOBS_EAGER = False
+# Потоков, параллельно отправляющих пачки писем (core.mail)
+MAIL_WORKERS = 4
+
+# Сколько секунд страница хранится в кэше страниц. Кэш у каждого процесса
+# свой, и инвалидация из другого процесса до него не доходит, поэтому
+# таймаут короткий; увеличивать его можно только с общим кэшем
+# (Memcached, Redis).
+PAGE_CACHE_TIMEOUT = 20
+# Сколько секунд браузер может хранить страницы из кэша страниц
+PAGE_CACHE_MAX_AGE = 20
+
+# Максимальный размер картинки, загружаемой через API (байт)
+API_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "DEFAULT_THROTTLE_CLASSES": (
@@ -11,7 +11,8 @@ urlpatterns = [
     path("", include("posts.urls", namespace="posts")),
     path("about/", include("about.urls", namespace="about")),
     path("captcha/", include("captcha.urls")),
-    path("api/", include("api.urls"))
+    path("api/", include("api.urls")),
+    path("metrics/", include("core.urls", namespace="core")),
 ]
 
 